@@ -0,0 +1,405 @@
+"""
+Analyzer corpus generator
+
+Writes a reproducible synthetic RDDL download tree for benchmarking and
+profiling RDDLDataAnalyzer far beyond the 57 PWRLIB72 artifacts, from 10k to
+1M files and from KB to GB per file. File kinds follow what the collectors
+actually download:
+
+- unit_test_log: Unity output of one test_fb_<module>.c run (test_fb_*.log)
+- ceedling_log:  a Ceedling test run: build steps, test output, overall summary
+- junit_xml:     Ceedling report.xml with the INFO trace in <system-out> (see junit_report)
+- gcovr:         gcovr Cobertura XML coverage report (gcovr_*.xml)
+- sensor:        temp_data captures, raw float32 or CSV with a header (see sensor_data)
+
+Files go to <root>/<project>/pipeline_NNNNN/{logs,xml,csv,other}/ with
+PIPELINE_FILES files per pipeline, so no directory gets huge at 1M files.
+Sizes come from a size_distribution spec (e.g. lognormal:32K:1.5 or
+fixed:1G). Text files are written block by block and closed after reaching
+their size, so they stay well-formed and may run over by a block; binary
+captures are exact. Like real CI, a share of files are reruns of an earlier
+file of the same kind: byte-identical (duplicate_rate) or with a few values
+changed (rerun_rate), which is what the duplicate and near-duplicate stages
+look for.
+
+Everything derives from the seed, so the same arguments produce byte-identical
+corpora whatever the number of worker processes. corpus.json in the root
+records the parameters and per-kind totals.
+
+Usage: python -m benchmarks.analyzer_corpus data/corpus --files 10000 [--sizes ci] [--workers 8]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.rddl_stub_server import size_distribution
+
+KINDS = ('unit_test_log', 'ceedling_log', 'junit_xml', 'gcovr', 'sensor')
+DEFAULT_MIX = {'unit_test_log': 0.45, 'ceedling_log': 0.10, 'junit_xml': 0.20, 'gcovr': 0.10, 'sensor': 0.15}
+PIPELINE_FILES = 100
+# Reruns copy one of the last RERUN_WINDOW originals of their kind
+RERUN_WINDOW = 64
+# Share of values a rerun changes; keeps reruns well above the near-duplicate threshold
+RERUN_NOISE = 0.02
+# Folder per extension, as FocusedDataCollector.get_artifact_type files downloads
+FOLDERS = {'.log': 'logs', '.xml': 'xml', '.csv': 'csv', '': 'other'}
+WRITE_BUFFER = 1024 * 1024
+SENSOR_CHUNK = 1024 * 1024
+CSV_BLOCK_ROWS = 1000
+
+# Firmware blocks under test: module, test function, INFO keys (keys in {} hold arrays)
+MODULES = (
+    ('filter_3p3z', 'test_Filter3p3z', ('input', 'output', '{in}', '{out}')),
+    ('filter_2p2z', 'test_Filter2p2z', ('input', 'output', '{in}', '{out}')),
+    ('notch_filter', 'test_NotchFilter', ('input', 'output', 'gain')),
+    ('pi_regulator', 'test_PiRegulator', ('error', 'integral', 'output', 'saturated')),
+    ('pid_regulator', 'test_PidRegulator', ('error', 'integral', 'derivative', 'output')),
+    ('ramp_generator', 'test_RampGenerator', ('target', 'step', 'output')),
+    ('soft_start', 'test_SoftStart', ('duty', 'vout', 'state')),
+    ('pwm_modulator', 'test_PwmModulator', ('duty', 'period', 'compare')),
+    ('adc_scaling', 'test_AdcScaling', ('raw', 'scaled', 'offset')),
+    ('moving_average', 'test_MovingAverage', ('sample', 'sum', 'output', '{window}')),
+)
+
+
+def parse_mix(spec):
+    """Kind weights from 'unit_test_log=0.5,sensor=0.2'; unnamed kinds get weight 0"""
+    mix = dict.fromkeys(KINDS, 0.0)
+    for item in spec.split(','):
+        kind, _, weight = item.partition('=')
+        if kind.strip() not in mix:
+            raise ValueError(f"Unknown file kind: {kind.strip()} (expected one of {', '.join(KINDS)})")
+        mix[kind.strip()] = float(weight)
+    return mix
+
+
+def plan_corpus(files, sizes='ci', seed=0, mix=None, rerun_rate=0.2, duplicate_rate=0.05):
+    """One (index, kind, size, content_seed, noise_seed) entry per file.
+
+    Files with the same content_seed, kind and size and no noise_seed are
+    byte-identical; a noise_seed perturbs RERUN_NOISE of the values.
+    """
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=files)
+    originals = {kind: [] for kind in mix}
+    plan = []
+    for index, (kind, size) in enumerate(zip(kinds, size_distribution(sizes, files, seed=seed))):
+        draw = rng.random()
+        if originals[kind] and draw < duplicate_rate + rerun_rate:
+            content_seed, size = rng.choice(originals[kind][-RERUN_WINDOW:])
+            noise_seed = rng.getrandbits(32) if draw >= duplicate_rate else None
+        else:
+            content_seed, noise_seed = rng.getrandbits(32), None
+            originals[kind].append((content_seed, size))
+        plan.append((index, kind, size, content_seed, noise_seed))
+    return plan
+
+
+def file_name(index, kind, content_seed):
+    module = MODULES[content_seed % len(MODULES)][0]
+    if kind == 'unit_test_log':
+        return f"test_fb_{module}_{index:07d}.log"
+    if kind == 'ceedling_log':
+        return f"ceedling_test_{module}_{index:07d}.log"
+    if kind == 'junit_xml':
+        return f"report_{index:07d}.xml"
+    if kind == 'gcovr':
+        return f"gcovr_coverage_{index:07d}.xml"
+    # One capture in four is CSV text, the rest raw float32
+    return f"temp_data_{index:07d}.csv" if content_seed % 4 == 0 else f"temp_data_file_{index:07d}"
+
+
+def file_path(root, index, kind, content_seed):
+    name = file_name(index, kind, content_seed)
+    return Path(root) / f"pipeline_{index // PIPELINE_FILES:05d}" / FOLDERS[Path(name).suffix] / name
+
+
+class Values:
+    """Integer draws from the content seed, replaced at rate noise by draws from the noise seed.
+
+    The content generator is advanced on every draw, so a rerun stays aligned
+    with its original and differs only in the perturbed values.
+    """
+
+    def __init__(self, content_seed, noise_seed=None, noise=RERUN_NOISE):
+        self.rng = random.Random(content_seed)
+        self.noise_rng = random.Random(noise_seed) if noise_seed is not None else None
+        self.noise = noise
+
+    def randint(self, low, high):
+        # random() scaling is several times faster than Random.randint
+        value = low + int(self.rng.random() * (high - low + 1))
+        if self.noise_rng is not None and self.noise_rng.random() < self.noise:
+            return low + int(self.noise_rng.random() * (high - low + 1))
+        return value
+
+    def chance(self, p):
+        return self.rng.random() < p
+
+
+def info_lines(module, test, keys, values, line=100):
+    """One step of a test: an INFO line per key, Unity style"""
+    lines = []
+    for offset, key in enumerate(keys):
+        if key.startswith('{'):
+            value = "{ " + ", ".join(str(values.randint(-50000, 500000)) for _ in range(3)) + " }"
+            key = key.strip('{}')
+        else:
+            value = values.randint(-20000, 20000)
+        lines.append(f"test_fb_{module}.c:{line + offset}:{test}:INFO: {key} = {value}")
+    return lines
+
+
+def unit_test_log(values, module, test, keys):
+    """Unity output of one test executable: INFO traces and a PASS/FAIL line per test"""
+    counts = {'tests': 0, 'failures': 0}
+
+    def blocks():
+        while True:
+            counts['tests'] += 1
+            name = f"{test}_{counts['tests']}"
+            lines = [line for _ in range(values.randint(2, 12))
+                     for line in info_lines(module, name, keys, values)]
+            if values.chance(0.02):
+                counts['failures'] += 1
+                lines.append(f"test_fb_{module}.c:{values.randint(100, 400)}:{name}:FAIL: "
+                             f"Expected {values.randint(0, 100)} Was {values.randint(0, 100)}")
+            else:
+                lines.append(f"test_fb_{module}.c:{values.randint(100, 400)}:{name}:PASS")
+            yield "\n".join(lines) + "\n"
+
+    def trailer():
+        return (f"\n-----------------------\n{counts['tests']} Tests {counts['failures']} Failures 0 Ignored \n"
+                f"{'FAIL' if counts['failures'] else 'OK'}\n")
+
+    return "", blocks(), trailer
+
+
+def ceedling_log(values, module, test, keys):
+    """Ceedling test run of one module: build steps, test output and the overall summary"""
+    unit = f"test_fb_{module}.c"
+    header = (f"\n\nTest '{unit}'\n{'-' * (len(unit) + 7)}\n"
+              f"Generating runner for {unit}...\n"
+              f"Compiling test_fb_{module}_runner.c...\nCompiling {unit}...\n"
+              f"Compiling unity.c...\nCompiling fb_{module}.c...\nCompiling cmock.c...\n"
+              f"Linking test_fb_{module}.out...\nRunning test_fb_{module}.out...\n\n"
+              f"-----------\nTEST OUTPUT\n-----------\n[{unit}]\n")
+    counts = {'tests': 0, 'failures': 0}
+
+    def blocks():
+        while True:
+            counts['tests'] += 1
+            lines = info_lines(module, f"{test}_{counts['tests']}", keys, values)
+            if values.chance(0.02):
+                counts['failures'] += 1
+            yield "".join(f'  - "{line}"\n' for line in lines)
+
+    def trailer():
+        passed = counts['tests'] - counts['failures']
+        return (f"\n--------------------\nOVERALL TEST SUMMARY\n--------------------\n"
+                f"TESTED:  {counts['tests']}\nPASSED:  {passed}\nFAILED:  {counts['failures']}\nIGNORED: 0\n")
+
+    return header, blocks(), trailer
+
+
+def junit_xml(values, module, test, keys):
+    """JUnit report with one <testsuite> per test file and its INFO trace in <system-out>"""
+    header = '<?xml version="1.0" encoding="utf-8" ?>\n<testsuites>\n'
+
+    def blocks():
+        while True:
+            suite_module, suite_test, suite_keys = MODULES[values.randint(0, len(MODULES) - 1)]
+            cases = values.randint(1, 6)
+            lines = [f'  <testsuite name="test_fb_{suite_module}" tests="{cases}" failures="0" skipped="0" '
+                     f'errors="0" time="0.{values.randint(1, 999):03d}">']
+            for case in range(cases):
+                lines.append(f'    <testcase name="{suite_test}_{case}" time="0.{values.randint(0, 50):03d}"/>')
+            lines.append('    <system-out>')
+            for _ in range(values.randint(2, 20)):
+                lines += info_lines(suite_module, suite_test, suite_keys, values) + ['']
+            lines += ['    </system-out>', '  </testsuite>']
+            yield "\n".join(lines) + "\n"
+
+    return header, blocks(), lambda: "</testsuites>\n"
+
+
+def gcovr_xml(values, module, test, keys):
+    """gcovr --xml (Cobertura) report: one <class> per source file with per-line hit counts"""
+    header = (f'<?xml version="1.0" ?>\n'
+              f"<!DOCTYPE coverage SYSTEM 'http://cobertura.sourceforge.net/xml/coverage-04.dtd'>\n"
+              f'<coverage line-rate="0.{values.randint(600, 999)}" branch-rate="0.{values.randint(400, 999)}" '
+              f'complexity="0.0" timestamp="{1700000000 + values.randint(0, 10**7)}" version="gcovr 6.0">\n'
+              f'  <sources>\n    <source>.</source>\n  </sources>\n  <packages>\n'
+              f'    <package name="src" line-rate="0.9" branch-rate="0.8" complexity="0.0">\n      <classes>\n')
+    counter = {'files': 0}
+
+    def blocks():
+        while True:
+            counter['files'] += 1
+            source = f"fb_{MODULES[values.randint(0, len(MODULES) - 1)][0]}_{counter['files']}"
+            lines = [f'        <class name="{source}_c" filename="src/{source}.c" '
+                     f'line-rate="0.{values.randint(500, 999)}" branch-rate="0.{values.randint(300, 999)}" '
+                     f'complexity="0.0">', '          <methods/>', '          <lines>']
+            for number in range(1, values.randint(20, 120)):
+                if values.chance(0.2):
+                    hits = values.randint(0, 4)
+                    lines.append(f'            <line number="{number}" hits="{hits}" branch="true" '
+                                 f'condition-coverage="{hits * 25}% ({hits}/4)"/>')
+                else:
+                    lines.append(f'            <line number="{number}" hits="{values.randint(0, 5000)}" branch="false"/>')
+            lines += ['          </lines>', '        </class>']
+            yield "\n".join(lines) + "\n"
+
+    return header, blocks(), lambda: "      </classes>\n    </package>\n  </packages>\n</coverage>\n"
+
+
+def sensor_signal(rng, noise_rng, start, count):
+    """count temperature samples (deg C) from sample start on: slow drift plus measurement noise"""
+    t = np.arange(start, start + count, dtype=np.float64)
+    signal = 25.0 + 8.0 * np.sin(t / 5000) + rng.normal(0, 0.3, count)
+    if noise_rng is not None:
+        signal += noise_rng.normal(0, 0.3, count) * (noise_rng.random(count) < RERUN_NOISE)
+    return signal
+
+
+def sensor_csv(content_seed, noise_seed):
+    """Temperature/current capture as CSV text with a header line, one row per millisecond"""
+    rng = np.random.default_rng(content_seed)
+    noise_rng = np.random.default_rng(noise_seed) if noise_seed is not None else None
+
+    def blocks():
+        for start in range(0, 2**62, CSV_BLOCK_ROWS):
+            # Integer fixed-point columns, as the logger writes them; also formats twice as fast as floats
+            temperature = (sensor_signal(rng, noise_rng, start, CSV_BLOCK_ROWS) * 1000).astype(np.int64)
+            current = rng.integers(900, 1100, CSV_BLOCK_ROWS)
+            rows = np.column_stack([np.arange(start, start + CSV_BLOCK_ROWS), temperature, current])
+            yield ("%d,%d,%d\n" * CSV_BLOCK_ROWS) % tuple(rows.ravel().tolist())
+
+    return "time_ms,temperature_mc,current_ma\n", blocks(), lambda: ""
+
+
+TEXT_WRITERS = {'unit_test_log': unit_test_log, 'ceedling_log': ceedling_log, 'junit_xml': junit_xml,
+                'gcovr': gcovr_xml}
+
+
+def write_text(path, size, header, blocks, trailer):
+    """Write header, blocks until size bytes are reached, then the trailer; returns bytes written"""
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        buffered = [header]
+        pending = len(header)
+        for block in blocks:
+            if written + pending >= size:
+                break
+            buffered.append(block)
+            pending += len(block)
+            if pending >= WRITE_BUFFER:
+                f.write("".join(buffered))
+                written += pending
+                buffered, pending = [], 0
+        buffered.append(trailer())
+        text = "".join(buffered)
+        f.write(text)
+        return written + len(text)
+
+
+def write_sensor_binary(path, size, content_seed, noise_seed):
+    """Raw little-endian float32 temperature trace, exactly size bytes rounded down to a sample"""
+    rng = np.random.default_rng(content_seed)
+    noise_rng = np.random.default_rng(noise_seed) if noise_seed is not None else None
+    samples = max(1, size // 4)
+    with open(path, 'wb') as f:
+        for start in range(0, samples, SENSOR_CHUNK):
+            sensor_signal(rng, noise_rng, start, min(SENSOR_CHUNK, samples - start)).astype('<f4').tofile(f)
+    return samples * 4
+
+
+def write_file(root, entry):
+    """Generate one planned file; returns (kind, bytes written)"""
+    index, kind, size, content_seed, noise_seed = entry
+    path = file_path(root, index, kind, content_seed)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if kind == 'sensor':
+        if path.suffix == '.csv':
+            return kind, write_text(path, size, *sensor_csv(content_seed, noise_seed))
+        return kind, write_sensor_binary(path, size, content_seed, noise_seed)
+    values = Values(content_seed, noise_seed)
+    module, test, keys = MODULES[content_seed % len(MODULES)]
+    return kind, write_text(path, size, *TEXT_WRITERS[kind](values, module, test, keys))
+
+
+def generate_corpus(root, files=10000, sizes='ci', seed=0, mix=None, rerun_rate=0.2, duplicate_rate=0.05,
+                    project='SYNTH', workers=1):
+    """Write the corpus under root/project and return its description (also saved as root/corpus.json)"""
+    root = Path(root)
+    mix = mix or DEFAULT_MIX
+    start = time.perf_counter()
+    plan = plan_corpus(files, sizes, seed, mix, rerun_rate, duplicate_rate)
+    write = partial(write_file, root / project)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            written = list(executor.map(write, plan, chunksize=max(1, files // (workers * 16))))
+    else:
+        written = [write(entry) for entry in plan]
+
+    kinds = {kind: {'files': 0, 'bytes': 0} for kind in mix}
+    for kind, nbytes in written:
+        kinds[kind]['files'] += 1
+        kinds[kind]['bytes'] += nbytes
+    corpus = {
+        'project': project,
+        'files': files,
+        'sizes': sizes,
+        'seed': seed,
+        'mix': mix,
+        'rerun_rate': rerun_rate,
+        'duplicate_rate': duplicate_rate,
+        'total_bytes': sum(kind['bytes'] for kind in kinds.values()),
+        'kinds': kinds,
+        'generated_seconds': round(time.perf_counter() - start, 2)
+    }
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "corpus.json").write_text(json.dumps(corpus, indent=2), encoding='utf-8')
+    return corpus
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic RDDL download tree for the analyzer")
+    parser.add_argument('root', help="output directory; files go to <root>/<project>")
+    parser.add_argument('--files', type=int, default=10000)
+    parser.add_argument('--sizes', default='ci', help="fixed:N, uniform:MIN:MAX, lognormal:MEDIAN:SIGMA or ci; "
+                                                      "sizes take K/M/G suffixes")
+    parser.add_argument('--mix', type=parse_mix, default=None, help="kind weights, e.g. unit_test_log=0.5,sensor=0.5")
+    parser.add_argument('--rerun-rate', type=float, default=0.2, help="share of near-duplicate reruns")
+    parser.add_argument('--duplicate-rate', type=float, default=0.05, help="share of byte-identical copies")
+    parser.add_argument('--project', default='SYNTH')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    planned = sum(size_distribution(args.sizes, args.files, seed=args.seed))
+    print(f"📦 Generating {args.files:,} files (~{planned / 2**20:,.0f} MB, sizes {args.sizes}) "
+          f"in {args.root} with {args.workers} worker(s)...")
+    corpus = generate_corpus(args.root, args.files, args.sizes, args.seed, args.mix, args.rerun_rate,
+                             args.duplicate_rate, args.project, args.workers)
+    for kind, totals in corpus['kinds'].items():
+        print(f"   {kind:<15} {totals['files']:>9,} files {totals['bytes'] / 2**20:>12,.1f} MB")
+    print(f"✅ {corpus['total_bytes'] / 2**20:,.1f} MB in {corpus['generated_seconds']}s; "
+          f"analyze with: python -m benchmarks.profile_analyzer {args.root}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Benchmark: batch artifact upload
+
+Uploads a mix of many small logs and a few large captures to the local RDDL
+stub server, once with one requests.post per file (the uploader's original
+path) and once through AsyncRDDLClient.upload_batch, largest files first over
+one pooled session, and prints the throughput of both.
+
+Usage: python -m benchmarks.bench_batch_upload [files] [latency_ms] [concurrency]
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import tempfile
+from pathlib import Path
+
+import requests
+
+from benchmarks.rddl_stub_server import RDDLStubServer
+from src.rddl_async_client import AsyncRDDLClient, upload_headers
+
+
+def make_files(directory, count):
+    """count files: mostly 4-64 KB logs, every 50th an 8 MB capture"""
+    paths = []
+    for i in range(count):
+        size = 8 * 2**20 if i % 50 == 49 else 4096 * (1 + i % 16)
+        path = Path(directory) / f"test_{i}.log"
+        path.write_bytes(os.urandom(1024) * (size // 1024))
+        paths.append(path)
+    return paths
+
+
+def upload_sequential(url, paths):
+    for path in paths:
+        with open(path, 'rb') as f:
+            requests.post(url, headers=upload_headers(path.name), data=f, timeout=60).raise_for_status()
+
+
+async def upload_batch(base_url, paths, concurrency):
+    async with AsyncRDDLClient('benchmark-token', base_url=base_url, max_concurrency=concurrency) as client:
+        return await client.upload_batch('BENCH', paths)
+
+
+def main():
+    file_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 20.0) / 1000
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_files(tmp, file_count)
+        total_mb = sum(p.stat().st_size for p in paths) / 2**20
+        print(f"Benchmark: uploading {file_count} files ({total_mb:.1f} MB), {latency * 1000:.0f} ms simulated latency")
+
+        with RDDLStubServer({'BENCH': []}, latency=latency) as server:
+            start = time.perf_counter()
+            upload_sequential(f"{server.url}/api/v1/projects/BENCH/artifacts", paths)
+            elapsed = time.perf_counter() - start
+        print(f"   sequential requests.post        {elapsed:6.2f} s  {file_count / elapsed:7.1f} files/s  "
+              f"{total_mb / elapsed:7.1f} MB/s")
+
+        with RDDLStubServer({'BENCH': []}, latency=latency) as server:
+            results, summary = asyncio.run(upload_batch(server.url, paths, concurrency))
+        print(f"   upload_batch (concurrency {concurrency:>3})  {summary['seconds']:6.2f} s  "
+              f"{summary['files_per_second']:7.1f} files/s  {summary['mb_per_second']:7.1f} MB/s  "
+              f"{summary['uploaded']}/{summary['files']} uploaded")
+
+
+if __name__ == "__main__":
+    main()
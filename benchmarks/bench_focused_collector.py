@@ -0,0 +1,54 @@
+"""
+Benchmark: serial vs concurrent artifact downloads in FocusedDataCollector
+
+Runs the collector against a local RDDL stub server with simulated per-request
+latency and compares wall-clock time for different worker counts.
+
+Usage: python -m benchmarks.bench_focused_collector [artifacts] [latency_ms]
+"""
+import os
+import sys
+import json
+import time
+import logging
+import tempfile
+from pathlib import Path
+
+from benchmarks.rddl_stub_server import RDDLStubServer, make_artifacts
+from src.focused_data_collector import FocusedDataCollector
+
+
+def run_collection(server_url, project_key, workers, data_root):
+    collector = FocusedDataCollector(workers=workers, base_url=server_url, data_root=data_root)
+    start = time.perf_counter()
+    results = collector.collect_project_data(project_key)
+    elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+def main():
+    artifact_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 20.0) / 1000
+    os.environ.setdefault('RDDL_API_TOKEN', 'benchmark-token')
+    logging.getLogger().setLevel(logging.WARNING)
+
+    projects = {'BENCH': make_artifacts(artifact_count, size=16 * 1024)}
+    print(f"Benchmark: {artifact_count} artifacts, {latency * 1000:.0f} ms simulated latency")
+
+    baseline = None
+    with RDDLStubServer(projects, latency=latency) as server:
+        for workers in (1, 4, 8, 16):
+            with tempfile.TemporaryDirectory() as tmp:
+                results, elapsed = run_collection(server.url, 'BENCH', workers, tmp)
+                collection = json.loads((Path(tmp) / 'BENCH' / 'collection_results.json').read_text())
+                collection = json.dumps(collection, sort_keys=True).replace(tmp, '<root>')
+            if baseline is None:
+                baseline = (collection, elapsed)
+            identical = "identical" if collection == baseline[0] else "DIFFERENT"
+            print(f"   workers={workers:>2}  {elapsed:7.2f} s  "
+                  f"{artifact_count / elapsed:8.1f} artifacts/s  "
+                  f"speedup {baseline[1] / elapsed:5.1f}x  results {identical}")
+
+
+if __name__ == "__main__":
+    main()
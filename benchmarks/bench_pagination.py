@@ -0,0 +1,40 @@
+"""
+Benchmark: artifact metadata listing with the shared paginator
+
+Lists a large synthetic project from the local RDDL stub server with the
+original serial settings (pageSize 25, one page at a time) and with larger
+pages fetched in parallel, with and without a reported total.
+
+Usage: python -m benchmarks.bench_pagination [artifacts] [latency_ms]
+"""
+import sys
+import time
+import logging
+
+import requests
+
+from benchmarks.rddl_stub_server import RDDLStubServer, make_artifacts
+from src.rddl_pagination import ArtifactPaginator
+
+
+def main():
+    artifact_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 20.0) / 1000
+    logging.getLogger().setLevel(logging.WARNING)
+
+    projects = {'BENCH': make_artifacts(artifact_count, size=16)}
+    print(f"Benchmark: listing {artifact_count} artifacts, {latency * 1000:.0f} ms simulated latency")
+
+    for include_total, page_size, workers in ((False, 25, 1), (False, 100, 1), (False, 100, 8), (True, 100, 8)):
+        with RDDLStubServer(projects, latency=latency, include_total=include_total) as server:
+            url = f"{server.url}/api/v1/projects/BENCH/artifacts/metadata"
+            paginator = ArtifactPaginator(requests.Session(), url, page_size=page_size, workers=workers)
+            start = time.perf_counter()
+            count = sum(1 for _ in paginator)
+            elapsed = time.perf_counter() - start
+        print(f"   pageSize={page_size:>3} workers={workers} total={'yes' if include_total else 'no ':3}  "
+              f"{paginator.pages_fetched:>4} pages  {elapsed:6.2f} s  {count} artifacts")
+
+
+if __name__ == "__main__":
+    main()
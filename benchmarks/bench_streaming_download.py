@@ -0,0 +1,47 @@
+"""
+Benchmark: peak Python heap while downloading large artifacts
+
+Downloads artifacts of increasing size from the local RDDL stub server through
+FocusedDataCollector.download_artifact and reports the peak traced allocation.
+With streaming downloads the peak stays near the chunk size regardless of the
+artifact size.
+
+Usage: python -m benchmarks.bench_streaming_download [max_size_mb]
+"""
+import os
+import sys
+import time
+import logging
+import tempfile
+import tracemalloc
+
+from benchmarks.rddl_stub_server import RDDLStubServer
+from src.focused_data_collector import FocusedDataCollector
+
+
+def main():
+    max_size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    os.environ.setdefault('RDDL_API_TOKEN', 'benchmark-token')
+    logging.getLogger().setLevel(logging.WARNING)
+
+    sizes_mb = [s for s in (16, 64, 256, 1024) if s <= max_size_mb]
+    projects = {'BENCH': [(f"{i:032x}", f"capture_{size}mb", os.urandom(1024) * (size * 1024))
+                          for i, size in enumerate(sizes_mb)]}
+
+    with RDDLStubServer(projects) as server, tempfile.TemporaryDirectory() as tmp:
+        collector = FocusedDataCollector(base_url=server.url, data_root=tmp)
+        for artifact_id, filename, content in projects['BENCH']:
+            artifact = {'id': artifact_id, 'filename': filename, 'contentType': 'application/octet-stream'}
+            tracemalloc.start()
+            start = time.perf_counter()
+            success, result = collector.download_artifact('BENCH', artifact)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"   {len(content) / 2**20:6.0f} MB  {elapsed:6.2f} s  "
+                  f"{len(content) / 2**20 / elapsed:7.1f} MB/s  peak heap {peak / 2**20:6.2f} MB  "
+                  f"{'ok' if success else result}")
+
+
+if __name__ == "__main__":
+    main()
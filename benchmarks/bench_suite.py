@@ -0,0 +1,351 @@
+"""
+Benchmark suite: collectors and uploader against a local RDDL stub
+
+Starts the RDDL stub server (paginated metadata, downloads, uploads) and a
+static file server standing in for the MTB web server in a separate process,
+with configurable latency, per-connection bandwidth and artifact sizes, then
+runs each scenario in its own process:
+
+- focused_sync:      FocusedDataCollector.collect_project_data with worker threads
+- focused_async:     FocusedDataCollector.collect_project_data_async over AsyncRDDLClient
+- enterprise:        EnterpriseDataCollector.quick_collect_known_projects (listing + discovery probes)
+- uploader_pipeline: data_lake_uploader listing -> download -> upload pipeline
+- uploader_batch:    data_lake_uploader.upload_files_async
+
+Each scenario reports wall time, items/s, MB/s, p50/p95/p99 per metrics phase
+and the peak RSS of its process. Rate limiting is disabled so the numbers
+measure the code, not the budgets. Results are written to
+benchmarks/results/<timestamp>_<git revision>.json; --compare checks them
+against an earlier file (or "latest") and exits non-zero on regressions.
+
+Usage: python -m benchmarks.bench_suite [--artifacts 400] [--latency-ms 20] [--bandwidth-mbps 50]
+                                        [--sizes ci] [--workers 8] [--scenarios ...] [--compare latest]
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+import multiprocessing
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+
+from benchmarks.rddl_stub_server import RDDLStubServer, StaticFileServer, make_artifacts, size_distribution
+
+RESULTS_DIR = Path(__file__).parent / "results"
+SCENARIOS = ("focused_sync", "focused_async", "enterprise", "uploader_pipeline", "uploader_batch")
+# Metrics compared between runs and whether a higher value is better
+COMPARED_METRICS = {'items_per_second': True, 'mb_per_second': True, 'peak_rss_mb': False}
+COMPARED_PERCENTILES = ('p50_seconds', 'p95_seconds')
+# Latency changes smaller than this are timer noise, whatever their relative size
+MIN_LATENCY_DELTA = 0.005
+
+
+def build_projects(config):
+    """BENCH plus enterprise_projects discovery candidates, every other one accessible"""
+    sizes = size_distribution(config['sizes'], config['artifacts'], seed=config['seed'])
+    projects = {'BENCH': make_artifacts(config['artifacts'], prefix="bench", sizes=sizes)}
+    for i in range(0, config['enterprise_projects'], 2):
+        projects[f"E{i:03d}"] = make_artifacts(10, size=1024, prefix=f"e{i}")
+    return projects
+
+
+def serve(config, upload_dir, ready, stop):
+    """Server process: RDDL stub and static file server until stop is set"""
+    latency, bandwidth = config['latency_ms'] / 1000, config['bandwidth']
+    with RDDLStubServer(build_projects(config), latency=latency, bandwidth=bandwidth) as rddl, \
+            StaticFileServer(upload_dir, latency=latency, bandwidth=bandwidth) as files:
+        ready.put({'rddl': rddl.url, 'files': files.url})
+        stop.wait()
+
+
+def write_upload_files(directory, config):
+    """Files the uploader scenarios move, sized like the download artifacts"""
+    sizes = size_distribution(config['sizes'], config['upload_files'], seed=config['seed'] + 1)
+    paths = []
+    for _, filename, content in make_artifacts(config['upload_files'], prefix="upload", sizes=sizes):
+        path = Path(directory) / (filename if filename.endswith(('.log', '.xml')) else filename + ".log")
+        path.write_bytes(content)
+        paths.append(path)
+    return paths
+
+
+def run_focused_sync(config, urls, metrics, workdir):
+    from src.focused_data_collector import FocusedDataCollector
+    from src.rate_limiter import RateLimiter
+
+    collector = FocusedDataCollector(workers=config['workers'], base_url=urls['rddl'], data_root=workdir,
+                                     rate_limiter=RateLimiter({}), metrics=metrics)
+    results = collector.collect_project_data('BENCH')
+    return results['successful_downloads'], sum(d['size'] for d in results['downloads'])
+
+
+def run_focused_async(config, urls, metrics, workdir):
+    from src.focused_data_collector import FocusedDataCollector
+    from src.rddl_async_client import AsyncRDDLClient
+    from src.rate_limiter import RateLimiter
+
+    collector = FocusedDataCollector(base_url=urls['rddl'], data_root=workdir, metrics=metrics)
+
+    async def collect():
+        async with AsyncRDDLClient(collector.token, base_url=urls['rddl'], max_concurrency=config['workers'],
+                                   rate_limiter=RateLimiter({}), metrics=metrics) as client:
+            return await collector.collect_project_data_async(client, 'BENCH')
+
+    results = asyncio.run(collect())
+    return results['successful_downloads'], sum(d['size'] for d in results['downloads'])
+
+
+def run_enterprise(config, urls, metrics, workdir):
+    from src.enterprise_data_collector import EnterpriseDataCollector
+    from src.rate_limiter import RateLimiter
+
+    collector = EnterpriseDataCollector(server_url=urls['rddl'], data_dir=Path(workdir) / "enterprise",
+                                        multi_app_dir=Path(workdir) / "multi_app", discovery_workers=config['workers'],
+                                        rate_limiter=RateLimiter({}), metrics=metrics)
+    collector.known_working_projects = ['BENCH']
+    collector.potential_projects = [f"E{i:03d}" for i in range(config['enterprise_projects'])]
+    results = collector.quick_collect_known_projects()
+    return results['summary']['total_artifacts'], 0
+
+
+def configure_uploader(urls, workdir):
+    """Point the uploader's module configuration at the local servers"""
+    from src import data_lake_uploader as uploader
+
+    uploader.SERVER_URL = urls['files']
+    uploader.BASE_URL = urls['rddl']
+    uploader.ARTIFACT_UPLOAD_URL = f"{urls['rddl']}/api/v1/projects/BENCH/artifacts"
+    uploader.RDDL_API_TOKEN = os.environ['RDDL_API_TOKEN']
+    uploader.LOGS_DIR = str(Path(workdir) / "logs")
+    uploader.BLOB_STORE = None
+    os.makedirs(uploader.LOGS_DIR, exist_ok=True)
+    return uploader
+
+
+def run_uploader_pipeline(config, urls, metrics, workdir):
+    uploader = configure_uploader(urls, workdir)
+    with metrics.timer("listing"):
+        file_links = uploader.list_file_links()
+    stats = uploader.UploadPipeline(download_workers=config['workers'], upload_workers=config['workers'],
+                                    metrics=metrics).run(file_links)
+    return stats['uploaded'], stats['bytes_uploaded']
+
+
+def run_uploader_batch(config, urls, metrics, workdir):
+    from src.rate_limiter import RateLimiter
+
+    uploader = configure_uploader(urls, workdir)
+    paths = sorted(Path(config['upload_dir']).iterdir())
+    results = asyncio.run(uploader.upload_files_async([str(p) for p in paths], project_key='BENCH',
+                                                      max_concurrency=config['workers'],
+                                                      rate_limiter=RateLimiter({}), metrics=metrics))
+    uploaded = [p for p, (_, status, _) in zip(paths, results) if status == 201]
+    return len(uploaded), sum(p.stat().st_size for p in uploaded)
+
+
+SCENARIO_RUNNERS = {
+    'focused_sync': run_focused_sync,
+    'focused_async': run_focused_async,
+    'enterprise': run_enterprise,
+    'uploader_pipeline': run_uploader_pipeline,
+    'uploader_batch': run_uploader_batch,
+}
+
+
+def run_scenario(name, config, urls, results):
+    """Scenario process: run one scenario and put its measurements on the results queue"""
+    from src.metrics import Metrics
+
+    os.environ.setdefault('RDDL_API_TOKEN', 'benchmark-token')
+    logging.disable(logging.WARNING)
+    metrics = Metrics()
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.perf_counter()
+        items, nbytes = SCENARIO_RUNNERS[name](config, urls, metrics, workdir)
+        elapsed = time.perf_counter() - start
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+    if peak_rss is not None and sys.platform == 'darwin':
+        peak_rss //= 1024
+    phases = metrics.snapshot()['phases']
+    results.put({
+        'seconds': round(elapsed, 3),
+        'items': items,
+        'bytes': nbytes,
+        'items_per_second': round(items / elapsed, 2),
+        'mb_per_second': round(nbytes / 2**20 / elapsed, 2),
+        'peak_rss_mb': round(peak_rss / 1024, 1) if peak_rss is not None else None,
+        'phases': {phase: {key: timing[key] for key in ('count', 'p50_seconds', 'p95_seconds', 'p99_seconds')}
+                   for phase, timing in phases.items()}
+    })
+
+
+def git_revision():
+    """(short revision, dirty flag) of the working tree, or ('unknown', None) outside git"""
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                    capture_output=True, text=True).stdout.strip())
+        return revision, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', None
+
+
+def run_suite(config, scenarios):
+    """Start the servers, run each scenario in a fresh process, return the result document"""
+    revision, dirty = git_revision()
+    document = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': revision,
+        'dirty': dirty,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {key: value for key, value in config.items() if key != 'upload_dir'},
+        'scenarios': {}
+    }
+    ctx = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as upload_dir:
+        write_upload_files(upload_dir, config)
+        config = dict(config, upload_dir=upload_dir)
+        ready, stop = ctx.Queue(), ctx.Event()
+        server = ctx.Process(target=serve, args=(config, upload_dir, ready, stop), daemon=True)
+        server.start()
+        try:
+            urls = ready.get(timeout=60)
+            for name in scenarios:
+                results = ctx.Queue()
+                worker = ctx.Process(target=run_scenario, args=(name, config, urls, results))
+                worker.start()
+                document['scenarios'][name] = results.get(timeout=config['timeout'])
+                worker.join()
+                print(format_scenario(name, document['scenarios'][name]))
+        finally:
+            stop.set()
+            server.join(timeout=10)
+    return document
+
+
+def format_scenario(name, result):
+    phases = "  ".join(f"{phase} p50 {t['p50_seconds'] * 1000:.0f}/p95 {t['p95_seconds'] * 1000:.0f} ms"
+                       for phase, t in result['phases'].items() if phase in ('listing', 'download', 'upload'))
+    rss = f"{result['peak_rss_mb']:.0f} MB" if result['peak_rss_mb'] is not None else "n/a"
+    return (f"   {name:<18} {result['seconds']:7.2f} s  {result['items_per_second']:8.1f} items/s  "
+            f"{result['mb_per_second']:7.1f} MB/s  rss {rss:>7}  {phases}")
+
+
+def save_results(document, results_dir=RESULTS_DIR):
+    results_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.fromisoformat(document['timestamp']).strftime('%Y%m%d_%H%M%S')
+    path = results_dir / f"{stamp}_{document['revision']}{'-dirty' if document['dirty'] else ''}.json"
+    path.write_text(json.dumps(document, indent=2), encoding='utf-8')
+    return path
+
+
+def latest_results(results_dir=RESULTS_DIR, exclude=None):
+    """Most recent saved result file other than exclude, or None"""
+    candidates = sorted(p for p in results_dir.glob('*.json') if p != exclude) if results_dir.exists() else []
+    return candidates[-1] if candidates else None
+
+
+def compare_results(baseline, current, threshold=0.10):
+    """Per-scenario changes between two result documents.
+
+    Returns a list of (scenario, metric, old, new, change, regressed) where
+    change is the relative change and regressed marks a change for the worse
+    by more than threshold. Percentiles are compared per phase; lower is better,
+    and a latency has to grow by at least MIN_LATENCY_DELTA to count.
+    """
+    rows = []
+    for name, new in current['scenarios'].items():
+        old = baseline['scenarios'].get(name)
+        if old is None:
+            continue
+        pairs = [(metric, old.get(metric), new.get(metric), higher) for metric, higher in COMPARED_METRICS.items()]
+        for phase, timing in new['phases'].items():
+            for key in COMPARED_PERCENTILES:
+                before = old['phases'].get(phase, {}).get(key)
+                pairs.append((f"{phase}.{key}", before, timing[key], None))
+        for metric, before, after, higher_is_better in pairs:
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if higher_is_better is None:
+                regressed = change > threshold and after - before >= MIN_LATENCY_DELTA
+            else:
+                regressed = (-change if higher_is_better else change) > threshold
+            rows.append((name, metric, before, after, change, regressed))
+    return rows
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the collectors and the uploader against a local RDDL stub")
+    parser.add_argument('--artifacts', type=int, default=400, help="artifacts in the BENCH project")
+    parser.add_argument('--upload-files', type=int, default=200, help="files moved by the uploader scenarios")
+    parser.add_argument('--enterprise-projects', type=int, default=40, help="discovery candidates, half accessible")
+    parser.add_argument('--sizes', default='ci', help="fixed:N, uniform:MIN:MAX, lognormal:MEDIAN:SIGMA or ci")
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="server latency per request")
+    parser.add_argument('--bandwidth-mbps', type=float, default=50.0, help="per-connection bandwidth (0: unlimited)")
+    parser.add_argument('--workers', type=int, default=8, help="worker threads / concurrency per scenario")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--timeout', type=float, default=600, help="seconds allowed per scenario")
+    parser.add_argument('--compare', help="result file to compare against, or 'latest'")
+    parser.add_argument('--threshold', type=float, default=0.10, help="relative change counted as a regression")
+    parser.add_argument('--no-save', action='store_true', help="do not write a result file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = {
+        'artifacts': args.artifacts,
+        'upload_files': args.upload_files,
+        'enterprise_projects': args.enterprise_projects,
+        'sizes': args.sizes,
+        'latency_ms': args.latency_ms,
+        'bandwidth': args.bandwidth_mbps * 2**20 / 8 if args.bandwidth_mbps else None,
+        'workers': args.workers,
+        'seed': args.seed,
+        'timeout': args.timeout,
+    }
+    print(f"Benchmark suite: {args.artifacts} artifacts ({args.sizes}), {args.latency_ms:.0f} ms latency, "
+          f"{args.bandwidth_mbps or 'unlimited'} Mbit/s per connection, {args.workers} workers")
+    document = run_suite(config, args.scenarios)
+
+    saved = None if args.no_save else save_results(document)
+    if saved:
+        print(f"📁 Results saved: {saved}")
+
+    if not args.compare:
+        return 0
+    baseline_path = latest_results(exclude=saved) if args.compare == 'latest' else Path(args.compare)
+    if baseline_path is None:
+        print("No earlier results to compare against")
+        return 0
+    baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+    if baseline.get('config') != document['config']:
+        print("⚠️  Baseline was run with a different configuration; changes may not be comparable")
+    rows = compare_results(baseline, document, args.threshold)
+    print(f"\nCompared with {baseline_path.name} (revision {baseline['revision']}):")
+    for name, metric, before, after, change, regressed in rows:
+        print(f"   {name:<18} {metric:<26} {before:>10} -> {after:<10} {change:+7.1%}"
+              f"{'  ❌ REGRESSION' if regressed else ''}")
+    regressions = sum(1 for row in rows if row[5])
+    print(f"{'❌' if regressions else '✅'} {regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+"""
+Analyzer profiling harness
+
+Runs RDDLDataAnalyzer.run_comprehensive_analysis on a corpus with cProfile
+and tracemalloc hooked into each stage (see RDDLDataAnalyzer.stage) and
+reports:
+
+- per stage: wall time, share of the run, MB/s, peak and retained traced memory
+- per file type: count, mean and p95 seconds, MB/s (serial runs only)
+- per stage: the functions with the most own time, and the source lines whose
+  allocations grew the most over the stage (still held when it ended)
+
+The corpus is any RDDL download tree, or a directory written by
+benchmarks.analyzer_corpus; a missing directory is generated first with
+--files/--sizes/--seed, so the same command reproduces the same workload.
+Both profilers slow the run down (tracemalloc by 2-4x), so compare stage
+times between runs with the same flags. With --workers > 1 per-file analysis
+runs in child processes the profilers do not see.
+
+The report is written to benchmarks/results/profiles/<timestamp>_<git revision>.json,
+together with a .pstats file for pstats or snakeviz.
+
+Usage: python -m benchmarks.profile_analyzer [corpus_dir] [--files 10000] [--sizes ci] [--workers 1]
+                                             [--cache] [--top 10] [--no-cprofile] [--no-tracemalloc]
+"""
+import io
+import sys
+import json
+import time
+import pstats
+import logging
+import argparse
+import cProfile
+import tempfile
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.analyzer_corpus import generate_corpus
+from benchmarks.bench_suite import RESULTS_DIR, git_revision
+from src.metrics import Metrics
+from src.rddl_data_analyzer import RDDLDataAnalyzer
+
+PROFILES_DIR = RESULTS_DIR / "profiles"
+# Allocations made by the profilers themselves are not the analyzer's. Filtered per
+# source line after comparing: Snapshot.filter_traces costs seconds per snapshot
+IGNORED_ALLOCATIONS = frozenset((__file__, tracemalloc.__file__, cProfile.__file__, pstats.__file__,
+                                 "<frozen importlib._bootstrap>", "<unknown>"))
+
+
+class ProfiledAnalyzer(RDDLDataAnalyzer):
+    """RDDLDataAnalyzer with a cProfile profiler and tracemalloc snapshots per stage.
+
+    tracemalloc must be started by the caller (frames deep) for the memory
+    columns; profile=False leaves cProfile out. Results accumulate in
+    self.stages, per-file timings by file type in self.file_metrics.
+    """
+
+    def __init__(self, *args, profile=True, top=10, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profile = profile
+        self.top = top
+        self.stages = {}
+        self.profiles = {}
+        self.file_metrics = Metrics()
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state.update(profiles={}, file_metrics=None)
+        return state
+
+    @contextmanager
+    def stage(self, name):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        profiler = cProfile.Profile() if self.profile else None
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            with super().stage(name) as record:
+                yield record
+        finally:
+            if profiler:
+                profiler.disable()
+            result = {'seconds': time.perf_counter() - start}
+            if profiler:
+                self.profiles[name] = pstats.Stats(profiler)
+                result['hot_functions'] = hot_functions(self.profiles[name], self.top)
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                after = tracemalloc.take_snapshot()
+                result.update(peak_bytes=peak - baseline, retained_bytes=current - baseline,
+                              allocation_sites=allocation_sites(after.compare_to(before, 'lineno'), self.top))
+            self.stages[name] = result
+
+    def analyze_file_content(self, file_path):
+        start = time.perf_counter()
+        analysis = super().analyze_file_content(file_path)
+        if self.file_metrics is not None:  # None in worker processes
+            primary_type = analysis.get('file_type_analysis', {}).get('primary_type', 'error')
+            self.file_metrics.observe(primary_type, time.perf_counter() - start, analysis.get('file_size', 0))
+        return analysis
+
+
+def short_path(filename):
+    """Path relative to the repository for repo code, the bare file name otherwise"""
+    path = Path(filename)
+    try:
+        return str(path.resolve().relative_to(Path(__file__).resolve().parents[1]))
+    except ValueError:
+        return path.name
+
+
+def hot_functions(stats, top):
+    """Functions with the most own time: function, calls, own and cumulative seconds"""
+    rows = sorted(stats.stats.items(), key=lambda item: -item[1][2])[:top]
+    return [{'function': f"{short_path(filename)}:{line}({name})", 'calls': calls,
+             'own_seconds': round(own, 4), 'cumulative_seconds': round(cumulative, 4)}
+            for (filename, line, name), (_, calls, own, cumulative, _) in rows]
+
+
+def allocation_sites(differences, top):
+    """Source lines whose traced allocations grew the most"""
+    rows = sorted((stat for stat in differences
+                   if stat.size_diff > 0 and stat.traceback[0].filename not in IGNORED_ALLOCATIONS),
+                  key=lambda stat: -stat.size_diff)[:top]
+    return [{'line': f"{short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+             'bytes': stat.size_diff, 'blocks': stat.count_diff} for stat in rows]
+
+
+def resolve_corpus(corpus_dir, args):
+    """Directory to analyze: generate the corpus first if it does not exist yet"""
+    corpus_dir = Path(corpus_dir)
+    if not corpus_dir.exists():
+        print(f"📦 Generating corpus: {args.files:,} files ({args.sizes}, seed {args.seed}) in {corpus_dir}")
+        generate_corpus(corpus_dir, args.files, args.sizes, args.seed, workers=args.generate_workers)
+    manifest = corpus_dir / "corpus.json"
+    if manifest.exists():
+        corpus = json.loads(manifest.read_text(encoding='utf-8'))
+        return corpus_dir / corpus['project'], corpus
+    return corpus_dir, None
+
+
+def profile_analysis(rddl_dir, workers=1, use_cache=False, profile=True, trace_memory=True, frames=1, top=10,
+                     analysis_dir=None):
+    """Run the analyzer under the profilers; returns (report dict, combined pstats.Stats or None)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        analysis_dir = analysis_dir or tmp
+        if use_cache:
+            # Fill the cache first, so the profiled run measures the incremental path
+            with redirect_stdout(io.StringIO()):
+                RDDLDataAnalyzer(rddl_dir, analysis_dir, workers=workers).run_comprehensive_analysis()
+        analyzer = ProfiledAnalyzer(rddl_dir, analysis_dir, workers=workers, use_cache=use_cache,
+                                    profile=profile, top=top)
+        if trace_memory:
+            tracemalloc.start(frames)
+        try:
+            start = time.perf_counter()
+            # The analyzer's own summary would bury the profile
+            with redirect_stdout(io.StringIO()):
+                analysis = analyzer.run_comprehensive_analysis()
+            wall = time.perf_counter() - start
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+    if analysis is None:
+        raise FileNotFoundError(f"No RDDL data found in {rddl_dir}")
+
+    total_bytes = analysis['summary']['total_size_bytes']
+    # Snapshots and stats collection between stages are profiler bookkeeping, not analysis time
+    elapsed = sum(stage['seconds'] for stage in analyzer.stages.values())
+    stages = analyzer.metrics.snapshot()['phases']
+    for name, stage in analyzer.stages.items():
+        stage['share'] = round(stage['seconds'] / elapsed, 4) if elapsed else None
+        stage['mb_per_second'] = round(stages[name]['bytes'] / 2**20 / stage['seconds'], 2) \
+            if stages[name]['bytes'] and stage['seconds'] else None
+        stage['seconds'] = round(stage['seconds'], 4)
+    file_types = {primary_type: {'files': phase['count'], 'mean_seconds': phase['mean_seconds'],
+                                 'p95_seconds': phase['p95_seconds'], 'bytes': phase['bytes'],
+                                 'mb_per_second': round(phase['bytes_per_second'] / 2**20, 2)
+                                 if phase['bytes_per_second'] else None}
+                  for primary_type, phase in analyzer.file_metrics.snapshot()['phases'].items()}
+
+    combined = None
+    for stats in analyzer.profiles.values():
+        combined = stats if combined is None else combined.add(stats)
+    report = {
+        'files': analysis['total_files_analyzed'],
+        'total_bytes': total_bytes,
+        'seconds': round(elapsed, 3),
+        'wall_seconds': round(wall, 3),
+        'mb_per_second': round(total_bytes / 2**20 / elapsed, 2) if elapsed else None,
+        'stages': analyzer.stages,
+        'file_types': file_types,
+    }
+    return report, combined
+
+
+def print_report(report, top):
+    print(f"\n⏱️  {report['files']:,} files, {report['total_bytes'] / 2**20:,.1f} MB in {report['seconds']}s "
+          f"({report['mb_per_second']} MB/s; {report['wall_seconds']}s wall with profiler bookkeeping)")
+    print(f"\n   {'stage':<16} {'seconds':>9} {'share':>7} {'MB/s':>8} {'peak MB':>9} {'retained MB':>12}")
+    for name, stage in report['stages'].items():
+        peak = f"{stage['peak_bytes'] / 2**20:.1f}" if 'peak_bytes' in stage else '-'
+        retained = f"{stage['retained_bytes'] / 2**20:.1f}" if 'retained_bytes' in stage else '-'
+        print(f"   {name:<16} {stage['seconds']:>9.3f} {stage['share']:>7.1%} {stage['mb_per_second'] or '-':>8} "
+              f"{peak:>9} {retained:>12}")
+
+    if report['file_types']:
+        print(f"\n   {'file type':<22} {'files':>8} {'mean ms':>9} {'p95 ms':>9} {'MB/s':>8}")
+        for primary_type, timing in sorted(report['file_types'].items(), key=lambda item: -item[1]['bytes']):
+            print(f"   {primary_type:<22} {timing['files']:>8,} {timing['mean_seconds'] * 1000:>9.2f} "
+                  f"{timing['p95_seconds'] * 1000:>9.2f} {timing['mb_per_second'] or '-':>8}")
+
+    for name, stage in report['stages'].items():
+        if stage.get('hot_functions'):
+            print(f"\n🔥 {name}: top {top} functions by own time")
+            for row in stage['hot_functions']:
+                print(f"   {row['own_seconds']:>9.4f}s own {row['cumulative_seconds']:>9.4f}s cum "
+                      f"{row['calls']:>9,} calls  {row['function']}")
+        if stage.get('allocation_sites'):
+            print(f"🧠 {name}: top allocation growth")
+            for row in stage['allocation_sites']:
+                print(f"   {row['bytes'] / 2**10:>10,.1f} KB {row['blocks']:>8,} blocks  {row['line']}")
+
+
+def save_report(document, stats, profiles_dir=PROFILES_DIR):
+    """Write the JSON report and, when cProfile ran, the combined .pstats next to it"""
+    profiles_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.fromisoformat(document['timestamp']).strftime('%Y%m%d_%H%M%S')
+    path = profiles_dir / f"{stamp}_{document['revision']}{'-dirty' if document['dirty'] else ''}.json"
+    path.write_text(json.dumps(document, indent=2), encoding='utf-8')
+    if stats is not None:
+        stats.dump_stats(path.with_suffix('.pstats'))
+    return path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Profile RDDLDataAnalyzer per stage with cProfile and tracemalloc")
+    parser.add_argument('corpus', nargs='?', default='data/analyzer_corpus',
+                        help="RDDL download tree or analyzer_corpus directory; generated when missing")
+    parser.add_argument('--files', type=int, default=10000, help="files when generating the corpus")
+    parser.add_argument('--sizes', default='ci', help="size spec when generating the corpus")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--generate-workers', type=int, default=4, help="processes writing the corpus")
+    parser.add_argument('--workers', type=int, default=1, help="analyzer processes (profilers see only the parent)")
+    parser.add_argument('--cache', action='store_true', help="profile a re-run against a filled analysis cache")
+    parser.add_argument('--top', type=int, default=10, help="functions and allocation sites listed per stage")
+    parser.add_argument('--frames', type=int, default=1, help="tracemalloc traceback depth")
+    parser.add_argument('--no-cprofile', action='store_true')
+    parser.add_argument('--no-tracemalloc', action='store_true')
+    parser.add_argument('--no-save', action='store_true', help="do not write report files")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.getLogger().setLevel(logging.WARNING)
+    rddl_dir, corpus = resolve_corpus(args.corpus, args)
+    print(f"🔍 Profiling RDDLDataAnalyzer on {rddl_dir} ({args.workers} worker(s), "
+          f"cProfile {'off' if args.no_cprofile else 'on'}, tracemalloc {'off' if args.no_tracemalloc else 'on'})")
+    if args.workers > 1:
+        print("⚠️  Per-file analysis runs in child processes; hot spots cover only the parent")
+
+    report, stats = profile_analysis(rddl_dir, workers=args.workers, use_cache=args.cache,
+                                     profile=not args.no_cprofile, trace_memory=not args.no_tracemalloc,
+                                     frames=args.frames, top=args.top)
+    print_report(report, args.top)
+
+    if not args.no_save:
+        revision, dirty = git_revision()
+        document = {'timestamp': datetime.now().isoformat(), 'revision': revision, 'dirty': dirty,
+                    'corpus': corpus or {'path': str(rddl_dir)},
+                    'config': {'workers': args.workers, 'cache': args.cache, 'cprofile': not args.no_cprofile,
+                               'tracemalloc': not args.no_tracemalloc, 'frames': args.frames},
+                    **report}
+        print(f"\n📁 Profile saved: {save_report(document, stats)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,410 @@
+"""
+RDDL Stub Server
+
+Minimal local stand-in for the RDDL REST API used by the collectors.
+Serves paginated artifact metadata and artifact downloads from memory so
+collectors can be tested and benchmarked without VPN access.
+
+With fault_rate > 0 a seeded fraction of GET requests fails the way a flaky
+gateway does (see FAULTS): 502, 503/429 with Retry-After, a connection reset
+before the response, or a body cut off halfway. With rate_limit set, requests
+beyond that many per second are answered 429 like a throttling gateway.
+
+latency delays every response; bandwidth (bytes/s per connection) paces
+response bodies and upload reads, so transfer time grows with artifact size
+the way it does over the VPN. size_distribution() draws artifact sizes for
+make_artifacts from fixed, uniform, lognormal or CI-like mixes.
+"""
+import sys
+import json
+import math
+import random
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from functools import partial
+from http.server import BaseHTTPRequestHandler, SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from src.rate_limiter import TokenBucket
+
+
+# Kinds of injected GET failures, picked uniformly
+FAULTS = ("502", "503", "429", "reset", "truncate")
+# Chunk size used when pacing bodies to a bandwidth
+PACE_CHUNK = 64 * 1024
+SIZE_UNITS = {"K": 2**10, "M": 2**20, "G": 2**30}
+
+
+def parse_size(text):
+    """Bytes from '4096', '64K', '1.5M' or '2G' (binary units)"""
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in SIZE_UNITS:
+        return int(float(text[:-1]) * SIZE_UNITS[text[-1]])
+    return int(text)
+
+
+def size_distribution(spec, count, seed=0):
+    """Artifact sizes in bytes drawn from a spec:
+
+    fixed:SIZE, uniform:MIN:MAX, lognormal:MEDIAN:SIGMA, or ci (mostly
+    4-64 KB logs, every 20th a 1-8 MB capture, like a PWRLIB72 run).
+    Sizes take K/M/G suffixes (see parse_size).
+    """
+    rng = random.Random(seed)
+    kind, *args = spec.split(":")
+    if kind == "fixed":
+        return [parse_size(args[0])] * count
+    if kind == "uniform":
+        return [rng.randint(parse_size(args[0]), parse_size(args[1])) for _ in range(count)]
+    if kind == "lognormal":
+        median, sigma = parse_size(args[0]), float(args[1])
+        return [max(1, int(rng.lognormvariate(math.log(median), sigma))) for _ in range(count)]
+    if kind == "ci":
+        return [rng.randint(2**20, 8 * 2**20) if i % 20 == 19 else rng.randint(4096, 65536) for i in range(count)]
+    raise ValueError(f"Unknown size distribution: {spec}")
+
+
+def paced_write(wfile, body, bandwidth=None):
+    """Write body at about bandwidth bytes/s, or at once when bandwidth is None"""
+    if not bandwidth:
+        wfile.write(body)
+        return
+    for start in range(0, len(body), PACE_CHUNK):
+        chunk = body[start:start + PACE_CHUNK]
+        wfile.write(chunk)
+        time.sleep(len(chunk) / bandwidth)
+
+
+def make_artifacts(count, size=1024, prefix="artifact", sizes=None, names=None):
+    """Build a list of synthetic artifacts: (artifact_id, filename, content).
+
+    sizes overrides size per artifact. names cycles through a fixed list of
+    file names, the way every PWRLIB72 run uploads another report.xml.
+    """
+    artifacts = []
+    for i in range(count):
+        extension = (".log", ".xml", "")[i % 3]
+        size = sizes[i] if sizes else size
+        content = (f"{prefix} {i} " * (size // 8 + 1)).encode()[:size]
+        filename = names[i % len(names)] if names else f"{prefix}_{i}{extension}"
+        artifacts.append((f"{i:032x}", filename, content))
+    return artifacts
+
+
+class RDDLStubHandler(BaseHTTPRequestHandler):
+    """Request handler implementing the subset of the RDDL API the collectors use"""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.send_body(body)
+
+    def send_body(self, body):
+        """Write a response body, or only its first half when a truncate fault is pending"""
+        if getattr(self, "truncate", False):
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        paced_write(self.wfile, body, self.server.stub.bandwidth)
+
+    def inject_fault(self, fault):
+        """Fail the current request; returns True if no response should follow"""
+        if fault == "reset":
+            self.close_connection = True
+            return True
+        if fault == "truncate":
+            self.truncate = True
+            return False
+        headers = {"Retry-After": self.server.stub.retry_after} if fault in ("503", "429") else None
+        self.send_json(int(fault), {"type": "InjectedFault", "message": fault}, headers)
+        return True
+
+    def read_body(self):
+        """Read a request body sent with Content-Length or chunked encoding"""
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return bytes(body)
+                body += self.rfile.read(size)
+                self.rfile.readline()
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.server.stub.bandwidth:
+            time.sleep(len(body) / self.server.stub.bandwidth)
+        return body
+
+    def do_POST(self):
+        stub = self.server.stub
+        parsed = urlparse(self.path)
+        parts = parsed.path.strip("/").split("/")
+        stub.record_request(self.command, parsed.path)
+        self.truncate = False
+        body = self.read_body()
+        if stub.take_throttle():
+            return self.inject_fault("429")
+
+        # /api/v1/projects/<key>/artifacts
+        if len(parts) != 5 or parts[:3] != ["api", "v1", "projects"] or parts[4] != "artifacts":
+            return self.send_json(404, {"type": "ResourceNotFound", "message": "Unknown path"})
+
+        time.sleep(stub.latency)
+        if stub.take_upload_failure():
+            return self.send_json(503, {"type": "ServiceUnavailable", "message": "Injected failure"})
+        filename = self.headers.get("Filename")
+        if not filename:
+            return self.send_json(400, {"type": "Validation", "message": "Filename header required"})
+
+        artifact_id = stub.add_upload(parts[3], filename, body, self.headers.get("Metadata"))
+        return self.send_json(201, {"artifactID": artifact_id})
+
+    def do_GET(self):
+        stub = self.server.stub
+        parsed = urlparse(self.path)
+        parts = parsed.path.strip("/").split("/")
+        stub.record_request(self.command, parsed.path, self.headers.get("Range"))
+        self.truncate = False
+        if stub.take_throttle():
+            return self.inject_fault("429")
+        fault = stub.pick_fault()
+        if fault and self.inject_fault(fault):
+            return
+
+        # /api/v1/projects/<key>/artifacts/metadata and /api/v1/projects/<key>/artifacts/<id>
+        if len(parts) != 6 or parts[:3] != ["api", "v1", "projects"] or parts[4] != "artifacts":
+            return self.send_json(404, {"type": "ResourceNotFound", "message": "Unknown path"})
+
+        project_key = parts[3]
+        if project_key not in stub.projects:
+            return self.send_json(404, {"type": "ResourceNotFound",
+                                        "message": f"The project '{project_key}' could not be found."})
+
+        time.sleep(stub.latency)
+
+        if parts[5] == "metadata":
+            query = parse_qs(parsed.query)
+            page_size = int(query.get("pageSize", ["25"])[0])
+            page_number = int(query.get("pageNumber", ["1"])[0])
+            if page_number < 1:
+                return self.send_json(400, {"type": "Validation",
+                                            "message": "Field validation for 'PageNumber' failed on the 'min' tag"})
+            start = (page_number - 1) * page_size
+            page = stub.projects[project_key][start:start + page_size]
+            payload = {"data": [stub.metadata_entry(a) for a in page]}
+            if stub.include_total:
+                payload["totalCount"] = len(stub.projects[project_key])
+            return self.send_json(200, payload)
+
+        artifact = stub.find_artifact(project_key, parts[5])
+        if artifact is None:
+            return self.send_json(404, {"type": "ResourceNotFound", "message": "Artifact not found"})
+
+        content = artifact[2]
+        status = 200
+        range_header = self.headers.get("Range", "")
+        if range_header.startswith("bytes=") and range_header.endswith("-"):
+            start = int(range_header[len("bytes="):-1])
+            if start >= len(content):
+                return self.send_json(416, {"type": "RangeNotSatisfiable", "message": range_header})
+            status, total, content = 206, len(content), content[start:]
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{total - 1}/{total}")
+        self.end_headers()
+        self.send_body(content)
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer that does not print clients hanging up mid-response"""
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class QuietFileHandler(SimpleHTTPRequestHandler):
+    """Directory listing / file handler without request logging"""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_head(self):
+        time.sleep(self.server.latency)
+        return super().send_head()
+
+    def copyfile(self, source, outputfile):
+        paced_write(outputfile, source.read(), self.server.bandwidth)
+
+
+class RDDLStubServer:
+    """Threaded in-memory RDDL API server bound to localhost"""
+
+    def __init__(self, projects=None, latency=0.0, include_total=False, upload_failures=0,
+                 fault_rate=0.0, seed=0, retry_after="0", rate_limit=None, bandwidth=None):
+        # projects: {project_key: [(artifact_id, filename, content), ...]}
+        self.projects = projects or {}
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.include_total = include_total
+        # The next `upload_failures` uploads are answered with 503
+        self.upload_failures = upload_failures
+        # Fraction of GETs that fail with one of FAULTS; counts per kind in self.faults
+        self.fault_rate = fault_rate
+        self.retry_after = retry_after
+        self.faults = {fault: 0 for fault in FAULTS}
+        # Requests per second served before answering 429; throttled ones counted in self.throttled
+        self._rate_bucket = TokenBucket(rate_limit) if rate_limit else None
+        self.throttled = 0
+        self._random = random.Random(seed)
+        self.requests = []
+        self.range_requests = []
+        self.uploads = []
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record_request(self, method, path, range_header=None):
+        with self._lock:
+            self.requests.append((method, path))
+            if range_header:
+                self.range_requests.append((path, range_header))
+
+    def pick_fault(self):
+        """Kind of fault to inject into the next GET, or None"""
+        with self._lock:
+            if not self.fault_rate or self._random.random() >= self.fault_rate:
+                return None
+            fault = self._random.choice(FAULTS)
+            self.faults[fault] += 1
+            return fault
+
+    def take_throttle(self):
+        """True if the current request exceeds rate_limit"""
+        if self._rate_bucket is None or not self._rate_bucket.try_acquire():
+            return False
+        with self._lock:
+            self.throttled += 1
+        return True
+
+    def take_upload_failure(self):
+        with self._lock:
+            if self.upload_failures > 0:
+                self.upload_failures -= 1
+                return True
+            return False
+
+    def add_upload(self, project_key, filename, content, metadata=None):
+        """Store an uploaded artifact so it shows up in later listings"""
+        with self._lock:
+            artifact_id = hashlib.md5(f"{project_key}/{len(self.uploads)}/{filename}".encode()).hexdigest()
+            self.uploads.append({"project_key": project_key, "filename": filename,
+                                 "size": len(content), "metadata": metadata})
+            self.projects.setdefault(project_key, []).append((artifact_id, filename, content))
+        return artifact_id
+
+    def find_artifact(self, project_key, artifact_id):
+        for artifact in self.projects.get(project_key, []):
+            if artifact[0] == artifact_id:
+                return artifact
+        return None
+
+    def metadata_entry(self, artifact):
+        """Render an artifact the way /artifacts/metadata returns it"""
+        artifact_id, filename, content = artifact
+        content_type = "application/xml" if filename.endswith(".xml") else "application/octet-stream"
+        return {
+            "artifactID": artifact_id,
+            "dateCreated": datetime(2025, 7, 14, tzinfo=timezone.utc).isoformat(),
+            "description": f"Auto-uploaded log file {filename}",
+            "rawDataFile": {
+                "contentType": content_type,
+                "fileName": filename,
+                "fileSize": len(content),
+                "md5": hashlib.md5(content).hexdigest(),
+                "path": f"rddl/{artifact_id}"
+            },
+            "tags": ["ci", "automation", "logs"],
+            "version": 1
+        }
+
+    def start(self):
+        self._httpd = QuietHTTPServer(("127.0.0.1", 0), RDDLStubHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+class StaticFileServer:
+    """Serves a local directory over HTTP, standing in for the MTB web server listing"""
+
+    def __init__(self, directory, latency=0.0, bandwidth=None):
+        self.directory = str(directory)
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self._httpd = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        handler = partial(QuietFileHandler, directory=self.directory)
+        self._httpd = QuietHTTPServer(("127.0.0.1", 0), handler)
+        self._httpd.daemon_threads = True
+        self._httpd.latency = self.latency
+        self._httpd.bandwidth = self.bandwidth
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -0,0 +1,103 @@
+"""
+Analysis Cache
+
+Persistent per-file cache of RDDLDataAnalyzer results. Entries are keyed on the
+file path and validated against its size, mtime and the analyzer rules version,
+so repeat runs only analyze new or changed files and merge in cached results.
+The content hash of every cached analysis is stored alongside it: a file whose
+mtime changed but whose size did not (a fresh checkout, a copy, a touch) is
+re-hashed and keeps its entry when the content is the same.
+"""
+import os
+import json
+import sqlite3
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_analyses (
+    path          TEXT PRIMARY KEY,
+    size          INTEGER NOT NULL,
+    mtime_ns      INTEGER NOT NULL,
+    content_hash  TEXT,
+    version       TEXT NOT NULL,
+    analysis      TEXT NOT NULL
+)
+"""
+
+
+class AnalysisCache:
+    """SQLite-backed cache of per-file analyses for one analyzer rules version"""
+
+    # Rows fetched per SELECT ... IN query, below SQLite's host parameter limit
+    BATCH = 500
+
+    def __init__(self, db_path, version, rehash=None):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.version = version
+        # rehash(path) -> the content_hash an analysis of path would report; None trusts mtime only
+        self.rehash = rehash
+        self._conn = sqlite3.connect(str(self.db_path))
+        with self._conn:
+            self._conn.execute(SCHEMA)
+
+    def lookup(self, file_paths):
+        """Split file_paths into ({path: cached analysis}, [paths needing analysis])"""
+        rows = {row[0]: row[1:] for row in self._conn.execute(
+            "SELECT path, size, mtime_ns, content_hash, version FROM file_analyses")}
+
+        hits, touched, misses = [], [], []
+        for file_path in file_paths:
+            row = rows.get(str(file_path))
+            if row is not None:
+                size, mtime_ns, content_hash, version = row
+                stat = os.stat(file_path)
+                if version == self.version and size == stat.st_size:
+                    if mtime_ns == stat.st_mtime_ns:
+                        hits.append(file_path)
+                        continue
+                    if content_hash and self.rehash and self.rehash(file_path) == content_hash:
+                        hits.append(file_path)
+                        touched.append((stat.st_mtime_ns, str(file_path)))
+                        continue
+            misses.append(file_path)
+
+        if touched:
+            with self._conn:
+                self._conn.executemany("UPDATE file_analyses SET mtime_ns = ? WHERE path = ?", touched)
+        return self._load(hits), misses
+
+    def _load(self, file_paths):
+        """{path: analysis} for paths known to be cached, parsing only their rows"""
+        by_key = {str(file_path): file_path for file_path in file_paths}
+        keys = list(by_key)
+        analyses = {}
+        for start in range(0, len(keys), self.BATCH):
+            batch = keys[start:start + self.BATCH]
+            query = f"SELECT path, analysis FROM file_analyses WHERE path IN ({','.join('?' * len(batch))})"
+            for path, analysis in self._conn.execute(query, batch):
+                analyses[by_key[path]] = json.loads(analysis)
+        return analyses
+
+    def store(self, file_paths, analyses):
+        """Cache fresh analyses; analyses that ended in an error are not cached"""
+        rows = []
+        for file_path, analysis in zip(file_paths, analyses):
+            if 'error' in analysis:
+                continue
+            stat = os.stat(file_path)
+            rows.append((str(file_path), stat.st_size, stat.st_mtime_ns, analysis.get('content_hash'),
+                         self.version, json.dumps(analysis, ensure_ascii=False)))
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO file_analyses VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def prune(self, file_paths):
+        """Drop entries for files that no longer exist under the analyzed tree"""
+        keep = {str(file_path) for file_path in file_paths}
+        stale = [(path,) for (path,) in self._conn.execute("SELECT path FROM file_analyses") if path not in keep]
+        with self._conn:
+            self._conn.executemany("DELETE FROM file_analyses WHERE path = ?", stale)
+        return len(stale)
+
+    def close(self):
+        self._conn.close()
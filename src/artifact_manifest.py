@@ -0,0 +1,113 @@
+"""
+Artifact Manifest
+
+Persistent SQLite index of downloaded artifacts used for incremental collection.
+Each row records what was fetched for an artifact (server id, size and md5, local
+path, sha256 and file stat), so later runs can skip unchanged artifacts and
+resume interrupted downloads instead of re-downloading the whole project.
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+try:
+    from src.streaming_download import hash_file
+except ImportError:  # running as a script from src/
+    from streaming_download import hash_file
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    project_key   TEXT NOT NULL,
+    artifact_id   TEXT NOT NULL,
+    filename      TEXT,
+    path          TEXT,
+    file_size     INTEGER,
+    md5           TEXT,
+    date_created  TEXT,
+    status        TEXT NOT NULL,
+    bytes         INTEGER,
+    sha256        TEXT,
+    mtime_ns      INTEGER,
+    updated_at    TEXT,
+    PRIMARY KEY (project_key, artifact_id)
+)
+"""
+
+
+class ArtifactManifest:
+    """Thread-safe SQLite manifest of artifacts under a collection root"""
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute(SCHEMA)
+
+    def get(self, project_key, artifact_id):
+        """Return the manifest row for an artifact as a dict, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM artifacts WHERE project_key = ? AND artifact_id = ?",
+                (project_key, artifact_id)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def matches_server(self, entry, artifact):
+        """True if the entry was recorded for the same server-side artifact content"""
+        return (entry is not None
+                and entry['file_size'] == artifact.get('fileSize', 0)
+                and (entry['md5'] or '') == (artifact.get('md5') or ''))
+
+    def is_unchanged(self, entry, artifact, save_path):
+        """True if a completed download is still valid on disk and on the server"""
+        if not self.matches_server(entry, artifact) or entry['status'] != 'complete':
+            return False
+        if entry['path'] != str(save_path) or not os.path.exists(save_path):
+            return False
+
+        stat = os.stat(save_path)
+        if stat.st_size != entry['bytes']:
+            return False
+        if stat.st_mtime_ns == entry['mtime_ns']:
+            return True
+
+        # File was touched since it was recorded: verify the content hash
+        size, sha256 = hash_file(save_path)
+        if sha256 != entry['sha256']:
+            return False
+        self._update_mtime(entry, stat.st_mtime_ns)
+        return True
+
+    def mark_partial(self, project_key, artifact, save_path):
+        """Record that a download of this artifact to save_path has started"""
+        self._upsert(project_key, artifact, save_path, 'partial', None, None, None)
+
+    def mark_complete(self, project_key, artifact, save_path, size, sha256):
+        """Record a finished download and the stat of the file it produced"""
+        mtime_ns = os.stat(save_path).st_mtime_ns
+        self._upsert(project_key, artifact, save_path, 'complete', size, sha256, mtime_ns)
+
+    def _upsert(self, project_key, artifact, save_path, status, size, sha256, mtime_ns):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (project_key, artifact['id'], artifact.get('filename'), str(save_path),
+                 artifact.get('fileSize', 0), artifact.get('md5') or '', artifact.get('dateCreated', ''),
+                 status, size, sha256, mtime_ns, datetime.now().isoformat())
+            )
+
+    def _update_mtime(self, entry, mtime_ns):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE artifacts SET mtime_ns = ? WHERE project_key = ? AND artifact_id = ?",
+                (mtime_ns, entry['project_key'], entry['artifact_id'])
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,174 @@
+"""
+Blob Store
+
+Content-addressed local artifact store. Every distinct file content is kept once
+under blobs/<aa>/<bb>/<sha256>; the per-project logs/, xml/ and other/ folders
+hold hardlinks to those blobs. A SQLite index maps sha256 (plus the server's md5
+as an alias) to blobs and records which view paths point at each blob, so
+"have we already got this content?" and duplicate detection are O(1) lookups
+and a duplicate artifact costs neither disk space nor download bandwidth.
+
+Usage: python src/blob_store.py <dir> [<dir> ...]   (dedupe existing folders)
+"""
+import os
+import sys
+import shutil
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+
+try:
+    from src.streaming_download import hash_file
+except ImportError:  # running as a script from src/
+    from streaming_download import hash_file
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256  TEXT PRIMARY KEY,
+    md5     TEXT,
+    size    INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS blobs_md5 ON blobs (md5);
+CREATE TABLE IF NOT EXISTS views (
+    path    TEXT PRIMARY KEY,
+    sha256  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS views_sha256 ON views (sha256);
+"""
+
+
+class BlobStore:
+    """Thread-safe content-addressed store with hardlinked views"""
+
+    def __init__(self, root="data/blobs"):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / "index.sqlite"), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def blob_path(self, sha256):
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def contains(self, sha256):
+        return self.blob_path(sha256).exists()
+
+    def lookup_md5(self, md5):
+        """sha256 of a stored blob whose md5 (as reported by the server) matches, or None"""
+        if not md5:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT sha256 FROM blobs WHERE md5 = ?", (md5,)).fetchone()
+        if row and self.contains(row[0]):
+            return row[0]
+        return None
+
+    def ingest(self, path, sha256, size=None, md5=None):
+        """Move the content of path into the store and turn path into a view of it.
+
+        Returns True if the content was new, False if it was already stored
+        (in which case path is replaced by a link to the existing blob).
+        """
+        path = Path(path)
+        blob = self.blob_path(sha256)
+        size = path.stat().st_size if size is None else size
+        blob.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            is_new = not blob.exists()
+            if is_new:
+                try:
+                    os.link(path, blob)
+                except OSError:
+                    shutil.copy2(path, blob)
+            with self._conn:
+                self._conn.execute("INSERT OR IGNORE INTO blobs VALUES (?, ?, ?)", (sha256, md5 or None, size))
+                if md5:
+                    self._conn.execute("UPDATE blobs SET md5 = ? WHERE sha256 = ? AND md5 IS NULL", (md5, sha256))
+
+        if not is_new and not os.path.samefile(path, blob):
+            self._link_into_place(blob, path)
+        self._record_view(path, sha256)
+        return is_new
+
+    def add_file(self, path, md5=None):
+        """Hash an existing file and ingest it. Returns (sha256, is_new)."""
+        size, sha256 = hash_file(path)
+        return sha256, self.ingest(path, sha256, size, md5)
+
+    def link(self, sha256, view_path):
+        """Materialize a stored blob at view_path without downloading it again"""
+        view_path = Path(view_path)
+        view_path.parent.mkdir(parents=True, exist_ok=True)
+        self._link_into_place(self.blob_path(sha256), view_path)
+        self._record_view(view_path, sha256)
+
+    def size(self, sha256):
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+        return row[0] if row else None
+
+    def views(self, sha256):
+        """All recorded view paths of a blob"""
+        with self._lock:
+            rows = self._conn.execute("SELECT path FROM views WHERE sha256 = ? ORDER BY path", (sha256,)).fetchall()
+        return [row[0] for row in rows]
+
+    def duplicates(self):
+        """{sha256: [view paths]} for every blob referenced by more than one view"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sha256, path FROM views WHERE sha256 IN "
+                "(SELECT sha256 FROM views GROUP BY sha256 HAVING COUNT(*) > 1) ORDER BY sha256, path"
+            ).fetchall()
+        groups = {}
+        for sha256, path in rows:
+            groups.setdefault(sha256, []).append(path)
+        return groups
+
+    def _link_into_place(self, blob, view_path):
+        """Atomically replace view_path with a hardlink (or copy) of blob"""
+        tmp_path = view_path.with_name(view_path.name + ".link")
+        if tmp_path.exists():
+            tmp_path.unlink()
+        try:
+            os.link(blob, tmp_path)
+        except OSError:
+            shutil.copy2(blob, tmp_path)
+        os.replace(tmp_path, view_path)
+
+    def _record_view(self, view_path, sha256):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO views VALUES (?, ?)", (str(view_path), sha256))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    """Dedupe existing download folders into the blob store"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    directories = sys.argv[1:] or ["data/rddl_downloads", "data/focused_collection", "data/logs"]
+    store = BlobStore(os.getenv("BLOB_STORE_DIR", "data/blobs"))
+
+    files = duplicate_bytes = 0
+    for directory in directories:
+        for path in sorted(Path(directory).rglob('*')):
+            if not path.is_file() or path.suffix in ('.json', '.sqlite', '.part'):
+                continue
+            sha256, is_new = store.add_file(path)
+            files += 1
+            if not is_new:
+                duplicate_bytes += path.stat().st_size
+                logging.info(f"🔗 {path} -> {sha256[:12]} (duplicate)")
+
+    print(f"📦 Files ingested: {files}")
+    print(f"🔄 Duplicate groups: {len(store.duplicates())}")
+    print(f"💾 Disk saved by deduplication: {duplicate_bytes:,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,32 @@ Module to download log/xml files from a remote server and upload them to R&D Dat
 """
 import os
 import sys
+import json
+import queue
 import logging
 import mimetypes
+import threading
 from urllib.parse import urljoin
 import requests
-from bs4 import BeautifulSoup
+
+try:
+    from src.streaming_download import stream_to_file, hash_file
+    from src.rddl_async_client import AsyncRDDLClient
+    from src.blob_store import BlobStore
+    from src.upload_index import UploadIndex
+    from src.http_mirror import MirrorState, extract_links, fetch_listing, mirror_file, NOT_MODIFIED
+    from src.rate_limiter import RateLimiter
+    from src.rddl_transport import RetryingSession
+    from src.metrics import Metrics
+except ImportError:  # running as a script from src/
+    from streaming_download import stream_to_file, hash_file
+    from rddl_async_client import AsyncRDDLClient
+    from blob_store import BlobStore
+    from upload_index import UploadIndex
+    from http_mirror import MirrorState, extract_links, fetch_listing, mirror_file, NOT_MODIFIED
+    from rate_limiter import RateLimiter
+    from rddl_transport import RetryingSession
+    from metrics import Metrics
 
 # Configure logging
 logging.basicConfig(
@@ -27,6 +48,7 @@ if not RDDL_API_TOKEN:
     sys.exit(1)
 
 ARTIFACT_UPLOAD_URL = f"{BASE_URL}/api/v1/projects/{PROJECT_KEY}/artifacts"
+ARTIFACT_METADATA_URL = f"{ARTIFACT_UPLOAD_URL}/metadata"
 HEADERS = {
     "Authorization": f"Bearer {RDDL_API_TOKEN}",
 }
@@ -34,72 +56,304 @@ HEADERS = {
 LOGS_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'logs')
 os.makedirs(LOGS_DIR, exist_ok=True)
 
+# Optional content-addressed store; LOGS_DIR files become hardlinks into it
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR")
+BLOB_STORE = BlobStore(BLOB_STORE_DIR) if BLOB_STORE_DIR else None
+
+# Pipeline stages: worker threads per stage and capacity of the queues between them
+DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", "4"))
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "4"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+
+# Cached listing of the project's artifacts; files already in the data lake are not re-uploaded.
+# Set UPLOAD_INDEX_PATH to an empty string to upload everything.
+UPLOAD_INDEX_PATH = os.getenv("UPLOAD_INDEX_PATH", os.path.join(os.path.dirname(__file__), '..', 'data', 'upload_index.sqlite'))
+
+# Mirroring mode: ETag/Last-Modified per file, so unchanged files come back as 304 without a body.
+# Set MIRROR_STATE_PATH to an empty string to download everything unconditionally.
+MIRROR_STATE_PATH = os.getenv("MIRROR_STATE_PATH", os.path.join(os.path.dirname(__file__), '..', 'data', 'mirror_state.sqlite'))
+FILE_SUFFIXES = ('.log', '.xml')
+
 def guess_content_type(filename):
     """Guess the MIME type for a file."""
     content_type, _ = mimetypes.guess_type(filename)
     return content_type or "application/octet-stream"
 
 def upload_file(local_file, headers, upload_url):
-    """Upload a file to the R&D Data Lake."""
+    """Upload a file to the R&D Data Lake, streaming the body from the file handle."""
     with open(local_file, "rb") as f:
-        file_data = f.read()
-    response = requests.post(
-        upload_url,
-        headers=headers,
-        data=file_data,
-        timeout=60
-    )
+        response = requests.post(
+            upload_url,
+            headers=headers,
+            data=f,
+            timeout=60
+        )
     return response
 
+def build_upload_headers(local_file):
+    """Headers for uploading one artifact."""
+    content_type = guess_content_type(local_file)
+    metadata = {"description": f"Auto-uploaded log file {local_file}", "tags": ["ci", "automation", "logs"]}
+    return {
+        "Authorization": f"Bearer {RDDL_API_TOKEN}",
+        "Filename": local_file,
+        "Metadata": json.dumps(metadata),
+        "ContentType": content_type,
+        "content-type": content_type,
+        "Content-Type": content_type
+    }
+
+def download_file(file_link, metrics=None):
+    """Stream one file from the web server into LOGS_DIR. Returns the local path."""
+    file_url = urljoin(SERVER_URL, file_link)
+    log_path = os.path.join(LOGS_DIR, os.path.basename(file_link))
+    logging.info("Downloading %s ...", file_url)
+    file_resp = requests.get(file_url, timeout=30, stream=True)
+    file_resp.raise_for_status()
+    size, sha256 = stream_to_file(file_resp, log_path, metrics=metrics)
+    logging.info("Downloaded %s (%d bytes, sha256 %s).", log_path, size, sha256)
+    if BLOB_STORE:
+        BLOB_STORE.ingest(log_path, sha256, size)
+    return log_path
+
+def mirror_download(file_link, state, session=requests):
+    """Conditionally fetch one file into LOGS_DIR.
+
+    Returns (local path, needs_upload): a 304 for a file whose current copy
+    already reached the data lake needs no upload.
+    """
+    file_url = urljoin(SERVER_URL, file_link)
+    log_path = os.path.join(LOGS_DIR, os.path.basename(file_link))
+    status, entry = mirror_file(session, file_url, log_path, state)
+    if status == NOT_MODIFIED:
+        logging.info("Not modified: %s", file_url)
+        return log_path, not entry['uploaded']
+    logging.info("Downloaded %s (%d bytes, sha256 %s).", log_path, entry['size'], entry['sha256'])
+    if BLOB_STORE:
+        BLOB_STORE.ingest(log_path, entry['sha256'], entry['size'])
+    return log_path, True
+
+
+class UploadPipeline:
+    """Listing -> download -> upload stages connected by bounded queues.
+
+    Each stage runs its own worker threads, so the web server and the data lake
+    are kept busy at the same time while the queues cap how far downloads can
+    run ahead of uploads. Per-file download, write and upload times go into
+    self.metrics.
+    """
+
+    def __init__(self, download_workers=DOWNLOAD_WORKERS, upload_workers=UPLOAD_WORKERS,
+                 queue_size=PIPELINE_QUEUE_SIZE, index=None, mirror=None, metrics=None):
+        self.download_workers = max(1, download_workers)
+        self.upload_workers = max(1, upload_workers)
+        self.download_queue = queue.Queue(maxsize=queue_size)
+        self.upload_queue = queue.Queue(maxsize=queue_size)
+        # Optional UploadIndex: files the data lake already holds are skipped
+        self.index = index
+        # Optional MirrorState: downloads become conditional GETs
+        self.mirror = mirror
+        self.metrics = metrics or Metrics()
+        # Keep-alive connections to the web server, shared by the download workers
+        self.session = requests.Session()
+        self.stats = {"downloaded": 0, "uploaded": 0, "download_failures": 0, "upload_failures": 0,
+                      "skipped": 0, "bytes_uploaded": 0, "bytes_saved": 0, "not_modified": 0}
+        self._lock = threading.Lock()
+
+    def count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def download_stage(self):
+        while True:
+            file_link = self.download_queue.get()
+            if file_link is None:
+                return
+            try:
+                with self.metrics.tracking("downloads"), self.metrics.timer("download") as timing:
+                    if self.mirror:
+                        log_path, needs_upload = mirror_download(file_link, self.mirror, self.session)
+                    else:
+                        log_path, needs_upload = download_file(file_link, self.metrics), True
+                    timing["bytes"] = os.path.getsize(log_path)
+            except Exception as e:
+                logging.error("Failed to download %s: %s", file_link, e)
+                self.count("download_failures")
+                continue
+            if not needs_upload:
+                self.count("not_modified")
+                continue
+            self.count("downloaded")
+            self.upload_queue.put(log_path)
+
+    def upload_stage(self):
+        while True:
+            log_path = self.upload_queue.get()
+            if log_path is None:
+                return
+            # Any error ends this file only: a dead uploader would leave run() waiting forever
+            try:
+                self.upload_one(log_path)
+            except Exception as e:
+                logging.error("Failed to upload %s: %s", os.path.basename(log_path), e)
+                self.count("upload_failures")
+
+    def upload_one(self, log_path):
+        """Upload one downloaded file unless the data lake already holds it."""
+        local_file = os.path.basename(log_path)
+        size, md5 = hash_file(log_path, hash_name="md5") if self.index else (os.path.getsize(log_path), None)
+        if self.index and self.index.find(local_file, size, md5):
+            logging.info("Skipping %s: identical artifact already in the data lake.", local_file)
+            self.count("skipped")
+            self.count("bytes_saved", size)
+            if self.mirror:
+                self.mirror.mark_uploaded(log_path)
+            return
+        upload_headers = build_upload_headers(local_file)
+        logging.info("Uploading %s to R&D Data Lake ...", local_file)
+        with self.metrics.tracking("uploads"), self.metrics.timer("upload") as timing:
+            upload_resp = upload_file(log_path, upload_headers, ARTIFACT_UPLOAD_URL)
+            if upload_resp.status_code == 201:
+                timing["bytes"] = size
+        if upload_resp.status_code != 201:
+            logging.error("Failed to upload %s. Status: %s, Response: %s", local_file, upload_resp.status_code, upload_resp.text)
+            self.count("upload_failures")
+            return
+        if self.index:
+            self.index.add(artifact_id(upload_resp), local_file, size, md5)
+        if self.mirror:
+            self.mirror.mark_uploaded(log_path)
+        logging.info("Uploaded %s successfully.", local_file)
+        self.count("uploaded")
+        self.count("bytes_uploaded", size)
+
+    def run(self, file_links):
+        """Feed file_links through the pipeline and wait for every stage to drain."""
+        downloaders = [threading.Thread(target=self.download_stage, daemon=True) for _ in range(self.download_workers)]
+        uploaders = [threading.Thread(target=self.upload_stage, daemon=True) for _ in range(self.upload_workers)]
+        for worker in downloaders + uploaders:
+            worker.start()
+
+        # Listing stage: blocks when downloads fall behind
+        for file_link in file_links:
+            self.download_queue.put(file_link)
+        for _ in downloaders:
+            self.download_queue.put(None)
+        for worker in downloaders:
+            worker.join()
+
+        self.session.close()
+
+        for _ in uploaders:
+            self.upload_queue.put(None)
+        for worker in uploaders:
+            worker.join()
+        return self.stats
+
+def artifact_id(response):
+    """artifactID from an upload response body, if it has one"""
+    try:
+        return response.json().get("artifactID")
+    except Exception:
+        return None
+
+def open_upload_index(session):
+    """UploadIndex for PROJECT_KEY refreshed from the metadata endpoint, or None when disabled.
+
+    session should retry failed pages (RetryingSession): one lost page leaves
+    the cached listing in place for the whole run.
+    """
+    if not UPLOAD_INDEX_PATH:
+        return None
+    index = UploadIndex(UPLOAD_INDEX_PATH, PROJECT_KEY)
+    listed = index.refresh(session, ARTIFACT_METADATA_URL)
+    if listed is None:
+        logging.warning("Could not refresh the artifact index; using the cached listing (%d artifacts).", len(index))
+    else:
+        logging.info("Artifact index refreshed: %d artifacts in %s.", listed, PROJECT_KEY)
+    return index
+
+async def upload_files_async(local_files, project_key=PROJECT_KEY, max_concurrency=8, retries=3,
+                             rate_limiter=None, metrics=None):
+    """Upload local files as one batch through AsyncRDDLClient.upload_batch.
+
+    Bodies are streamed from the files over one pooled session, largest files
+    first, with per-file retries, paced by the process-wide rate limiter unless
+    another one is given. Returns a list of (local_file, status_code,
+    response_text) in input order.
+    """
+    async with AsyncRDDLClient(RDDL_API_TOKEN, base_url=BASE_URL, max_concurrency=max_concurrency,
+                               rate_limiter=rate_limiter or RateLimiter.shared(), metrics=metrics) as client:
+        results, summary = await client.upload_batch(project_key, local_files, retries=retries)
+
+    for local_file, result in zip(local_files, results):
+        if result['status'] == 201:
+            logging.info("Uploaded %s successfully.", local_file)
+        else:
+            logging.error("Failed to upload %s. Status: %s, Response: %s", local_file, result['status'], result['response'])
+    logging.info("Batch upload: %d/%d files, %d bytes in %.2fs (%s MB/s, %d retries).", summary['uploaded'],
+                 summary['files'], summary['bytes'], summary['seconds'], summary['mb_per_second'], summary['retries'])
+    return [(local_file, result['status'], result['response']) for local_file, result in zip(local_files, results)]
+
+def list_file_links(mirror=None):
+    """Links to .log/.xml files in the SERVER_URL listing (conditional GET in mirroring mode)."""
+    logging.info("Fetching directory listing from %s ...", SERVER_URL)
+    if mirror:
+        file_links, status = fetch_listing(requests, SERVER_URL, mirror, suffixes=FILE_SUFFIXES)
+        logging.info("Directory listing %s (%d files).", status.replace('_', ' '), len(file_links))
+        return file_links
+    response = requests.get(SERVER_URL, timeout=15)
+    response.raise_for_status()
+    return extract_links(response.text, FILE_SUFFIXES)
+
 def main():
+    mirror = MirrorState(MIRROR_STATE_PATH) if MIRROR_STATE_PATH else None
+    metrics = Metrics()
     try:
-        logging.info("Fetching directory listing from %s ...", SERVER_URL)
-        response = requests.get(SERVER_URL, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        file_links = [a['href'] for a in soup.find_all('a', href=True) if a['href'].endswith(('.log', '.xml'))]
+        with metrics.timer("listing"):
+            file_links = list_file_links(mirror)
 
         if not file_links:
             logging.warning("No log or xml files found in the directory.")
             sys.exit(0)
 
-        for file_link in file_links:
-            file_url = urljoin(SERVER_URL, file_link)
-            local_file = os.path.basename(file_link)
-            log_path = os.path.join(LOGS_DIR, local_file)
-            logging.info("Downloading %s ...", file_url)
-            file_resp = requests.get(file_url, timeout=30)
-            file_resp.raise_for_status()
-            with open(log_path, "wb") as f:
-                f.write(file_resp.content)
-            logging.info("Downloaded %s.", log_path)
-
-            content_type = guess_content_type(local_file)
-            upload_headers = {
-                "Authorization": f"Bearer {RDDL_API_TOKEN}",
-                "Filename": local_file,
-                "Metadata": f'{{"description": "Auto-uploaded log file {local_file}", "tags": ["ci", "automation", "logs"]}}',
-                "ContentType": content_type,
-                "content-type": content_type,
-                "Content-Type": content_type
-            }
-            logging.debug("Upload headers: %s", upload_headers)  # Uncomment for troubleshooting
-            logging.info("Uploading %s to R&D Data Lake ...", local_file)
-            upload_resp = upload_file(log_path, upload_headers, ARTIFACT_UPLOAD_URL)
-            if upload_resp.status_code == 201:
-                logging.info("Uploaded %s successfully.", local_file)
-            else:
-                logging.error("Failed to upload %s. Status: %s, Response: %s", local_file, upload_resp.status_code, upload_resp.text)
+        with RetryingSession(rate_limiter=RateLimiter.shared(), metrics=metrics) as session:
+            session.headers.update(HEADERS)
+            index = open_upload_index(session)
+        try:
+            stats = UploadPipeline(index=index, mirror=mirror, metrics=metrics).run(file_links)
+        finally:
+            if index:
+                index.close()
+        logging.info("Pipeline stats: %s", stats)
+        if mirror:
+            logging.info("%d file(s) not modified since the last run.", stats["not_modified"])
+        logging.info("Uploaded %d bytes; skipped %d unchanged file(s), saving %d bytes of upload.",
+                     stats["bytes_uploaded"], stats["skipped"], stats["bytes_saved"])
+        for phase, timing in metrics.snapshot()["phases"].items():
+            logging.info("%s: %d in %.2fs (p50 %.3fs, p95 %.3fs, p99 %.3fs, %s bytes/s).", phase, timing["count"],
+                         timing["total_seconds"], timing["p50_seconds"], timing["p95_seconds"],
+                         timing["p99_seconds"], timing["bytes_per_second"])
+        if os.getenv("COLLECTOR_METRICS_PATH"):
+            metrics.export(os.getenv("COLLECTOR_METRICS_PATH"), collector="uploader")
+
         # Print files left in logs dir
         remaining = os.listdir(LOGS_DIR)
         logging.info("Files remaining in %s: %s", LOGS_DIR, remaining)
 
+        if stats["download_failures"]:
+            logging.error("%d file(s) could not be downloaded.", stats["download_failures"])
+            sys.exit(1)
+
     except requests.exceptions.RequestException as req_err:
         logging.error("Request error occurred: %s", req_err)
         sys.exit(1)
     except Exception as e:
         logging.error("An error occurred: %s", e)
         sys.exit(1)
+    finally:
+        if mirror:
+            mirror.close()
 
     logging.info("Pipeline process completed successfully.")
 
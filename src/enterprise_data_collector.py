@@ -10,30 +10,70 @@ Based on user insights: All systems are on RDDL, just different application name
 """
 import os
 import json
+import asyncio
 import logging
-import requests
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
 
+try:
+    from src.rddl_pagination import ArtifactPaginator
+    from src.rddl_async_client import AsyncRDDLClient
+    from src.rate_limiter import RateLimiter, DEFAULT_BUDGETS
+    from src.rddl_transport import RetryingSession, RetryPolicy
+    from src.metrics import Metrics
+except ImportError:  # running as a script from src/
+    from rddl_pagination import ArtifactPaginator
+    from rddl_async_client import AsyncRDDLClient
+    from rate_limiter import RateLimiter, DEFAULT_BUDGETS
+    from rddl_transport import RetryingSession, RetryPolicy
+    from metrics import Metrics
+
+# Status codes that are a definitive answer about project access and may be cached
+CACHEABLE_ACCESS_STATUSES = {200, 401, 403, 404}
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 class EnterpriseDataCollector:
-    def __init__(self):
+    def __init__(self, server_url="https://rd-datalake.icp.infineon.com",
+                 data_dir="data/enterprise_data", multi_app_dir="data/multi_app_data",
+                 discovery_workers=16, requests_per_second=None, probe_timeout=10,
+                 access_cache_ttl_hours=24, rate_limiter=None, metrics=None):
         self.token = os.getenv('RDDL_API_TOKEN')
         if not self.token:
             raise ValueError("RDDL_API_TOKEN environment variable required")
         
-        self.session = requests.Session()
+        # Every request is paced by per-endpoint budgets that adapt to 429s and slow answers;
+        # requests_per_second overrides the metadata budget of the process-wide limiter
+        if rate_limiter is None and requests_per_second is not None:
+            rate_limiter = RateLimiter(dict(DEFAULT_BUDGETS, metadata=requests_per_second))
+        self.rate_limiter = rate_limiter or RateLimiter.shared()
+        # Listing latencies and in-flight requests; written into the collection results
+        self.metrics = metrics or Metrics()
+        
+        # Fewer attempts than the collectors' default: probes should fail fast during discovery
+        self.session = RetryingSession(RetryPolicy(max_attempts=3), rate_limiter=self.rate_limiter,
+                                       metrics=self.metrics)
         self.session.headers.update({
             'Authorization': f'Bearer {self.token}',
             'Content-Type': 'application/json'
         })
         
         # Base configuration
-        self.base_url = "https://rd-datalake.icp.infineon.com/api/v1"
-        self.data_dir = Path("data/enterprise_data")
-        self.data_dir.mkdir(exist_ok=True)
+        self.server_url = server_url
+        self.base_url = f"{self.server_url}/api/v1"
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.multi_app_dir = Path(multi_app_dir)
+        
+        # Discovery: concurrent probes, bounded by the metadata budget of the rate limiter
+        self.discovery_workers = discovery_workers
+        self.probe_timeout = probe_timeout
+        
+        # Access results are cached so unchanged projects are not re-probed on every scan
+        self.access_cache_path = self.data_dir / "access_cache.json"
+        self.access_cache_ttl = timedelta(hours=access_cache_ttl_hours)
         
         # Start with confirmed working project, discover others later
         self.known_working_projects = ['PWRLIB72']
@@ -48,11 +88,88 @@ class EnterpriseDataCollector:
             'VR00196400', 'VR00196396', 'VR00473879', 'ACT', 'VR00466059'
         ]
     
+    def get_candidate_projects(self):
+        """Potential projects plus every project key already listed under data/multi_app_data"""
+        candidates = list(self.potential_projects)
+        for metadata_file in sorted(self.multi_app_dir.glob('*/*/metadata.json')):
+            try:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    project_key = json.load(f).get('project_key') or metadata_file.parent.name
+            except (OSError, ValueError):
+                project_key = metadata_file.parent.name
+            candidates.append(project_key)
+        
+        # Keep first occurrence order, skip projects already known to work
+        known = set(self.known_working_projects)
+        return [key for key in dict.fromkeys(candidates) if key not in known]
+    
+    def load_access_cache(self):
+        if not self.access_cache_path.exists():
+            return {}
+        try:
+            with open(self.access_cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            logging.warning(f"Ignoring unreadable access cache {self.access_cache_path}")
+            return {}
+    
+    def save_access_cache(self, cache):
+        tmp_path = self.access_cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.access_cache_path)
+    
+    def split_cached_access(self, project_keys, cache):
+        """Return ({key: cached result} for fresh entries, [keys that need probing]).
+        
+        Entries without a readable checked_at (older or hand-edited caches) count as stale.
+        """
+        now = datetime.now()
+        cached, stale = {}, []
+        for project_key in project_keys:
+            entry = cache.get(project_key) or {}
+            try:
+                fresh = now - datetime.fromisoformat(entry.get('checked_at')) < self.access_cache_ttl
+            except (TypeError, ValueError):
+                fresh = False
+            if fresh:
+                cached[project_key] = {k: v for k, v in entry.items() if k != 'checked_at'}
+            else:
+                stale.append(project_key)
+        return cached, stale
+    
+    def update_access_cache(self, cache, probed):
+        """Store definitive probe results; transient failures are retried next scan"""
+        checked_at = datetime.now().isoformat()
+        for project_key, access in probed.items():
+            if access['status_code'] in CACHEABLE_ACCESS_STATUSES:
+                cache[project_key] = dict(access, checked_at=checked_at)
+        self.save_access_cache(cache)
+    
+    def discover_accessible_projects(self, project_keys=None):
+        """Probe candidate projects concurrently, reusing cached results within the TTL.
+        
+        Returns {project_key: access result} in candidate order.
+        """
+        project_keys = self.get_candidate_projects() if project_keys is None else project_keys
+        cache = self.load_access_cache()
+        cached, to_probe = self.split_cached_access(project_keys, cache)
+        
+        logging.info(f"🔍 Probing {len(to_probe)} projects ({len(cached)} cached) "
+                     f"with {self.discovery_workers} workers...")
+        probed = {}
+        if to_probe:
+            with ThreadPoolExecutor(max_workers=self.discovery_workers) as executor:
+                probed = dict(zip(to_probe, executor.map(self.test_project_access, to_probe)))
+            self.update_access_cache(cache, probed)
+        
+        return {key: cached.get(key) or probed[key] for key in project_keys}
+    
     def test_project_access(self, project_key):
         """Test if we can access a specific project"""
         url = f"{self.base_url}/projects/{project_key}/artifacts/metadata"
         try:
-            response = self.session.get(url, params={'pageSize': 1})
+            response = self.session.get(url, params={'pageSize': 1}, timeout=self.probe_timeout)
             return {
                 'accessible': response.status_code == 200,
                 'status_code': response.status_code,
@@ -61,51 +178,99 @@ class EnterpriseDataCollector:
         except Exception as e:
             return {'accessible': False, 'status_code': None, 'error': str(e)}
     
-    def fetch_project_artifacts(self, project_key, max_artifacts=100):
+    def fetch_project_artifacts(self, project_key, max_artifacts=100, page_workers=4):
         """Fetch artifacts from a project with pagination"""
         url = f"{self.base_url}/projects/{project_key}/artifacts/metadata"
-        all_artifacts = []
-        page = 0
-        
-        while len(all_artifacts) < max_artifacts:
-            params = {
-                'pageSize': min(25, max_artifacts - len(all_artifacts)),
-                'page': page
-            }
-            
-            try:
-                response = self.session.get(url, params=params)
-                if response.status_code != 200:
-                    logging.warning(f"Error fetching {project_key} page {page}: {response.status_code}")
-                    break
-                
-                data = response.json()
-                artifacts = data.get('data', [])
-                
-                if not artifacts:
-                    break
-                
-                all_artifacts.extend(artifacts)
-                page += 1
-                
-                logging.info(f"{project_key}: Fetched page {page}, total artifacts: {len(all_artifacts)}")
-                
-            except Exception as e:
-                logging.error(f"Error fetching {project_key}: {e}")
-                break
+        paginator = ArtifactPaginator(self.session, url, page_size=min(100, max_artifacts),
+                                      workers=page_workers, max_items=max_artifacts,
+                                      label=project_key)
+        all_artifacts = list(paginator)
         
+        logging.info(f"{project_key}: Fetched {paginator.pages_fetched} pages, total artifacts: {len(all_artifacts)}")
         return all_artifacts
     
-    def quick_collect_known_projects(self):
-        """Quickly collect from known working projects, then discover new ones"""
-        logging.info("� Quick collection from confirmed working projects...")
+    async def fetch_project_artifacts_async(self, client, project_key, max_artifacts=100):
+        """Fetch artifacts from a project through an AsyncRDDLClient"""
+        all_artifacts = await client.list_artifacts(project_key, page_size=min(100, max_artifacts),
+                                                    max_items=max_artifacts)
+        logging.info(f"{project_key}: Fetched {len(all_artifacts)} artifacts")
+        return all_artifacts
+    
+    async def quick_collect_known_projects_async(self, max_concurrency=32):
+        """Async variant of quick_collect_known_projects: all fetches and probes share one event loop"""
+        logging.info("📥 Quick collection from confirmed working projects (async)...")
+        results = self.new_collection_results()
         
-        results = {
+        async with AsyncRDDLClient(self.token, base_url=self.server_url, max_concurrency=max_concurrency,
+                                   rate_limiter=self.rate_limiter, metrics=self.metrics) as client:
+            known = await asyncio.gather(*(self.fetch_project_artifacts_async(client, key)
+                                           for key in self.known_working_projects),
+                                         return_exceptions=True)
+            for project_key, artifacts in zip(self.known_working_projects, known):
+                self.record_working_project(results, project_key, artifacts)
+            
+            logging.info("\n🔍 Testing potential projects for new discoveries...")
+            candidates = self.get_candidate_projects()
+            cache = self.load_access_cache()
+            access, to_probe = self.split_cached_access(candidates, cache)
+            
+            probes = await asyncio.gather(*(client.test_project_access(key, timeout=self.probe_timeout)
+                                            for key in to_probe))
+            if to_probe:
+                self.update_access_cache(cache, dict(zip(to_probe, probes)))
+            access.update(zip(to_probe, probes))
+            accessible = [key for key in candidates if access[key]['accessible']]
+            discovered = await asyncio.gather(*(self.fetch_project_artifacts_async(client, key, max_artifacts=25)
+                                                for key in accessible), return_exceptions=True)
+            for project_key, artifacts in zip(accessible, discovered):
+                logging.info(f"🎉 NEW DISCOVERY: {project_key} is accessible!")
+                self.record_discovery(results, project_key, artifacts)
+        
+        return results
+    
+    def new_collection_results(self):
+        return {
             'collection_timestamp': datetime.now().isoformat(),
             'working_projects': {},
             'newly_discovered': {},
             'summary': {'total_artifacts': 0, 'working_projects': 0}
         }
+    
+    def record_working_project(self, results, project_key, artifacts):
+        """Add a known project's fetch outcome (artifact list or exception) to the results"""
+        if isinstance(artifacts, Exception):
+            logging.error(f"❌ {project_key}: {artifacts}")
+            results['working_projects'][project_key] = {'error': str(artifacts)}
+            return
+        
+        results['working_projects'][project_key] = {
+            'artifact_count': len(artifacts),
+            'sample_artifacts': artifacts[:5] if artifacts else [],
+            'status': 'confirmed_working'
+        }
+        results['summary']['total_artifacts'] += len(artifacts)
+        results['summary']['working_projects'] += 1
+        
+        logging.info(f"✅ {project_key}: {len(artifacts)} artifacts collected")
+    
+    def record_discovery(self, results, project_key, artifacts):
+        """Add a newly accessible project's fetch outcome (artifact list or exception) to the results"""
+        if isinstance(artifacts, Exception):
+            logging.error(f"❌ {project_key}: {artifacts}")
+            results['newly_discovered'][project_key] = {'error': str(artifacts)}
+            return
+        results['newly_discovered'][project_key] = {
+            'artifact_count': len(artifacts),
+            'sample_artifacts': artifacts[:3] if artifacts else []
+        }
+        results['summary']['total_artifacts'] += len(artifacts)
+        results['summary']['working_projects'] += 1
+    
+    def quick_collect_known_projects(self):
+        """Quickly collect from known working projects, then discover new ones"""
+        logging.info("� Quick collection from confirmed working projects...")
+        
+        results = self.new_collection_results()
         
         # Collect from known working projects first
         for project_key in self.known_working_projects:
@@ -113,44 +278,34 @@ class EnterpriseDataCollector:
             
             try:
                 artifacts = self.fetch_project_artifacts(project_key, max_artifacts=100)
-                results['working_projects'][project_key] = {
-                    'artifact_count': len(artifacts),
-                    'sample_artifacts': artifacts[:5] if artifacts else [],
-                    'status': 'confirmed_working'
-                }
-                results['summary']['total_artifacts'] += len(artifacts)
-                results['summary']['working_projects'] += 1
-                
-                logging.info(f"✅ {project_key}: {len(artifacts)} artifacts collected")
-                
             except Exception as e:
-                logging.error(f"❌ {project_key}: {e}")
-                results['working_projects'][project_key] = {'error': str(e)}
+                artifacts = e
+            self.record_working_project(results, project_key, artifacts)
         
-        # Test a small sample of potential projects to discover new accessible ones
-        logging.info("\n🔍 Testing sample of potential projects for new discoveries...")
-        test_sample = self.potential_projects[:10]  # Test first 10 only
+        # Probe all candidate projects concurrently to discover new accessible ones
+        logging.info("\n🔍 Testing potential projects for new discoveries...")
+        access_results = self.discover_accessible_projects()
         
-        for project_key in test_sample:
-            access_test = self.test_project_access(project_key)
+        for project_key, access_test in access_results.items():
             if access_test['accessible']:
                 logging.info(f"🎉 NEW DISCOVERY: {project_key} is accessible!")
                 artifacts = self.fetch_project_artifacts(project_key, max_artifacts=25)
-                results['newly_discovered'][project_key] = {
-                    'artifact_count': len(artifacts),
-                    'sample_artifacts': artifacts[:3] if artifacts else []
-                }
-                results['summary']['total_artifacts'] += len(artifacts)
-                results['summary']['working_projects'] += 1
+                self.record_discovery(results, project_key, artifacts)
         
         return results
     
-    def collect_from_accessible_projects(self, max_artifacts_per_project=100):
+    def collect_from_accessible_projects(self, max_artifacts_per_project=100, use_async=False):
         """Collect data from accessible projects efficiently"""
         logging.info("📥 Starting focused data collection...")
         
         # Use the quick collection method
-        collection_results = self.quick_collect_known_projects()
+        if use_async:
+            collection_results = asyncio.run(self.quick_collect_known_projects_async())
+        else:
+            collection_results = self.quick_collect_known_projects()
+        collection_results['timings'] = self.metrics.snapshot()
+        if os.getenv('COLLECTOR_METRICS_PATH'):
+            self.metrics.export(os.getenv('COLLECTOR_METRICS_PATH'), collector='enterprise')
         
         # Save collection results
         collection_file = self.data_dir / f"enterprise_collection_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
@@ -160,14 +315,14 @@ class EnterpriseDataCollector:
         logging.info(f"📁 Results saved: {collection_file}")
         return collection_results
     
-    def run_comprehensive_enterprise_scan(self):
+    def run_comprehensive_enterprise_scan(self, use_async=False):
         """Run the complete enterprise data collection"""
         logging.info("🚀 ENTERPRISE DATA COLLECTION - FOCUSED APPROACH")
         logging.info("=" * 60)
         logging.info("Collecting from confirmed working projects + testing for new discoveries...")
         
         try:
-            results = self.collect_from_accessible_projects()
+            results = self.collect_from_accessible_projects(use_async=use_async)
             
             if results and results['summary']['total_artifacts'] > 0:
                 self.print_final_summary(results)
@@ -189,22 +344,26 @@ class EnterpriseDataCollector:
         summary = results['summary']
         print(f"📊 Working Projects: {summary['working_projects']}")
         print(f"📦 Total Artifacts: {summary['total_artifacts']}")
+        listing = results.get('timings', {}).get('phases', {}).get('listing')
+        if listing:
+            print(f"⏱️  Listing requests: {listing['count']}  p50 {listing['p50_seconds'] * 1000:.0f} ms  "
+                  f"p95 {listing['p95_seconds'] * 1000:.0f} ms  p99 {listing['p99_seconds'] * 1000:.0f} ms")
         
         # Show working projects
         if results['working_projects']:
-            print(f"\n✅ CONFIRMED WORKING PROJECTS:")
+            print("\n✅ CONFIRMED WORKING PROJECTS:")
             for project, data in results['working_projects'].items():
                 if 'artifact_count' in data:
                     print(f"   {project:15} {data['artifact_count']:>6} artifacts")
         
         # Show newly discovered projects
         if results['newly_discovered']:
-            print(f"\n� NEWLY DISCOVERED PROJECTS:")
+            print("\n� NEWLY DISCOVERED PROJECTS:")
             for project, data in results['newly_discovered'].items():
                 print(f"   {project:15} {data['artifact_count']:>6} artifacts")
         
-        print(f"\n💡 RECOMMENDATION:")
-        print(f"   Focus on PWRLIB72 for comprehensive software improvement analysis")
+        print("\n💡 RECOMMENDATION:")
+        print("   Focus on PWRLIB72 for comprehensive software improvement analysis")
         print(f"   This project has {results['working_projects'].get('PWRLIB72', {}).get('artifact_count', 0)} artifacts with high-value data types")
 
 def main():
@@ -217,7 +376,7 @@ def main():
     
     try:
         collector = EnterpriseDataCollector()
-        results = collector.run_comprehensive_enterprise_scan()
+        results = collector.run_comprehensive_enterprise_scan(use_async=os.getenv('RDDL_ASYNC', '0') == '1')
         
         if results:
             print("\n🚀 Enterprise data collection completed successfully!")
@@ -6,34 +6,95 @@ This tool efficiently downloads all artifacts from accessible projects.
 Uses the proven working logic from data_lake_uploader.py and rddl_data_downloader.py.
 """
 import os
-import sys
 import json
+import asyncio
 import time
 import logging
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+
+try:
+    from src.streaming_download import partial_path
+    from src.artifact_manifest import ArtifactManifest
+    from src.rddl_pagination import ArtifactPaginator
+    from src.rddl_async_client import AsyncRDDLClient
+    from src.blob_store import BlobStore
+    from src.rddl_transport import RetryingSession, RetryPolicy, download_with_resume
+    from src.rate_limiter import RateLimiter
+    from src.metrics import Metrics
+except ImportError:  # running as a script from src/
+    from streaming_download import partial_path
+    from artifact_manifest import ArtifactManifest
+    from rddl_pagination import ArtifactPaginator
+    from rddl_async_client import AsyncRDDLClient
+    from blob_store import BlobStore
+    from rddl_transport import RetryingSession, RetryPolicy, download_with_resume
+    from rate_limiter import RateLimiter
+    from metrics import Metrics
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 class FocusedDataCollector:
-    def __init__(self):
+    def __init__(self, workers=1, max_connections_per_host=8,
+                 base_url="https://rd-datalake.icp.infineon.com",
+                 data_root="data/focused_collection", incremental=False,
+                 page_size=100, page_workers=4, blob_store_dir=None, retry_policy=None,
+                 rate_limiter=None, metrics=None, metrics_path=None):
         self.token = os.getenv('RDDL_API_TOKEN')
         if not self.token:
             raise ValueError("RDDL_API_TOKEN environment variable required")
         
         # Use the proven working configuration
-        self.base_url = "https://rd-datalake.icp.infineon.com"
+        self.base_url = base_url
         self.headers = {"Authorization": f"Bearer {self.token}"}
         
+        # Download concurrency: workers=1 keeps the original serial behaviour
+        self.workers = max(1, workers)
+        # Transient failures (5xx, 429, resets, cut-off bodies) are retried with backoff
+        self.retry_policy = retry_policy or RetryPolicy()
+        # Per-endpoint request budgets shared with every other collector in the process
+        self.rate_limiter = rate_limiter or RateLimiter.shared()
+        # Phase timings (listing, first byte, download, disk write), exported after each run
+        # as Prometheus text (.prom) or JSON lines when a metrics path is set
+        self.metrics = metrics or Metrics()
+        self.metrics_path = metrics_path or os.getenv('COLLECTOR_METRICS_PATH')
+        self.session = self.create_session(max_connections_per_host)
+        
+        # Metadata listing: page size and number of pages prefetched in parallel
+        self.page_size = page_size
+        self.page_workers = page_workers
+        
         # Data organization
-        self.data_root = Path("data/focused_collection")
-        self.data_root.mkdir(exist_ok=True)
+        self.data_root = Path(data_root)
+        self.data_root.mkdir(parents=True, exist_ok=True)
+        
+        # Incremental mode: skip unchanged artifacts and resume partial downloads
+        self.incremental = incremental
+        self.manifest = ArtifactManifest(self.data_root / "manifest.sqlite") if incremental else None
+        
+        # Content-addressed store: project folders become hardlinks to shared blobs
+        self.blob_store = BlobStore(blob_store_dir) if blob_store_dir else None
         
         # Known working projects (from enterprise scan)
         self.working_projects = ['PWRLIB72']
     
+    def create_session(self, max_connections_per_host):
+        """Create a pooled, retrying session shared by all download workers"""
+        session = RetryingSession(self.retry_policy, rate_limiter=self.rate_limiter, metrics=self.metrics)
+        session.headers.update(self.headers)
+        
+        # pool_connections is how many per-host pools are cached (RDDL and the odd redirect
+        # target); pool_maxsize with pool_block caps open connections per host
+        adapter = HTTPAdapter(pool_connections=4,
+                              pool_maxsize=max_connections_per_host,
+                              pool_block=True)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    
     def get_artifact_type(self, artifact):
         """Determine folder type for artifact organization"""
         name = artifact.get("filename", "")
@@ -51,107 +112,238 @@ class FocusedDataCollector:
         else:
             return "other"
     
-    def get_artifacts_metadata(self, project_key):
-        """Get all artifacts metadata for a project using proven API pattern"""
+    def standardize_artifact(self, artifact):
+        """Flatten a raw metadata entry into the format stored in metadata.json"""
+        raw_file = artifact.get("rawDataFile", {})
+        return {
+            "id": artifact["artifactID"],
+            "filename": raw_file.get("fileName", "unknown"),
+            "contentType": raw_file.get("contentType", ""),
+            "fileSize": raw_file.get("fileSize", 0),
+            "md5": raw_file.get("md5", ""),
+            "dateCreated": artifact.get("dateCreated", ""),
+            "description": artifact.get("description", "")
+        }
+    
+    def iter_artifacts_metadata(self, project_key):
+        """Stream standardized artifact metadata for a project page by page"""
         url = f"{self.base_url}/api/v1/projects/{project_key}/artifacts/metadata"
-        all_artifacts = []
-        page_number = 1
-        
-        while True:
-            params = {"pageSize": 25, "pageNumber": page_number}
-            logging.info(f"Fetching {project_key} page {page_number}...")
-            
-            try:
-                resp = requests.get(url, headers=self.headers, params=params, timeout=30)
-                
-                if resp.status_code == 200:
-                    data = resp.json()
-                    artifacts = data.get("data", [])
-                    
-                    if not artifacts:
-                        break
-                    
-                    # Standardize artifact format
-                    for artifact in artifacts:
-                        if "artifactID" in artifact:
-                            standardized = {
-                                "id": artifact["artifactID"],
-                                "filename": artifact.get("rawDataFile", {}).get("fileName", "unknown"),
-                                "contentType": artifact.get("rawDataFile", {}).get("contentType", ""),
-                                "fileSize": artifact.get("rawDataFile", {}).get("fileSize", 0),
-                                "dateCreated": artifact.get("dateCreated", ""),
-                                "description": artifact.get("description", "")
-                            }
-                            all_artifacts.append(standardized)
-                    
-                    if len(artifacts) < 25:
-                        break
-                    page_number += 1
-                else:
-                    logging.error(f"Error fetching {project_key}: {resp.status_code}")
-                    break
-                    
-            except Exception as e:
-                logging.error(f"Request error for {project_key}: {e}")
-                break
+        paginator = ArtifactPaginator(self.session, url, page_size=self.page_size,
+                                      workers=self.page_workers, label=project_key)
         
+        for artifact in paginator:
+            if "artifactID" in artifact:
+                yield self.standardize_artifact(artifact)
+        # Fail the project rather than save a truncated listing as if it were complete
+        if not paginator.complete:
+            raise RuntimeError(f"Artifact listing of {project_key} is incomplete "
+                               f"({paginator.pages_fetched} pages fetched)")
+    
+    def get_artifacts_metadata(self, project_key):
+        """Get all artifacts metadata for a project using proven API pattern"""
+        all_artifacts = list(self.iter_artifacts_metadata(project_key))
         logging.info(f"Found {len(all_artifacts)} artifacts in {project_key}")
         return all_artifacts
     
+    def prepare_download(self, project_key, artifact):
+        """Work out where an artifact goes and whether it can be skipped or resumed.
+        
+        Returns (save_path, resume_from, skipped_result); skipped_result is set
+        when incremental mode finds the artifact unchanged on disk or the blob
+        store already holds its content.
+        """
+        name = artifact.get("filename", f"artifact_{artifact['id']}")
+        artifact_type = self.get_artifact_type(artifact)
+        
+        # Create organized directory structure. Every artifact gets its own folder: projects
+        # reuse a few file names (report.xml, test_fb_*.log) across runs, and artifacts
+        # downloaded side by side must never share a path
+        save_path = self.data_root / project_key / artifact_type / artifact['id'] / name
+        save_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        entry = self.manifest.get(project_key, artifact['id']) if self.manifest else None
+        if self.manifest and self.manifest.is_unchanged(entry, artifact, save_path):
+            logging.info(f"⏭️  Unchanged {name}, skipping")
+            return save_path, 0, {'path': str(save_path), 'bytes': entry['bytes'],
+                                  'sha256': entry['sha256'], 'action': 'skipped'}
+        
+        # Same content already stored (matched on the server's md5): link it, no download
+        sha256 = self.blob_store.lookup_md5(artifact.get('md5')) if self.blob_store else None
+        if sha256:
+            self.blob_store.link(sha256, save_path)
+            size = self.blob_store.size(sha256)
+            if self.manifest:
+                self.manifest.mark_complete(project_key, artifact, save_path, size, sha256)
+            logging.info(f"🔗 Linked {name} from blob store ({sha256[:12]})")
+            return save_path, 0, {'path': str(save_path), 'bytes': size,
+                                  'sha256': sha256, 'action': 'deduplicated'}
+        
+        if not self.manifest:
+            return save_path, 0, None
+        
+        resume_from = self.get_resume_offset(entry, artifact, save_path)
+        if not resume_from:
+            self.manifest.mark_partial(project_key, artifact, save_path)
+        return save_path, resume_from, None
+    
+    def finish_download(self, project_key, artifact, save_path, size, sha256, resumed):
+        """Record a completed download and build its result entry"""
+        if self.blob_store:
+            self.blob_store.ingest(save_path, sha256, size, artifact.get('md5'))
+        if self.manifest:
+            self.manifest.mark_complete(project_key, artifact, save_path, size, sha256)
+        
+        logging.info(f"✅ Saved {save_path.name} ({size / 1024:.1f} KB) to {save_path}")
+        return {'path': str(save_path), 'bytes': size, 'sha256': sha256,
+                'action': 'resumed' if resumed else 'fetched'}
+    
     def download_artifact(self, project_key, artifact):
-        """Download single artifact using proven API pattern"""
+        """Download single artifact using proven API pattern.
+        
+        Returns (True, {'path', 'bytes', 'sha256', 'action'}) or (False, error message),
+        where action is 'fetched', 'resumed' or (incremental mode) 'skipped'.
+        """
         artifact_id = artifact.get("id")
         if not artifact_id:
             return False, "No artifact ID"
         
         name = artifact.get("filename", f"artifact_{artifact_id}")
-        artifact_type = self.get_artifact_type(artifact)
-        
-        # Create organized directory structure
-        project_dir = self.data_root / project_key
-        type_dir = project_dir / artifact_type
-        type_dir.mkdir(parents=True, exist_ok=True)
-        
-        save_path = type_dir / name
         
         # Use proven download API endpoint
         download_url = f"{self.base_url}/api/v1/projects/{project_key}/artifacts/{artifact_id}"
         
         try:
-            logging.info(f"Downloading {name} ({artifact_type})...")
-            
-            resp = requests.get(download_url, headers=self.headers, timeout=120)
-            resp.raise_for_status()
+            save_path, resume_from, skipped = self.prepare_download(project_key, artifact)
+            if skipped:
+                return True, skipped
             
-            # Save file
-            with open(save_path, "wb") as f:
-                f.write(resp.content)
+            logging.info(f"Downloading {name} ({self.get_artifact_type(artifact)})" +
+                         (f" from byte {resume_from}..." if resume_from else "..."))
             
-            file_size = len(resp.content) / 1024  # KB
-            logging.info(f"✅ Saved {name} ({file_size:.1f} KB) to {save_path}")
+            # Stream to disk in chunks; size and hash come from the same pass and must match the
+            # listed fileSize/md5. A dropped connection continues from the bytes already written
+            size, sha256, resumed = download_with_resume(self.session, download_url, save_path,
+                                                         resume_from=resume_from, keep_partial=self.incremental,
+                                                         partial=partial_path(save_path, artifact_id),
+                                                         expected_size=artifact.get('fileSize'),
+                                                         expected_md5=artifact.get('md5'))
             
-            return True, str(save_path)
+            return True, self.finish_download(project_key, artifact, save_path, size, sha256, resumed)
             
         except Exception as e:
             logging.error(f"❌ Failed to download {name}: {e}")
             return False, str(e)
     
+    async def download_artifact_async(self, client, project_key, artifact):
+        """Async counterpart of download_artifact using an AsyncRDDLClient"""
+        artifact_id = artifact.get("id")
+        if not artifact_id:
+            return False, "No artifact ID"
+        
+        name = artifact.get("filename", f"artifact_{artifact_id}")
+        
+        try:
+            save_path, resume_from, skipped = self.prepare_download(project_key, artifact)
+            if skipped:
+                return True, skipped
+            
+            logging.info(f"Downloading {name} ({self.get_artifact_type(artifact)})...")
+            size, sha256, resumed = await client.download_artifact(project_key, artifact_id, save_path,
+                                                                   resume_from=resume_from,
+                                                                   keep_partial=self.incremental,
+                                                                   partial=partial_path(save_path, artifact_id),
+                                                                   expected_size=artifact.get('fileSize'),
+                                                                   expected_md5=artifact.get('md5'))
+            
+            return True, self.finish_download(project_key, artifact, save_path, size, sha256, resumed)
+            
+        except Exception as e:
+            logging.error(f"❌ Failed to download {name}: {e}")
+            return False, str(e) or type(e).__name__
+    
+    def get_resume_offset(self, entry, artifact, save_path):
+        """Bytes already on disk from an interrupted download of the same artifact"""
+        part = partial_path(save_path, artifact['id'])
+        if (entry is None or entry['status'] != 'partial' or entry['path'] != str(save_path)
+                or not self.manifest.matches_server(entry, artifact) or not part.exists()):
+            return 0
+        
+        offset = part.stat().st_size
+        expected = artifact.get('fileSize', 0)
+        if expected and offset >= expected:
+            return 0
+        return offset
+    
+    def download_artifacts(self, project_key, artifacts):
+        """Download artifacts with up to self.workers in flight, results in input order"""
+        total = len(artifacts)
+        
+        def process(indexed_artifact):
+            i, artifact = indexed_artifact
+            logging.info(f"[{i}/{total}] Processing {artifact.get('filename', 'unnamed')}")
+            return self.download_artifact(project_key, artifact)
+        
+        if self.workers == 1:
+            return [process(item) for item in enumerate(artifacts, 1)]
+        
+        logging.info(f"Downloading {total} artifacts with {self.workers} workers...")
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(process, enumerate(artifacts, 1)))
+    
     def collect_project_data(self, project_key):
         """Collect all data from a project"""
         logging.info(f"\n=== COLLECTING DATA FROM {project_key} ===")
+        start = time.monotonic()
         
         # Get all artifacts metadata
         artifacts = self.get_artifacts_metadata(project_key)
+        listed = time.monotonic()
         
         if not artifacts:
             logging.warning(f"No artifacts found in {project_key}")
             return None
         
-        # Create project directory
+        self.save_project_metadata(project_key, artifacts)
+        
+        # Download all artifacts
+        outcomes = self.download_artifacts(project_key, artifacts)
+        results = self.save_project_results(project_key, artifacts, outcomes)
+        # Wall-clock phases go to the collection summary only; collection_results.json stays reproducible
+        results['timings'] = {'listing_seconds': round(listed - start, 3),
+                              'download_seconds': round(time.monotonic() - listed, 3)}
+        return results
+    
+    async def collect_project_data_async(self, client, project_key):
+        """Collect all data from a project through an AsyncRDDLClient"""
+        logging.info(f"\n=== COLLECTING DATA FROM {project_key} (async) ===")
+        start = time.monotonic()
+        
+        artifacts = [self.standardize_artifact(artifact) async for artifact in
+                     client.iter_artifacts_metadata(project_key, self.page_size, self.page_workers)
+                     if "artifactID" in artifact]
+        listed = time.monotonic()
+        logging.info(f"Found {len(artifacts)} artifacts in {project_key}")
+        
+        if not artifacts:
+            logging.warning(f"No artifacts found in {project_key}")
+            return None
+        
+        self.save_project_metadata(project_key, artifacts)
+        
+        # The client's semaphore bounds how many downloads are in flight
+        outcomes = await asyncio.gather(*(self.download_artifact_async(client, project_key, artifact)
+                                          for artifact in artifacts))
+        results = self.save_project_results(project_key, artifacts, outcomes)
+        # Wall-clock phases go to the collection summary only; collection_results.json stays reproducible
+        results['timings'] = {'listing_seconds': round(listed - start, 3),
+                              'download_seconds': round(time.monotonic() - listed, 3)}
+        return results
+    
+    def save_project_metadata(self, project_key, artifacts):
+        """Write the artifact catalog to <project>/metadata.json"""
         project_dir = self.data_root / project_key
         project_dir.mkdir(exist_ok=True)
         
-        # Save metadata
         metadata = {
             "project_key": project_key,
             "collection_date": datetime.now().isoformat(),
@@ -162,8 +354,10 @@ class FocusedDataCollector:
         metadata_path = project_dir / "metadata.json"
         with open(metadata_path, 'w', encoding='utf-8') as f:
             json.dump(metadata, f, indent=2, ensure_ascii=False)
-        
-        # Download all artifacts
+    
+    def save_project_results(self, project_key, artifacts, outcomes):
+        """Summarize download outcomes into <project>/collection_results.json"""
+        project_dir = self.data_root / project_key
         results = {
             'project_key': project_key,
             'total_artifacts': len(artifacts),
@@ -172,12 +366,12 @@ class FocusedDataCollector:
             'downloads': [],
             'file_types': {}
         }
+        if self.incremental:
+            results['incremental'] = {'fetched': 0, 'resumed': 0, 'skipped': 0}
+        if self.blob_store:
+            results['deduplicated'] = 0
         
-        for i, artifact in enumerate(artifacts, 1):
-            logging.info(f"[{i}/{len(artifacts)}] Processing {artifact.get('filename', 'unnamed')}")
-            
-            success, result = self.download_artifact(project_key, artifact)
-            
+        for artifact, (success, result) in zip(artifacts, outcomes):
             artifact_type = self.get_artifact_type(artifact)
             results['file_types'][artifact_type] = results['file_types'].get(artifact_type, 0) + 1
             
@@ -186,9 +380,14 @@ class FocusedDataCollector:
                 results['downloads'].append({
                     'filename': artifact.get('filename'),
                     'type': artifact_type,
-                    'path': result,
-                    'size': artifact.get('fileSize', 0)
+                    'path': result['path'],
+                    'size': artifact.get('fileSize', 0),
+                    'sha256': result['sha256']
                 })
+                if result['action'] == 'deduplicated':
+                    results['deduplicated'] += 1
+                elif self.incremental:
+                    results['incremental'][result['action']] += 1
             else:
                 results['failed_downloads'] += 1
                 logging.error(f"Failed: {artifact.get('filename')} - {result}")
@@ -201,6 +400,12 @@ class FocusedDataCollector:
         logging.info(f"\n📊 {project_key} Collection Complete:")
         logging.info(f"   ✅ Downloaded: {results['successful_downloads']}/{results['total_artifacts']}")
         logging.info(f"   ❌ Failed: {results['failed_downloads']}")
+        if self.incremental:
+            counts = results['incremental']
+            logging.info(f"   🔁 Fetched: {counts['fetched']}, resumed: {counts['resumed']}, "
+                         f"skipped (unchanged): {counts['skipped']}")
+        if self.blob_store:
+            logging.info(f"   🔗 Deduplicated (linked, not downloaded): {results['deduplicated']}")
         logging.info(f"   📁 Saved to: {project_dir}")
         
         return results
@@ -211,7 +416,47 @@ class FocusedDataCollector:
         logging.info("=" * 50)
         logging.info("Downloading all artifacts from accessible projects...")
         
-        collection_summary = {
+        collection_summary = self.new_collection_summary()
+        
+        for project_key in self.working_projects:
+            try:
+                results = self.collect_project_data(project_key)
+                self.add_project_to_summary(collection_summary, project_key, results)
+                    
+            except Exception as e:
+                logging.error(f"Error collecting {project_key}: {e}")
+                collection_summary['projects'][project_key] = {'error': str(e)}
+        
+        collection_summary['transport'] = dict(self.session.stats)
+        collection_summary['rate_limits'] = self.rate_limiter.stats()
+        return self.save_collection_summary(collection_summary)
+    
+    async def run_focused_collection_async(self, max_concurrency=32):
+        """Run focused collection on all accessible projects concurrently from one event loop"""
+        logging.info("🎯 FOCUSED DATA COLLECTION (async)")
+        logging.info("=" * 50)
+        
+        collection_summary = self.new_collection_summary()
+        
+        async with AsyncRDDLClient(self.token, base_url=self.base_url, max_concurrency=max_concurrency,
+                                   retry_policy=self.retry_policy, rate_limiter=self.rate_limiter,
+                                   metrics=self.metrics) as client:
+            outcomes = await asyncio.gather(*(self.collect_project_data_async(client, project_key)
+                                              for project_key in self.working_projects),
+                                            return_exceptions=True)
+        
+        for project_key, results in zip(self.working_projects, outcomes):
+            if isinstance(results, Exception):
+                logging.error(f"Error collecting {project_key}: {results}")
+                collection_summary['projects'][project_key] = {'error': str(results)}
+            else:
+                self.add_project_to_summary(collection_summary, project_key, results)
+        
+        collection_summary['rate_limits'] = self.rate_limiter.stats()
+        return self.save_collection_summary(collection_summary)
+    
+    def new_collection_summary(self):
+        return {
             'collection_timestamp': datetime.now().isoformat(),
             'projects': {},
             'total_summary': {
@@ -221,21 +466,25 @@ class FocusedDataCollector:
                 'total_failures': 0
             }
         }
-        
-        for project_key in self.working_projects:
-            try:
-                results = self.collect_project_data(project_key)
-                
-                if results:
-                    collection_summary['projects'][project_key] = results
-                    collection_summary['total_summary']['projects_processed'] += 1
-                    collection_summary['total_summary']['total_artifacts'] += results['total_artifacts']
-                    collection_summary['total_summary']['total_downloads'] += results['successful_downloads']
-                    collection_summary['total_summary']['total_failures'] += results['failed_downloads']
-                    
-            except Exception as e:
-                logging.error(f"Error collecting {project_key}: {e}")
-                collection_summary['projects'][project_key] = {'error': str(e)}
+    
+    def add_project_to_summary(self, collection_summary, project_key, results):
+        if not results:
+            return
+        total = collection_summary['total_summary']
+        collection_summary['projects'][project_key] = results
+        total['projects_processed'] += 1
+        total['total_artifacts'] += results['total_artifacts']
+        total['total_downloads'] += results['successful_downloads']
+        total['total_failures'] += results['failed_downloads']
+        for action, count in results.get('incremental', {}).items():
+            total[f"total_{action}"] = total.get(f"total_{action}", 0) + count
+        if 'deduplicated' in results:
+            total['total_deduplicated'] = total.get('total_deduplicated', 0) + results['deduplicated']
+    
+    def save_collection_summary(self, collection_summary):
+        collection_summary['timings'] = self.metrics.snapshot()
+        if self.metrics_path:
+            logging.info(f"📊 Metrics exported: {self.metrics.export(self.metrics_path, collector='focused')}")
         
         # Save overall summary
         summary_path = self.data_root / f"collection_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
@@ -258,14 +507,32 @@ class FocusedDataCollector:
         print(f"📦 Total Artifacts: {total['total_artifacts']}")
         print(f"✅ Successful Downloads: {total['total_downloads']}")
         print(f"❌ Failed Downloads: {total['total_failures']}")
-        print(f"📈 Success Rate: {(total['total_downloads']/total['total_artifacts']*100):.1f}%")
+        print(f"📈 Success Rate: {(total['total_downloads'] / max(1, total['total_artifacts']) * 100):.1f}%")
+        if 'total_skipped' in total:
+            print(f"🔁 Fetched: {total['total_fetched']}  Resumed: {total['total_resumed']}  "
+                  f"Skipped (unchanged): {total['total_skipped']}")
+        if 'total_deduplicated' in total:
+            print(f"🔗 Deduplicated via blob store: {total['total_deduplicated']}")
+        if summary.get('transport', {}).get('retries'):
+            print(f"🔄 Transient failures retried: {summary['transport']['retries']}")
+        for phase, timing in summary.get('timings', {}).get('phases', {}).items():
+            rate = f", {timing['bytes_per_second'] / 2**20:.1f} MB/s" if timing['bytes_per_second'] else ""
+            print(f"⏱️  {phase}: {timing['count']}x  p50 {timing['p50_seconds'] * 1000:.0f} ms  "
+                  f"p95 {timing['p95_seconds'] * 1000:.0f} ms  p99 {timing['p99_seconds'] * 1000:.0f} ms{rate}")
+        for endpoint, limits in summary.get('rate_limits', {}).items():
+            if limits['requests']:
+                print(f"🚦 {endpoint}: {limits['rate']} req/s, {limits['throttled']} throttled, "
+                      f"{limits['waited_seconds']} s waited")
         
-        print(f"\n📁 PROJECT DETAILS:")
+        print("\n📁 PROJECT DETAILS:")
         for project_key, results in summary['projects'].items():
             if 'error' not in results:
                 print(f"   {project_key}:")
                 print(f"      📦 Artifacts: {results['total_artifacts']}")
                 print(f"      ✅ Downloaded: {results['successful_downloads']}")
+                if results.get('timings'):
+                    print(f"      ⏱️  Listing: {results['timings']['listing_seconds']} s, "
+                          f"downloads: {results['timings']['download_seconds']} s")
                 
                 if results.get('file_types'):
                     print(f"      📂 File Types: {dict(results['file_types'])}")
@@ -283,15 +550,21 @@ def main():
     print()
     
     try:
-        collector = FocusedDataCollector()
-        results = collector.run_focused_collection()
+        workers = int(os.getenv('RDDL_DOWNLOAD_WORKERS', '8'))
+        incremental = os.getenv('RDDL_INCREMENTAL', '1') != '0'
+        collector = FocusedDataCollector(workers=workers, incremental=incremental,
+                                         blob_store_dir=os.getenv('BLOB_STORE_DIR', 'data/blobs'))
+        if os.getenv('RDDL_ASYNC', '0') == '1':
+            results = asyncio.run(collector.run_focused_collection_async(max_concurrency=workers))
+        else:
+            results = collector.run_focused_collection()
         
         if results and results['total_summary']['total_downloads'] > 0:
-            print(f"\n🚀 Collection completed successfully!")
-            print(f"📁 All files organized in: data/focused_collection/")
-            print(f"🔍 Use rddl_data_analyzer.py to analyze the downloaded data")
+            print("\n🚀 Collection completed successfully!")
+            print("📁 All files organized in: data/focused_collection/")
+            print("🔍 Use rddl_data_analyzer.py to analyze the downloaded data")
         else:
-            print(f"\n❌ Collection completed but no files downloaded")
+            print("\n❌ Collection completed but no files downloaded")
             
     except ValueError as e:
         print(f"\n❌ Setup Error: {e}")
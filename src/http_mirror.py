@@ -0,0 +1,206 @@
+"""
+HTTP Mirror
+
+Conditional-GET mirror of a plain HTTP directory (the MTB web server deploy
+listing). For every URL the ETag and Last-Modified validators of the last
+download are kept in SQLite and sent back as If-None-Match/If-Modified-Since,
+so a file that has not changed costs a 304 with no body. The listing itself is
+fetched the same way and its links are cached, so polling an unchanged
+directory transfers only headers.
+
+Links are pulled from listings with a single compiled regex instead of a full
+HTML parser; directory indexes are flat <a href> lists and the regex is
+many times faster on listings with thousands of entries.
+
+Usage: python src/http_mirror.py <directory url> [<local dir>]
+"""
+import os
+import re
+import sys
+import json
+import html
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urljoin
+
+import requests
+
+try:
+    from src.streaming_download import stream_to_file
+except ImportError:  # running as a script from src/
+    from streaming_download import stream_to_file
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS validators (
+    url            TEXT PRIMARY KEY,
+    etag           TEXT,
+    last_modified  TEXT,
+    path           TEXT,
+    size           INTEGER,
+    sha256         TEXT,
+    links          TEXT,
+    uploaded       INTEGER NOT NULL DEFAULT 0,
+    checked_at     TEXT
+)
+"""
+
+HREF_PATTERN = re.compile(r'''<a\s[^>]*?\bhref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.IGNORECASE)
+
+# Outcome of a conditional fetch
+MODIFIED = 'modified'
+NOT_MODIFIED = 'not_modified'
+
+
+def extract_links(text, suffixes=None):
+    """href values of the <a> tags in an HTML listing, optionally only those ending in suffixes"""
+    links = [html.unescape(a or b or c) for a, b, c in HREF_PATTERN.findall(text)]
+    if suffixes:
+        links = [link for link in links if link.endswith(tuple(suffixes))]
+    return links
+
+
+class MirrorState:
+    """Thread-safe SQLite store of per-URL validators, local copies and upload state"""
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute(SCHEMA)
+
+    def get(self, url):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM validators WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
+
+    def record(self, url, response, path=None, size=None, sha256=None, links=None):
+        """Store the validators of a 200 response; the new content is not uploaded yet"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO validators VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?)",
+                (url, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                 str(path) if path else None, size, sha256,
+                 json.dumps(links) if links is not None else None, datetime.now().isoformat())
+            )
+
+    def touch(self, url):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE validators SET checked_at = ? WHERE url = ?",
+                               (datetime.now().isoformat(), url))
+
+    def mark_uploaded(self, path):
+        """Remember that the current local copy at path has reached the data lake"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE validators SET uploaded = 1 WHERE path = ?", (str(path),))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def conditional_headers(entry):
+    """If-None-Match / If-Modified-Since headers for a stored entry"""
+    headers = {}
+    if entry and entry['etag']:
+        headers['If-None-Match'] = entry['etag']
+    if entry and entry['last_modified']:
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+
+def get_unconditionally(session, url, response, **kwargs):
+    """Repeat a request that came back 304 although there is no local copy to keep.
+
+    No validators were sent, so the 304 came from a cache in between; the
+    request is repeated with Cache-Control: no-cache. Raises IOError if the
+    answer is still 304.
+    """
+    response.close()
+    response = session.get(url, headers={'Cache-Control': 'no-cache'}, **kwargs)
+    if response.status_code == 304:
+        response.close()
+        raise IOError(f"{url} answered 304 Not Modified without a local copy to keep")
+    return response
+
+
+def fetch_listing(session, url, state, suffixes=None, timeout=15):
+    """Links of a directory listing, served from the cache when the server answers 304.
+
+    Returns (links, status) with status MODIFIED or NOT_MODIFIED.
+    """
+    entry = state.get(url)
+    if entry and entry['links'] is None:
+        entry = None
+    response = session.get(url, headers=conditional_headers(entry), timeout=timeout)
+    if response.status_code == 304 and entry is None:
+        response = get_unconditionally(session, url, response, timeout=timeout)
+    if response.status_code == 304:
+        state.touch(url)
+        links = json.loads(entry['links'])
+        status = NOT_MODIFIED
+    else:
+        response.raise_for_status()
+        links = extract_links(response.text)
+        state.record(url, response, links=links)
+        status = MODIFIED
+    if suffixes:
+        links = [link for link in links if link.endswith(tuple(suffixes))]
+    return links, status
+
+
+def mirror_file(session, url, save_path, state, timeout=30):
+    """Bring save_path up to date with url using a conditional GET.
+
+    Returns (status, entry) where status is MODIFIED (a new body was
+    downloaded) or NOT_MODIFIED (the server answered 304 and the local copy is
+    current) and entry is the stored state row.
+    """
+    entry = state.get(url)
+    # Validators are only worth sending while the local copy they describe still exists
+    if entry and (entry['path'] != str(save_path) or not os.path.exists(save_path)):
+        entry = None
+    response = session.get(url, headers=conditional_headers(entry), timeout=timeout, stream=True)
+    if response.status_code == 304 and entry is None:
+        response = get_unconditionally(session, url, response, timeout=timeout, stream=True)
+    if response.status_code == 304:
+        response.close()
+        state.touch(url)
+        return NOT_MODIFIED, entry
+
+    response.raise_for_status()
+    size, sha256 = stream_to_file(response, save_path)
+    state.record(url, response, save_path, size, sha256)
+    return MODIFIED, state.get(url)
+
+
+def main():
+    """Mirror the files of a directory listing and report what changed"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if len(sys.argv) < 2:
+        print("Usage: python src/http_mirror.py <directory url> [<local dir>]")
+        sys.exit(1)
+    base_url = sys.argv[1]
+    local_dir = Path(sys.argv[2] if len(sys.argv) > 2 else "data/mirror")
+    local_dir.mkdir(parents=True, exist_ok=True)
+    state = MirrorState(os.getenv("MIRROR_STATE_PATH", str(local_dir / "mirror_state.sqlite")))
+
+    counts = {MODIFIED: 0, NOT_MODIFIED: 0}
+    with requests.Session() as session:
+        links, listing_status = fetch_listing(session, base_url, state, suffixes=('.log', '.xml'))
+        for link in links:
+            status, _ = mirror_file(session, urljoin(base_url, link), local_dir / os.path.basename(link), state)
+            counts[status] += 1
+    state.close()
+
+    print(f"📂 Listing: {listing_status}, {len(links)} files")
+    print(f"⬇️  Downloaded: {counts[MODIFIED]}   ✅ Unchanged (304): {counts[NOT_MODIFIED]}")
+
+
+if __name__ == "__main__":
+    main()
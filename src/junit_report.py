@@ -0,0 +1,175 @@
+"""
+JUnit Report Ingestion
+
+Streams JUnit-style report.xml documents (<testsuites>/<testsuite>/<testcase>,
+with the Ceedling INFO trace in <system-out>) into two columnar tables:
+
+- testcases: report, suite, name, classname, time, status, message
+- records:   report, suite, file, line, test, level, key, value
+
+Reports are read with ElementTree.iterparse and every element is cleared and
+detached from its parent as soon as it has been consumed, so memory stays
+bounded by the largest single element rather than the report size. Rows are
+accumulated column by column and emitted as pandas DataFrames in batches.
+
+Usage: python src/junit_report.py <report.xml> [<report.xml> ...]
+"""
+import os
+import sys
+import logging
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    from src.anomaly_detection import LINE_PATTERN, COLUMNS as RECORD_COLUMNS
+except ImportError:  # running as a script from src/
+    from anomaly_detection import LINE_PATTERN, COLUMNS as RECORD_COLUMNS
+
+TESTCASE_COLUMNS = ['report', 'suite', 'name', 'classname', 'time', 'status', 'message']
+RECORD_TABLE_COLUMNS = ['report', 'suite'] + RECORD_COLUMNS
+
+DEFAULT_BATCH_SIZE = 50000
+
+# Child elements of <testcase> that decide its status, in order of precedence
+STATUS_TAGS = (('error', 'error'), ('failure', 'failed'), ('skipped', 'skipped'))
+
+
+class ColumnBuffer:
+    """Column-wise row accumulator that turns into a DataFrame in one step"""
+
+    def __init__(self, columns):
+        self.columns = {name: [] for name in columns}
+        self.rows = 0
+
+    def append(self, **row):
+        for name, values in self.columns.items():
+            values.append(row.get(name))
+        self.rows += 1
+
+    def extend(self, constants, matches):
+        """Add regex matches (tuples in the remaining column order) with shared constant columns"""
+        if not matches:
+            return
+        names = [name for name in self.columns if name not in constants]
+        for name, value in constants.items():
+            self.columns[name].extend([value] * len(matches))
+        for name, values in zip(names, zip(*matches)):
+            self.columns[name].extend(values)
+        self.rows += len(matches)
+
+    def flush(self):
+        frame = pd.DataFrame(self.columns)
+        self.columns = {name: [] for name in self.columns}
+        self.rows = 0
+        return frame
+
+
+def local_name(tag):
+    """Tag without its {namespace}"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def testcase_status(elem):
+    """(status, message) of a <testcase> element from its failure/error/skipped children"""
+    for tag, status in STATUS_TAGS:
+        child = next((c for c in elem if local_name(c.tag) == tag), None)
+        if child is not None:
+            message = child.get('message') or (child.text or '').strip()
+            return status, message[:1000]
+    return 'passed', None
+
+
+def iter_report_batches(source, batch_size=DEFAULT_BATCH_SIZE, report=None):
+    """Yield (testcases, records) DataFrames of at most ~batch_size rows each.
+
+    source is a path or binary file object. Elements are freed as soon as
+    they are consumed, so arbitrarily large reports stream in bounded memory.
+    """
+    report = report if report is not None else str(source)
+    testcases = ColumnBuffer(TESTCASE_COLUMNS)
+    records = ColumnBuffer(RECORD_TABLE_COLUMNS)
+    stack = []
+    suites = []
+
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        tag = local_name(elem.tag)
+        if event == 'start':
+            stack.append(elem)
+            if tag == 'testsuite':
+                suites.append(elem.get('name'))
+            continue
+
+        stack.pop()
+        if tag == 'testcase':
+            status, message = testcase_status(elem)
+            testcases.append(report=report, suite=suites[-1] if suites else None, name=elem.get('name'),
+                             classname=elem.get('classname'), time=elem.get('time'),
+                             status=status, message=message)
+        elif tag == 'system-out' and elem.text:
+            records.extend({'report': report, 'suite': suites[-1] if suites else None},
+                           LINE_PATTERN.findall(elem.text))
+        elif tag == 'testsuite':
+            suites.pop()
+        elif stack and local_name(stack[-1].tag) == 'testcase':
+            # failure/error/skipped are read when their testcase ends
+            continue
+
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+
+        if testcases.rows >= batch_size or records.rows >= batch_size:
+            yield finish_testcases(testcases.flush()), finish_records(records.flush())
+
+    if testcases.rows or records.rows:
+        yield finish_testcases(testcases.flush()), finish_records(records.flush())
+
+
+def finish_testcases(frame):
+    frame['time'] = pd.to_numeric(frame['time'], errors='coerce')
+    return frame
+
+
+def finish_records(frame):
+    frame['line'] = pd.to_numeric(frame['line']).astype('int64')
+    return frame
+
+
+def ingest_report(source, batch_size=DEFAULT_BATCH_SIZE):
+    """Read a whole report into (testcases, records) DataFrames"""
+    return ingest_reports([source], batch_size)
+
+
+def ingest_reports(sources, batch_size=DEFAULT_BATCH_SIZE):
+    """Read several reports into combined (testcases, records) DataFrames"""
+    testcase_frames = [finish_testcases(ColumnBuffer(TESTCASE_COLUMNS).flush())]
+    record_frames = [finish_records(ColumnBuffer(RECORD_TABLE_COLUMNS).flush())]
+    for source in sources:
+        for testcases, records in iter_report_batches(source, batch_size):
+            testcase_frames.append(testcases)
+            record_frames.append(records)
+    return (pd.concat(testcase_frames, ignore_index=True),
+            pd.concat(record_frames, ignore_index=True))
+
+
+def main():
+    """Ingest report.xml files and write the tables as CSV"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    sources = sys.argv[1:] or [str(p) for p in sorted(Path("data").rglob("report.xml"))]
+    output_dir = Path(os.getenv("JUNIT_OUTPUT_DIR", "data/rddl_analysis/junit"))
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    logging.info(f"Ingesting {len(sources)} JUnit reports...")
+    testcases, records = ingest_reports(sources)
+    testcases.to_csv(output_dir / "testcases.csv", index=False)
+    records.to_csv(output_dir / "records.csv", index=False)
+
+    print(f"🧪 Test cases: {len(testcases)} ({(testcases['status'] != 'passed').sum()} not passed)")
+    print(f"📄 System-out records: {len(records)}")
+    print(f"📊 Tables saved to: {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
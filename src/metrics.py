@@ -0,0 +1,176 @@
+"""
+Metrics
+
+In-process instrumentation for the collectors and the uploader: per-phase
+latency histograms with p50/p95/p99, byte counters for throughput, and
+in-flight gauges. Phases used by the RDDL clients:
+
+- listing: one metadata page, request sent to body parsed (server + network)
+- first_byte: one artifact GET, request sent to response headers (server)
+- download: one artifact, request sent to the last byte on disk
+- write: file writes and the final fsync of one download (local disk)
+- upload: one artifact POST, body sent to response
+
+A slow run is then read as: first_byte high -> server; download high but
+first_byte and write low -> network; write high -> local disk.
+
+Histograms use fixed exponential buckets, so memory does not grow with the
+number of requests; percentiles are interpolated inside the bucket they fall
+in. Snapshots go into the collection summaries and can be exported as
+Prometheus text (node_exporter textfile format) or appended as JSON lines.
+
+Usage: COLLECTOR_METRICS_PATH=data/metrics.prom python src/focused_data_collector.py
+"""
+import json
+import math
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+# Upper bounds in seconds, 1 ms .. 10 min; the last bucket is open-ended
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, math.inf)
+PERCENTILES = (50, 95, 99)
+
+
+class Histogram:
+    """Bucketed latency distribution with count, sum, min and max"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, p):
+        """Value below which p percent of observations fall, interpolated within its bucket"""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = max(self.buckets[i - 1] if i else 0.0, self.min)
+                upper = min(self.buckets[i], self.max)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.max
+
+
+class Metrics:
+    """Thread-safe registry of phase histograms, byte counters and in-flight gauges"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.bytes = {}
+        self.in_flight = {}
+        self.peak_in_flight = {}
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def observe(self, phase, seconds, nbytes=0):
+        """Record one operation of a phase and the bytes it moved"""
+        with self._lock:
+            if phase not in self.histograms:
+                self.histograms[phase] = Histogram()
+                self.bytes[phase] = 0
+            self.histograms[phase].observe(seconds)
+            self.bytes[phase] += nbytes
+
+    @contextmanager
+    def timer(self, phase):
+        """Time the block as one operation of phase; set .bytes on the yielded dict to count bytes"""
+        record = {'bytes': 0}
+        start = time.monotonic()
+        try:
+            yield record
+        finally:
+            self.observe(phase, time.monotonic() - start, record['bytes'])
+
+    def add_in_flight(self, name, delta):
+        with self._lock:
+            current = self.in_flight.get(name, 0) + delta
+            self.in_flight[name] = current
+            self.peak_in_flight[name] = max(self.peak_in_flight.get(name, 0), current)
+
+    @contextmanager
+    def tracking(self, name):
+        """Count the block as one in-flight operation of the gauge name"""
+        self.add_in_flight(name, 1)
+        try:
+            yield
+        finally:
+            self.add_in_flight(name, -1)
+
+    def snapshot(self):
+        """Plain-dict view: per phase count, seconds, percentiles and throughput, plus gauges"""
+        with self._lock:
+            phases = {}
+            for phase, histogram in self.histograms.items():
+                nbytes = self.bytes[phase]
+                phases[phase] = {
+                    'count': histogram.count,
+                    'total_seconds': round(histogram.sum, 4),
+                    'mean_seconds': round(histogram.sum / histogram.count, 4),
+                    **{f"p{p}_seconds": round(histogram.percentile(p), 4) for p in PERCENTILES},
+                    'max_seconds': round(histogram.max, 4),
+                    'bytes': nbytes,
+                    # Bytes per second of time spent in the phase, summed over concurrent operations
+                    'bytes_per_second': round(nbytes / histogram.sum, 1) if nbytes and histogram.sum else None
+                }
+            return {
+                'elapsed_seconds': round(time.monotonic() - self.started, 3),
+                'phases': phases,
+                'in_flight': {name: {'current': current, 'peak': self.peak_in_flight[name]}
+                              for name, current in self.in_flight.items()}
+            }
+
+    def to_prometheus(self, prefix="rddl"):
+        """Prometheus text exposition format"""
+        with self._lock:
+            lines = [f"# TYPE {prefix}_phase_seconds histogram"]
+            for phase, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == math.inf else repr(bound)
+                    lines.append(f'{prefix}_phase_seconds_bucket{{phase="{phase}",le="{le}"}} {cumulative}')
+                lines.append(f'{prefix}_phase_seconds_sum{{phase="{phase}"}} {histogram.sum}')
+                lines.append(f'{prefix}_phase_seconds_count{{phase="{phase}"}} {histogram.count}')
+            lines.append(f"# TYPE {prefix}_phase_bytes_total counter")
+            lines += [f'{prefix}_phase_bytes_total{{phase="{phase}"}} {nbytes}'
+                      for phase, nbytes in sorted(self.bytes.items())]
+            lines.append(f"# TYPE {prefix}_in_flight gauge")
+            lines += [f'{prefix}_in_flight{{name="{name}"}} {current}'
+                      for name, current in sorted(self.in_flight.items())]
+            lines.append(f"# TYPE {prefix}_in_flight_peak gauge")
+            lines += [f'{prefix}_in_flight_peak{{name="{name}"}} {peak}'
+                      for name, peak in sorted(self.peak_in_flight.items())]
+        return "\n".join(lines) + "\n"
+
+    def export(self, path, **labels):
+        """Write Prometheus text to a .prom path, otherwise append one JSON line with labels"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == '.prom':
+            # Write then rename, so a textfile collector never reads a half-written file
+            tmp_path = path.with_name(path.name + ".tmp")
+            tmp_path.write_text(self.to_prometheus(), encoding='utf-8')
+            tmp_path.replace(path)
+        else:
+            record = {'timestamp': datetime.now().isoformat(), **labels, **self.snapshot()}
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+        return path
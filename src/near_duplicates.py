@@ -0,0 +1,194 @@
+"""
+Near-Duplicate Detection
+
+MinHash signatures and an LSH index for finding logs that are almost, but not
+byte-for-byte, identical, such as CI logs that differ only in timestamps,
+paths or build ids.
+
+Text is normalized (timestamps, dates, paths, hex ids and UUIDs replaced by
+placeholders), split into lines, and each distinct line is hashed with CRC32.
+A signature is the per-permutation minimum of NUM_PERM universal hashes of
+those line hashes. The fraction of equal signature slots estimates the
+Jaccard similarity of two files' line sets. Signatures are built
+incrementally chunk by chunk, so memory does not grow with file size.
+
+find_near_duplicates() buckets signatures into LSH bands, verifies candidate
+pairs against the threshold and merges them into clusters with union-find,
+which is close to linear in the number of files.
+
+Usage: python src/near_duplicates.py [<dir>] [<threshold>]
+"""
+import re
+import sys
+import zlib
+import base64
+import logging
+from pathlib import Path
+from collections import defaultdict
+
+import numpy as np
+
+NUM_PERM = 128
+DEFAULT_THRESHOLD = 0.8
+HASH_BATCH = 4096  # distinct lines hashed per vectorized step
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.RandomState(1)
+PERM_A = _rng.randint(1, np.iinfo(np.int64).max, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+PERM_B = _rng.randint(0, np.iinfo(np.int64).max, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+
+# Volatile tokens that make otherwise identical CI logs differ
+NORMALIZE_PATTERNS = (
+    (re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?'), '<timestamp>'),
+    (re.compile(r'\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4}'), '<date>'),
+    (re.compile(r'\d{1,2}:\d{2}:\d{2}(?:[.,]\d+)?'), '<time>'),
+    (re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'), '<uuid>'),
+    (re.compile(r'\b(?:0x)?[0-9a-fA-F]{16,}\b'), '<hex>'),
+    (re.compile(r'(?:[A-Za-z]:\\|/)(?:[\w.+-]+[\\/])+'), '<path>/'),
+)
+
+
+def normalize(text):
+    """Replace volatile tokens with placeholders"""
+    for pattern, placeholder in NORMALIZE_PATTERNS:
+        text = pattern.sub(placeholder, text)
+    return text
+
+
+class MinHash:
+    """Incremental MinHash over the distinct normalized lines of a text"""
+
+    def __init__(self):
+        self.signature = np.full(NUM_PERM, MAX_HASH, dtype=np.uint64)
+        self.empty = True
+
+    def update_text(self, text):
+        """Fold the complete lines of text into the signature"""
+        distinct = {line.strip() for line in normalize(text).split('\n')}
+        distinct.discard('')
+        if not distinct:
+            return
+        hashes = np.fromiter((zlib.crc32(line.encode()) for line in distinct), dtype=np.uint64, count=len(distinct))
+        for start in range(0, len(hashes), HASH_BATCH):
+            batch = hashes[start:start + HASH_BATCH, None]
+            permuted = ((batch * PERM_A + PERM_B) % MERSENNE_PRIME) & MAX_HASH
+            np.minimum(self.signature, permuted.min(axis=0), out=self.signature)
+        self.empty = False
+
+    def digest(self):
+        """Compact text form of the signature (None for texts without lines)"""
+        if self.empty:
+            return None
+        return base64.b64encode(self.signature.astype('<u4').tobytes()).decode('ascii')
+
+
+def decode_signature(digest):
+    return np.frombuffer(base64.b64decode(digest), dtype='<u4')
+
+
+def text_signature(text):
+    minhash = MinHash()
+    minhash.update_text(text)
+    return minhash.digest()
+
+
+def similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of the line sets behind two signatures"""
+    return float(np.mean(signature_a == signature_b))
+
+
+def lsh_params(threshold, num_perm=NUM_PERM):
+    """(bands, rows) with bands * rows = num_perm whose S-curve midpoint is closest to threshold"""
+    options = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    return min(options, key=lambda option: abs((1 / option[0]) ** (1 / option[1]) - threshold))
+
+
+class LSHIndex:
+    """Banded LSH index: files sharing any band bucket become candidate pairs"""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.bands, self.rows = lsh_params(threshold)
+        self.buckets = [defaultdict(list) for _ in range(self.bands)]
+
+    def band_keys(self, signature):
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def add(self, key, signature):
+        for band, band_key in enumerate(self.band_keys(signature)):
+            self.buckets[band][band_key].append(key)
+
+    def query(self, signature):
+        """Keys sharing at least one band with signature"""
+        return {key for band, band_key in enumerate(self.band_keys(signature))
+                for key in self.buckets[band].get(band_key, ())}
+
+    def candidate_pairs(self):
+        """Pairs sharing a bucket, linked to the bucket's first key so large groups stay linear"""
+        pairs = set()
+        for buckets in self.buckets:
+            for keys in buckets.values():
+                pairs.update((keys[0], key) for key in keys[1:])
+        return pairs
+
+
+def find_near_duplicates(signatures, threshold=DEFAULT_THRESHOLD):
+    """Cluster keys whose signatures are at least `threshold` similar.
+
+    signatures maps key -> signature array (or digest string). Returns a list
+    of clusters, each a dict with sorted 'members' and 'min_similarity' (the
+    lowest verified similarity among the pairs that joined the cluster).
+    """
+    signatures = {key: decode_signature(sig) if isinstance(sig, str) else sig
+                  for key, sig in signatures.items() if sig is not None}
+    index = LSHIndex(threshold)
+    for key, signature in signatures.items():
+        index.add(key, signature)
+
+    parent = {}
+
+    def find(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    pair_scores = []
+    for a, b in index.candidate_pairs():
+        score = similarity(signatures[a], signatures[b])
+        if score >= threshold:
+            parent.setdefault(a, a)
+            parent.setdefault(b, b)
+            parent[find(b)] = find(a)
+            pair_scores.append((a, score))
+
+    clusters = defaultdict(list)
+    for key in parent:
+        clusters[find(key)].append(key)
+    lowest = defaultdict(lambda: 1.0)
+    for key, score in pair_scores:
+        root = find(key)
+        lowest[root] = min(lowest[root], score)
+    return sorted(({'members': sorted(members), 'min_similarity': round(lowest[root], 3)}
+                   for root, members in clusters.items()), key=lambda cluster: cluster['members'])
+
+
+def main():
+    """Cluster the near-duplicate text files under a directory"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    root = Path(sys.argv[1] if len(sys.argv) > 1 else "data/rddl_downloads")
+    threshold = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_THRESHOLD
+
+    signatures = {}
+    for path in sorted(p for p in root.rglob('*') if p.is_file()):
+        signatures[str(path.relative_to(root))] = text_signature(path.read_text(encoding='utf-8', errors='ignore'))
+    clusters = find_near_duplicates(signatures, threshold)
+
+    print(f"🧬 {len(clusters)} near-duplicate clusters among {len(signatures)} files (threshold {threshold})")
+    for cluster in clusters:
+        print(f"   • similarity >= {cluster['min_similarity']}: {', '.join(cluster['members'])}")
+
+
+if __name__ == "__main__":
+    main()
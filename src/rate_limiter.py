@@ -0,0 +1,239 @@
+"""
+Rate Limiter
+
+Thread-safe token buckets used to cap the request rate the collectors send to
+the data lake, independent of how many worker threads or coroutines issue
+requests.
+
+- TokenBucket: fixed rate with bursts of up to `capacity`
+- AdaptiveTokenBucket: AIMD rate. Each answered request adds a little
+  (`increase` requests/s per second of full-rate traffic); a 429/503 or a
+  response slower than `latency_target` cuts the rate by a factor, at most
+  once per `cooldown`, and a Retry-After pauses the whole bucket
+- RateLimiter: one adaptive bucket per endpoint class (metadata listing,
+  download, upload), shared by every session and client in the process
+
+Budgets are per process: threads and coroutines share RateLimiter.shared(),
+but every process (a second collector, multiprocessing workers) gets its own
+buckets. Divide RDDL_RATE_LIMITS between processes that run side by side.
+
+Usage: RDDL_RATE_LIMITS="metadata=10,download=40" python src/focused_data_collector.py
+"""
+import os
+import time
+import asyncio
+import threading
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Token bucket: `rate` tokens per second, bursts of up to `capacity`"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens=1):
+        """Take tokens if available; returns the seconds to wait otherwise (0 on success)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        """Block until tokens are available"""
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens=1):
+        """Wait on the event loop until tokens are available"""
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """Token bucket whose rate follows server feedback (additive increase, multiplicative decrease)"""
+
+    def __init__(self, rate, capacity=None, min_rate=None, max_rate=None, increase=None,
+                 decrease=0.5, latency_target=None, latency_decrease=0.8, cooldown=0.5, max_pause=60.0):
+        super().__init__(rate, capacity)
+        # The burst allowance follows the rate: as many seconds of traffic as at the start
+        self.burst = self.capacity / self.rate
+        self.min_rate = float(min_rate if min_rate is not None else max(0.5, self.rate / 20))
+        self.max_rate = float(max_rate if max_rate is not None else self.rate * 4)
+        # Requests/s gained per second of traffic at the current rate
+        self.increase = float(increase if increase is not None else max(0.5, self.rate / 10))
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.latency_decrease = latency_decrease
+        self.cooldown = cooldown
+        self.max_pause = max_pause
+        self.last_decrease = None
+        self.stats = {'requests': 0, 'throttled': 0, 'slow': 0, 'waited_seconds': 0.0}
+
+    def _set_rate(self, rate, now):
+        self._refill(now)
+        self.rate = min(self.max_rate, max(self.min_rate, rate))
+        self.capacity = max(1.0, self.rate * self.burst)
+        self.tokens = min(self.tokens, self.capacity)
+
+    def _cut(self, factor, now):
+        """Multiply the rate by factor unless it was already cut within the cooldown"""
+        if self.last_decrease is not None and now - self.last_decrease < self.cooldown:
+            return
+        self._set_rate(self.rate * factor, now)
+        self.last_decrease = now
+
+    def on_success(self, latency=None):
+        """An answered request: grow the rate, or shrink it if the answer was slow"""
+        with self._lock:
+            self.stats['requests'] += 1
+            now = time.monotonic()
+            if self.latency_target is not None and latency is not None and latency > self.latency_target:
+                self.stats['slow'] += 1
+                self._cut(self.latency_decrease, now)
+                return
+            # +increase/rate per response is +increase per second at full utilisation
+            self._set_rate(self.rate + self.increase / self.rate, now)
+
+    def on_throttle(self, pause=None):
+        """A 429/503: cut the rate and hold every caller back for the requested pause"""
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['throttled'] += 1
+            now = time.monotonic()
+            self._cut(self.decrease, now)
+            # A negative balance makes every acquire wait until the pause is over
+            self.tokens = min(self.tokens, 0.0, -min(pause or 0.0, self.max_pause) * self.rate)
+
+    def wait_time(self, tokens=1):
+        wait = self.try_acquire(tokens)
+        if wait:
+            with self._lock:
+                self.stats['waited_seconds'] += wait
+        return wait
+
+    def acquire(self, tokens=1):
+        while True:
+            wait = self.wait_time(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens=1):
+        while True:
+            wait = self.wait_time(tokens)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, rate=round(self.rate, 2), waited_seconds=round(self.stats['waited_seconds'], 3))
+
+
+# Starting requests/s per endpoint; AIMD moves each between rate/20 and 4 * rate
+DEFAULT_BUDGETS = {'metadata': 20.0, 'download': 50.0, 'upload': 20.0}
+# A response slower than this (time to headers for streamed downloads) counts as congestion
+LATENCY_TARGETS = {'metadata': 5.0, 'download': 10.0, 'upload': 30.0}
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+def endpoint_of(method, url):
+    """Budget an RDDL request counts against: metadata, download, upload or other"""
+    path = urlparse(url).path.rstrip('/')
+    if '/artifacts' not in path:
+        return 'other'
+    if path.endswith('/metadata'):
+        return 'metadata'
+    if method.upper() == 'POST':
+        return 'upload'
+    return 'download'
+
+
+def parse_budgets(spec):
+    """'metadata=10,download=40' -> {'metadata': 10.0, 'download': 40.0}"""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+        name, _, rate = item.partition('=')
+        budgets[name.strip()] = float(rate)
+    return budgets
+
+
+class RateLimiter:
+    """Per-endpoint adaptive budgets; endpoints without a budget are not limited"""
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, budgets=None, latency_targets=None, **bucket_options):
+        budgets = DEFAULT_BUDGETS if budgets is None else budgets
+        latency_targets = LATENCY_TARGETS if latency_targets is None else latency_targets
+        self.buckets = {name: AdaptiveTokenBucket(rate, latency_target=latency_targets.get(name), **bucket_options)
+                        for name, rate in budgets.items()}
+
+    @classmethod
+    def shared(cls):
+        """Process-wide limiter, budgets from RDDL_RATE_LIMITS over DEFAULT_BUDGETS.
+
+        Shared by the threads and event loops of this process only; other
+        processes have their own instance and their own full budgets.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(dict(DEFAULT_BUDGETS, **parse_budgets(os.getenv('RDDL_RATE_LIMITS'))))
+            return cls._shared
+
+    def bucket(self, method, url):
+        return self.buckets.get(endpoint_of(method, url))
+
+    def acquire(self, method, url):
+        bucket = self.bucket(method, url)
+        if bucket:
+            bucket.acquire()
+
+    async def acquire_async(self, method, url):
+        bucket = self.bucket(method, url)
+        if bucket:
+            await bucket.acquire_async()
+
+    def feedback(self, method, url, status, latency=None, pause=None):
+        """Report how a request went.
+
+        Other 5xx answers and failures before any answer (status None) leave
+        the rate alone: they are the circuit breaker's business, not a sign of
+        throttling.
+        """
+        bucket = self.bucket(method, url)
+        if bucket is None or status is None:
+            return
+        if status in THROTTLE_STATUSES:
+            bucket.on_throttle(pause)
+        elif status < 500:
+            bucket.on_success(latency)
+
+    def handles_retry_after(self, method, url, status):
+        """True if feedback for this answer pauses a bucket for its Retry-After.
+
+        Retry loops then back off without the Retry-After: the next acquire
+        already waits out the pause.
+        """
+        return status in THROTTLE_STATUSES and self.bucket(method, url) is not None
+
+    def stats(self):
+        return {name: bucket.snapshot() for name, bucket in self.buckets.items()}
@@ -0,0 +1,458 @@
+"""
+Async RDDL Client
+
+Single asyncio client for the RDDL REST API shared by all collectors:
+metadata listing, artifact download, artifact upload and project access probes.
+One aiohttp session provides connection pooling and keep-alive, and a global
+semaphore bounds the number of requests in flight across every caller, so
+hundreds of projects can be driven from one process without a thread per request.
+
+upload_batch() uploads many artifacts over that session: bodies are streamed
+from file handles or chunk generators, the largest files start first so one
+big artifact does not finish alone at the end, and each file is retried on
+connection errors and retryable status codes.
+
+Metadata requests and downloads go through the same RetryPolicy and per-host
+circuit breakers as the synchronous collectors (see rddl_transport); an
+interrupted download continues its ".part" file with a Range request. With a
+RateLimiter every request waits for a token of its endpoint's budget and
+reports its status and time to headers back, so the client adapts to the
+server's throttling together with the synchronous sessions of the process.
+With a Metrics object the client records the same phases as RetryingSession
+and download_with_resume (listing, first_byte, download, write, upload).
+"""
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import mimetypes
+import contextlib
+from collections import deque
+from pathlib import Path
+
+import aiohttp
+
+try:
+    from src.streaming_download import astream_to_file, new_partial, CHUNK_SIZE
+    from src.rddl_transport import (RetryPolicy, CircuitBreakers, CircuitOpenError, retry_after, backoff_headers,
+                                    REQUEST_PHASES, FAILURE_STATUSES, RETRY_STATUSES as GET_RETRY_STATUSES)
+    from src.rate_limiter import endpoint_of
+except ImportError:  # running as a script from src/
+    from streaming_download import astream_to_file, new_partial, CHUNK_SIZE
+    from rddl_transport import (RetryPolicy, CircuitBreakers, CircuitOpenError, retry_after, backoff_headers,
+                                REQUEST_PHASES, FAILURE_STATUSES, RETRY_STATUSES as GET_RETRY_STATUSES)
+    from rate_limiter import endpoint_of
+
+DEFAULT_BASE_URL = "https://rd-datalake.icp.infineon.com"
+DEFAULT_TAGS = ("ci", "automation", "logs")
+
+# Upload responses worth retrying; anything else is final
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+# Connection-level failures retried for GETs
+TRANSIENT_ERRORS = (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError)
+
+
+def upload_source(item):
+    """Normalize an upload_batch item to (filename, size, open_body).
+
+    An item is a local path, or a (filename, open_body, size) tuple where
+    open_body() returns a fresh body on every call: a binary file object,
+    bytes, or a sync or async iterator of byte chunks. Bodies are re-opened
+    for every attempt, so a retry never sends a half-consumed stream.
+    """
+    if isinstance(item, (str, os.PathLike)):
+        path = os.fspath(item)
+        return os.path.basename(path), os.path.getsize(path), lambda: open(path, 'rb')
+    filename, open_body, size = item
+    return filename, size, open_body
+
+
+async def iterate_chunks(chunks):
+    """Async view of a sync chunk iterator, for aiohttp chunked request bodies"""
+    for chunk in chunks:
+        yield chunk
+
+
+def upload_metadata(description=None, tags=DEFAULT_TAGS):
+    """Metadata header builder for a batch: filename -> Metadata JSON.
+
+    The JSON around the file name is serialized once; per file only the
+    escaped name is spliced in. A fixed description makes the header constant.
+    """
+    if description:
+        metadata = json.dumps({"description": description, "tags": list(tags)})
+        return lambda filename: metadata
+    head = '{"description": "Auto-uploaded log file '
+    tail = '", "tags": ' + json.dumps(list(tags)) + '}'
+    return lambda filename: head + json.dumps(filename)[1:-1] + tail
+
+
+DEFAULT_METADATA = upload_metadata()
+
+
+def upload_headers(filename, metadata=DEFAULT_METADATA):
+    """Artifact upload headers; metadata comes from upload_metadata, built once per batch"""
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    return {
+        "Filename": filename,
+        "Metadata": metadata(filename),
+        "ContentType": content_type,
+        "Content-Type": content_type
+    }
+
+
+class AsyncRDDLClient:
+    """Pooled, concurrency-limited asyncio client for the RDDL API.
+
+    Use as an async context manager:
+
+        async with AsyncRDDLClient(max_concurrency=64) as client:
+            artifacts = await client.list_artifacts('PWRLIB72')
+    """
+
+    def __init__(self, token=None, base_url=DEFAULT_BASE_URL, max_concurrency=32,
+                 limit_per_host=16, timeout=120, keepalive_timeout=30, retry_policy=None,
+                 rate_limiter=None, metrics=None):
+        self.token = token or os.getenv('RDDL_API_TOKEN')
+        if not self.token:
+            raise ValueError("RDDL_API_TOKEN environment variable required")
+
+        self.base_url = base_url.rstrip('/')
+        self.api_url = f"{self.base_url}/api/v1"
+        self.max_concurrency = max_concurrency
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breakers = CircuitBreakers()
+        self.retries = 0
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency,
+                                         limit_per_host=self.limit_per_host,
+                                         keepalive_timeout=self.keepalive_timeout)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers={'Authorization': f'Bearer {self.token}'},
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=self.timeout)
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    def artifacts_url(self, project_key):
+        return f"{self.api_url}/projects/{project_key}/artifacts"
+
+    @contextlib.asynccontextmanager
+    async def paced(self, method, url):
+        """Wait for a rate-limiter token, then hold a concurrency slot; yields the start time"""
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(method, url)
+        async with self.semaphore:
+            if self.metrics is None:
+                yield time.monotonic()
+            else:
+                with self.metrics.tracking('requests'):
+                    yield time.monotonic()
+
+    def report(self, method, url, resp, started):
+        """Tell the rate limiter how a request was answered and how long the headers took"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.feedback(method, url, resp.status, time.monotonic() - started,
+                                       retry_after(resp.headers))
+
+    def observe(self, method, url, started):
+        """Record the request's metrics phase (listing, first_byte), if it has one"""
+        phase = REQUEST_PHASES.get(endpoint_of(method, url))
+        if self.metrics is not None and phase:
+            self.metrics.observe(phase, time.monotonic() - started)
+
+    async def with_retries(self, url, attempt):
+        """Run attempt() under the retry policy and url's circuit breaker.
+
+        attempt is a coroutine function returning (status, result, headers);
+        it is re-run after TRANSIENT_ERRORS and GET_RETRY_STATUSES. Returns
+        the (status, result) of the last attempt.
+        """
+        breaker = self.breakers[url]
+        max_attempts = self.retry_policy.max_attempts
+        for n in range(max_attempts):
+            last = n == max_attempts - 1
+            wait = breaker.allow()
+            if wait:
+                if last:
+                    raise CircuitOpenError(f"Circuit open for {url}")
+                await asyncio.sleep(wait)
+                continue
+
+            try:
+                status, result, headers = await attempt()
+            except TRANSIENT_ERRORS as e:
+                breaker.record_failure()
+                if last:
+                    raise
+                logging.warning(f"GET {url} failed ({type(e).__name__}), retry {n + 1}")
+                self.retries += 1
+                await asyncio.sleep(self.retry_policy.delay(n))
+                continue
+
+            if status in FAILURE_STATUSES:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            if status not in GET_RETRY_STATUSES or last:
+                return status, result
+            logging.warning(f"GET {url} returned {status}, retry {n + 1}")
+            self.retries += 1
+            await asyncio.sleep(self.retry_policy.delay(n, backoff_headers(self.rate_limiter, 'GET', url,
+                                                                           status, headers)))
+
+    async def get_json(self, url, params=None):
+        """GET a JSON document; returns (status_code, payload or error text)"""
+        async def attempt():
+            async with self.paced('GET', url) as started:
+                async with self.session.get(url, params=params) as resp:
+                    self.report('GET', url, resp, started)
+                    payload = await resp.json(content_type=None) if resp.status == 200 else await resp.text()
+                    self.observe('GET', url, started)
+                    return resp.status, payload, resp.headers
+        return await self.with_retries(url, attempt)
+
+    async def fetch_page(self, project_key, page_number, page_size=100):
+        """Fetch one metadata page; returns the list of raw artifacts"""
+        url = f"{self.artifacts_url(project_key)}/metadata"
+        status, payload = await self.get_json(url, {'pageSize': page_size, 'pageNumber': page_number})
+        if status != 200:
+            raise RuntimeError(f"HTTP {status} on page {page_number}: {payload[:200]}")
+        return payload.get('data', []) or []
+
+    async def iter_artifacts_metadata(self, project_key, page_size=100, lookahead=4, max_items=None):
+        """Async generator over raw artifact metadata, prefetching `lookahead` pages.
+
+        Page 1 is fetched on its own; prefetching starts only once a full first
+        page shows there are more, so small projects cost a single request.
+        A page that still fails after the client's retries is raised.
+        """
+        yielded = 0
+        next_page = 1
+        window = 1
+        pending = []
+        try:
+            while True:
+                while len(pending) < window:
+                    pending.append(asyncio.ensure_future(self.fetch_page(project_key, next_page, page_size)))
+                    next_page += 1
+
+                try:
+                    artifacts = await pending.pop(0)
+                except Exception as e:
+                    # A page lost after its retries must not pass for the end of the listing
+                    logging.error(f"Error fetching {project_key}: {e}")
+                    raise
+
+                for artifact in artifacts:
+                    if max_items is not None and yielded >= max_items:
+                        return
+                    yield artifact
+                    yielded += 1
+
+                if len(artifacts) < page_size:
+                    return
+                window = max(1, lookahead)
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def list_artifacts(self, project_key, page_size=100, lookahead=4, max_items=None):
+        """Return all raw artifact metadata for a project"""
+        return [artifact async for artifact in
+                self.iter_artifacts_metadata(project_key, page_size, lookahead, max_items)]
+
+    async def download_artifact(self, project_key, artifact_id, save_path, resume_from=0,
+                                keep_partial=False, chunk_size=CHUNK_SIZE, partial=None,
+                                expected_size=None, expected_md5=None):
+        """Stream an artifact to save_path atomically.
+
+        Returns (size_in_bytes, sha256, resumed). With resume_from > 0 a Range
+        request continues the existing partial file; if the server answers 200
+        instead of 206 the download restarts from the beginning. A connection
+        dropped mid-body is retried from the bytes already on disk. Without
+        partial the body goes to a fresh temporary file that is never kept.
+        expected_size and expected_md5 are verified before the rename (see
+        streaming_download.IntegrityError).
+        """
+        if partial is None and resume_from:
+            raise ValueError("resume_from needs the partial path of the interrupted download")
+        url = f"{self.artifacts_url(project_key)}/{artifact_id}"
+        keep_partial = keep_partial and partial is not None
+        part = Path(partial) if partial is not None else new_partial(save_path)
+        offset = resume_from
+        resumed = False
+        start = None
+
+        async def attempt():
+            nonlocal offset, resumed, start
+            headers = {'Range': f"bytes={offset}-"} if offset else None
+            async with self.paced('GET', url) as started:
+                if start is None:
+                    # Timed from the first slot, not from the call: queueing is not download time
+                    start = started
+                    if self.metrics is not None:
+                        self.metrics.add_in_flight('downloads', 1)
+                async with self.session.get(url, headers=headers) as resp:
+                    self.report('GET', url, resp, started)
+                    self.observe('GET', url, started)
+                    if resp.status in GET_RETRY_STATUSES:
+                        return resp.status, None, resp.headers
+                    resp.raise_for_status()
+                    if offset and resp.status != 206:
+                        offset = 0
+                    resumed = resumed or bool(offset)
+                    try:
+                        result = await astream_to_file(resp.content.iter_chunked(chunk_size), save_path,
+                                                       resume_from=offset, keep_partial=True,
+                                                       metrics=self.metrics, partial=part,
+                                                       expected_size=expected_size, expected_md5=expected_md5)
+                    except TRANSIENT_ERRORS:
+                        offset = part.stat().st_size if part.exists() else 0
+                        raise
+                    return resp.status, result, resp.headers
+
+        try:
+            status, result = await self.with_retries(url, attempt)
+            if result is None:
+                raise RuntimeError(f"HTTP {status} downloading {artifact_id}")
+        except BaseException:
+            if not keep_partial and part.exists():
+                part.unlink()
+            raise
+        finally:
+            if self.metrics is not None and start is not None:
+                self.metrics.add_in_flight('downloads', -1)
+        size, sha256 = result
+        if self.metrics is not None:
+            self.metrics.observe('download', time.monotonic() - start, size - resume_from)
+        return size, sha256, resumed
+
+    async def upload_file(self, project_key, local_file, filename=None, description=None,
+                          tags=DEFAULT_TAGS):
+        """Upload a local file, streaming the body from the file handle.
+
+        Returns (status_code, response_text).
+        """
+        filename = filename or os.path.basename(local_file)
+        headers = upload_headers(filename, upload_metadata(description, tags))
+        return await self.post_artifact(project_key, lambda: open(local_file, 'rb'), headers)
+
+    async def post_artifact(self, project_key, open_body, headers):
+        """POST one artifact body (see upload_source); returns (status_code, response_text)"""
+        url = self.artifacts_url(project_key)
+        async with self.paced('POST', url) as started:
+            source = open_body()
+            body = source
+            if not (hasattr(body, 'read') or isinstance(body, (bytes, bytearray)) or hasattr(body, '__aiter__')):
+                body = iterate_chunks(body)
+            try:
+                async with self.session.post(url, data=body, headers=headers) as resp:
+                    self.report('POST', url, resp, started)
+                    return resp.status, await resp.text()
+            finally:
+                if hasattr(source, 'close'):
+                    source.close()
+
+    async def upload_with_retry(self, project_key, filename, size, open_body, headers, retries=3, backoff=0.5):
+        """Upload one artifact, retrying connection errors and RETRY_STATUSES with jittered backoff"""
+        start = time.perf_counter()
+        for attempt in range(retries + 1):
+            try:
+                status, text = await self.post_artifact(project_key, open_body, headers)
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                status, text = None, str(e) or type(e).__name__
+            if status is not None and status not in RETRY_STATUSES:
+                break
+            if attempt < retries:
+                logging.warning(f"Upload of {filename} failed ({status or text}), retry {attempt + 1}/{retries}")
+                await asyncio.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+        seconds = time.perf_counter() - start
+        if self.metrics is not None:
+            self.metrics.observe('upload', seconds, size if status is not None and status < 300 else 0)
+        return {
+            'filename': filename,
+            'size': size,
+            'status': status,
+            'response': text,
+            'attempts': attempt + 1,
+            'seconds': round(seconds, 3)
+        }
+
+    async def upload_batch(self, project_key, items, concurrency=None, retries=3, backoff=0.5,
+                           description=None, tags=DEFAULT_TAGS):
+        """Upload many artifacts concurrently over the pooled session, largest first.
+
+        items are local paths or (filename, open_body, size) tuples (see
+        upload_source). Returns (results, summary): one result dict per item in
+        input order (filename, size, status, response, attempts, seconds) and
+        a summary with counts, bytes, elapsed seconds and throughput.
+        """
+        sources = [upload_source(item) for item in items]
+        metadata = upload_metadata(description, tags)
+        # Longest-processing-time-first: big uploads overlap with the many small ones
+        pending = deque(sorted(range(len(sources)), key=lambda i: -sources[i][1]))
+        results = [None] * len(sources)
+
+        async def worker():
+            while pending:
+                i = pending.popleft()
+                filename, size, open_body = sources[i]
+                results[i] = await self.upload_with_retry(project_key, filename, size, open_body,
+                                                          upload_headers(filename, metadata),
+                                                          retries, backoff)
+
+        start = time.perf_counter()
+        workers = min(concurrency or self.max_concurrency, len(sources))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        elapsed = time.perf_counter() - start
+
+        uploaded = [r for r in results if r['status'] == 201]
+        total_bytes = sum(r['size'] for r in uploaded)
+        summary = {
+            'files': len(results),
+            'uploaded': len(uploaded),
+            'failed': len(results) - len(uploaded),
+            'retries': sum(r['attempts'] - 1 for r in results),
+            'bytes': total_bytes,
+            'seconds': round(elapsed, 3),
+            'files_per_second': round(len(uploaded) / elapsed, 1) if elapsed else None,
+            'mb_per_second': round(total_bytes / 2**20 / elapsed, 2) if elapsed else None
+        }
+        return results, summary
+
+    async def test_project_access(self, project_key, timeout=10):
+        """Probe whether the token can read a project's metadata"""
+        url = f"{self.artifacts_url(project_key)}/metadata"
+        try:
+            async with self.paced('GET', url) as started:
+                async with self.session.get(url, params={'pageSize': 1},
+                                            timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+                    self.report('GET', url, resp, started)
+                    text = await resp.text()
+            return {
+                'accessible': resp.status == 200,
+                'status_code': resp.status,
+                'error': None if resp.status == 200 else text[:200]
+            }
+        except Exception as e:
+            return {'accessible': False, 'status_code': None, 'error': str(e) or type(e).__name__}
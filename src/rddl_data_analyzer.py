@@ -9,54 +9,203 @@ Analyzes the downloaded RDDL artifacts to understand:
 """
 import os
 import json
+import time
 import logging
 from pathlib import Path
 from datetime import datetime
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 import hashlib
 
+try:
+    from src.analysis_cache import AnalysisCache
+    from src.sensor_data import SensorCapture, is_sensor_file
+    from src.near_duplicates import MinHash, find_near_duplicates, DEFAULT_THRESHOLD as NEAR_DUPLICATE_THRESHOLD
+    from src.metrics import Metrics
+except ImportError:  # running as a script from src/
+    from analysis_cache import AnalysisCache
+    from sensor_data import SensorCapture, is_sensor_file
+    from near_duplicates import MinHash, find_near_duplicates, DEFAULT_THRESHOLD as NEAR_DUPLICATE_THRESHOLD
+    from metrics import Metrics
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# Streaming analysis: files are read once, CHUNK_SIZE characters at a time
+CHUNK_SIZE = 1024 * 1024
+PREVIEW_CHARS = 500
+# Longest line carried between chunks for MinHash; longer lines are shingled in pieces of this size
+MAX_LINE_CHARS = 64 * 1024
+
+# Keyword groups reported per file (substring match on lowercased content)
+KEYWORD_GROUPS = {
+    'contains_test_data': ('test', 'pass', 'fail', 'error', 'warning'),
+    'contains_performance_data': ('time', 'duration', 'performance', 'speed', 'memory'),
+    'contains_coverage_data': ('coverage', 'gcov', 'percent', '%'),
+}
+# Keywords that add data insights in analyze_file_type
+INSIGHT_KEYWORDS = ('pass', 'fail', 'filter', 'regulator', 'coverage')
+
+ALL_KEYWORDS = frozenset(kw for group in KEYWORD_GROUPS.values() for kw in group) | frozenset(INSIGHT_KEYWORDS)
+KEYWORD_OVERLAP = max(len(kw) for kw in ALL_KEYWORDS) - 1
+
+# Bump when classify_file or the per-file analysis layout changes; together with
+# the keyword tables it stamps cached analyses so stale ones are re-analyzed
+ANALYZER_RULES_REVISION = 4
+ANALYZER_VERSION = f"{ANALYZER_RULES_REVISION}-" + hashlib.md5(json.dumps(
+    [KEYWORD_GROUPS, INSIGHT_KEYWORDS, PREVIEW_CHARS], sort_keys=True).encode()).hexdigest()[:12]
+
+
+def match_keywords(text, keywords):
+    """Subset of keywords occurring in text.
+    
+    Substring search per keyword runs in C and is several times faster than a
+    regex alternation in CPython; callers only pass keywords not yet found, so
+    each chunk gets cheaper as matches accumulate.
+    """
+    return {kw for kw in keywords if kw in text}
+
+
+def scan_file(file_path, chunk_size=CHUNK_SIZE):
+    """Read a file once in chunks and collect everything the analyzer needs.
+    
+    Returns content_hash (md5 of the decoded UTF-8 text), preview, line_count,
+    the set of keywords found and a MinHash digest of the normalized lines
+    (see near_duplicates). Memory use is bounded by the chunk size and
+    MAX_LINE_CHARS, even for files without line breaks.
+    """
+    file_path = Path(file_path)
+    newline = text_newline(file_path)
+    
+    hasher = hashlib.md5()
+    preview = []
+    preview_len = 0
+    newlines = 0
+    found = set()
+    tail = ''
+    minhash = MinHash()
+    partial_line = ''
+    
+    with open(file_path, 'r', encoding='utf-8', errors='ignore', newline=newline) as f:
+        for chunk in iter(lambda: f.read(chunk_size), ''):
+            hasher.update(chunk.encode())
+            newlines += chunk.count('\n')
+            if preview_len < PREVIEW_CHARS:
+                preview.append(chunk[:PREVIEW_CHARS - preview_len])
+                preview_len += len(preview[-1])
+            
+            if len(found) < len(ALL_KEYWORDS):
+                # Carry the end of the previous chunk so keywords spanning chunks match
+                window = tail + chunk.lower()
+                found |= match_keywords(window, ALL_KEYWORDS - found)
+                tail = window[-KEYWORD_OVERLAP:] if KEYWORD_OVERLAP else ''
+            
+            # Only complete lines are hashed; the last partial line waits for the next chunk
+            lines, _, partial_line = (partial_line + chunk).rpartition('\n')
+            minhash.update_text(lines)
+            # ...unless it outgrows MAX_LINE_CHARS: then it is shingled in pieces cut from the line start
+            while len(partial_line) > MAX_LINE_CHARS:
+                minhash.update_text(partial_line[:MAX_LINE_CHARS])
+                partial_line = partial_line[MAX_LINE_CHARS:]
+        minhash.update_text(partial_line)
+    
+    return {
+        'content_hash': hasher.hexdigest(),
+        'preview': ''.join(preview),
+        'line_count': newlines + 1,
+        'keywords': found,
+        'minhash': minhash.digest()
+    }
+
+
+def text_newline(file_path):
+    """open() newline mode for a file: .log/.txt use universal newlines, others are decoded as-is"""
+    return None if Path(file_path).suffix.lower() in ['.log', '.txt'] else ''
+
+
+def file_content_hash(file_path, chunk_size=CHUNK_SIZE):
+    """The content_hash analyze_file_content reports, without the rest of the scan.
+    
+    Lets the analysis cache tell a touched file from a changed one.
+    """
+    file_path = Path(file_path)
+    capture = SensorCapture(file_path) if is_sensor_file(file_path) else None
+    if capture is not None and capture.kind in ('npy', 'binary'):
+        return capture.content_hash()
+    hasher = hashlib.md5()
+    with open(file_path, 'r', encoding='utf-8', errors='ignore', newline=text_newline(file_path)) as f:
+        for chunk in iter(lambda: f.read(chunk_size), ''):
+            hasher.update(chunk.encode())
+    return hasher.hexdigest()
+
+
+def find_keywords(content):
+    """Set of analyzer keywords contained in an in-memory string"""
+    return match_keywords(str(content).lower(), ALL_KEYWORDS)
+
 class RDDLDataAnalyzer:
-    def __init__(self):
-        self.rddl_dir = Path("data/rddl_downloads/PWRLIB72")
-        self.analysis_dir = Path("data/rddl_analysis")
-        self.analysis_dir.mkdir(exist_ok=True)
+    def __init__(self, rddl_dir="data/rddl_downloads/PWRLIB72", analysis_dir="data/rddl_analysis",
+                 workers=1, use_cache=True, near_duplicate_threshold=NEAR_DUPLICATE_THRESHOLD, metrics=None):
+        self.rddl_dir = Path(rddl_dir)
+        self.analysis_dir = Path(analysis_dir)
+        self.analysis_dir.mkdir(parents=True, exist_ok=True)
+        
+        # workers > 1 spreads per-file analysis over a process pool
+        self.workers = max(1, workers)
+        
+        # Per-file results are cached across runs; only new or changed files are re-analyzed
+        self.use_cache = use_cache
+        self.cache_path = self.analysis_dir / "analysis_cache.sqlite"
+        
+        # Estimated Jaccard similarity of normalized lines above which logs count as near-duplicates
+        self.near_duplicate_threshold = near_duplicate_threshold
+        
+        # Wall time per stage of run_comprehensive_analysis (see stage())
+        self.metrics = metrics or Metrics()
+    
+    def __getstate__(self):
+        # Worker processes only run analyze_file_content; the metrics registry holds a lock and stays here
+        state = self.__dict__.copy()
+        state['metrics'] = None
+        return state
+    
+    @contextmanager
+    def stage(self, name):
+        """Time one stage of run_comprehensive_analysis as a metrics phase.
+        
+        Stages: list, analyze, duplicates, near_duplicates, sw_potential and
+        report. Set 'bytes' on the yielded dict to record the data a stage
+        processed. Profilers override this to hook in per stage.
+        """
+        with self.metrics.timer(name) as record:
+            yield record
         
     def analyze_file_content(self, file_path):
-        """Analyze content of a single file"""
+        """Analyze content of a single file in one streaming pass"""
         try:
-            # Read file content
-            if file_path.suffix.lower() in ['.log', '.txt']:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
+            capture = SensorCapture(file_path) if is_sensor_file(file_path) else None
+            if capture is not None and capture.kind in ('npy', 'binary'):
+                # Binary captures are summarized from the memory map instead of being decoded as text
+                scan = {'content_hash': capture.content_hash(), 'preview': '', 'line_count': 0,
+                        'keywords': set(), 'minhash': None}
             else:
-                with open(file_path, 'rb') as f:
-                    content = f.read()
-                    # Try to decode if it looks like text
-                    try:
-                        content = content.decode('utf-8', errors='ignore')
-                    except:
-                        content = f"<Binary file: {len(content)} bytes>"
-            
-            # Generate content hash for duplicate detection
-            content_hash = hashlib.md5(str(content).encode()).hexdigest()
+                scan = scan_file(file_path)
+            keywords = scan['keywords']
             
             analysis = {
                 'file_path': str(file_path),
                 'file_name': file_path.name,
                 'file_size': file_path.stat().st_size,
-                'content_hash': content_hash,
-                'content_preview': content[:500] if len(str(content)) > 500 else content,
-                'line_count': len(str(content).split('\n')) if isinstance(content, str) else 0,
-                'contains_test_data': any(keyword in str(content).lower() for keyword in 
-                                        ['test', 'pass', 'fail', 'error', 'warning']),
-                'contains_performance_data': any(keyword in str(content).lower() for keyword in 
-                                               ['time', 'duration', 'performance', 'speed', 'memory']),
-                'contains_coverage_data': any(keyword in str(content).lower() for keyword in 
-                                            ['coverage', 'gcov', 'percent', '%']),
-                'file_type_analysis': self.analyze_file_type(file_path, content)
+                'content_hash': scan['content_hash'],
+                'content_preview': scan['preview'],
+                'line_count': scan['line_count'],
+                'minhash': scan['minhash'],
             }
+            for flag, group in KEYWORD_GROUPS.items():
+                analysis[flag] = not keywords.isdisjoint(group)
+            analysis['file_type_analysis'] = self.classify_file(file_path, keywords)
+            if capture is not None:
+                analysis['sensor_summary'] = capture.summary()
             
             return analysis
             
@@ -69,8 +218,10 @@ class RDDLDataAnalyzer:
     
     def analyze_file_type(self, file_path, content):
         """Analyze what type of data this file contains"""
-        content_str = str(content).lower()
-        
+        return self.classify_file(file_path, find_keywords(content))
+    
+    def classify_file(self, file_path, keywords):
+        """Classify a file from its name and the set of keywords found in its content"""
         analysis = {
             'primary_type': 'unknown',
             'data_insights': [],
@@ -79,7 +230,7 @@ class RDDLDataAnalyzer:
         
         if file_path.name.startswith('test_'):
             analysis['primary_type'] = 'unit_test_log'
-            if 'pass' in content_str or 'fail' in content_str:
+            if 'pass' in keywords or 'fail' in keywords:
                 analysis['data_insights'].append('Contains test results')
                 analysis['sw_improvement_potential'] = 'high'
         
@@ -104,11 +255,11 @@ class RDDLDataAnalyzer:
             analysis['sw_improvement_potential'] = 'medium'
         
         # Add specific insights based on content
-        if 'filter' in content_str:
+        if 'filter' in keywords:
             analysis['data_insights'].append('Contains filter testing data')
-        if 'regulator' in content_str:
+        if 'regulator' in keywords:
             analysis['data_insights'].append('Contains regulator testing data')
-        if 'coverage' in content_str:
+        if 'coverage' in keywords:
             analysis['data_insights'].append('Contains code coverage metrics')
         
         return analysis
@@ -126,6 +277,48 @@ class RDDLDataAnalyzer:
         duplicates = {hash_val: files for hash_val, files in hash_groups.items() if len(files) > 1}
         return duplicates
     
+    def find_near_duplicates(self, file_analyses):
+        """Cluster files whose normalized lines are near-identical and estimate the savings.
+        
+        Exact copies beyond the first of each content hash could be dropped
+        entirely. Within a near-duplicate cluster the largest distinct file is
+        kept and every other distinct file is assumed to shrink to the part it
+        does not share, i.e. size * (1 - similarity), when stored or uploaded
+        as a delta against it.
+        """
+        by_path = {a['file_path']: a for a in file_analyses if a.get('minhash')}
+        clusters = find_near_duplicates({path: a['minhash'] for path, a in by_path.items()},
+                                        self.near_duplicate_threshold)
+        
+        exact_bytes = sum(sum(a['file_size'] for a in files[1:])
+                          for files in self.find_duplicates(file_analyses).values())
+        near_bytes = 0
+        report = []
+        for cluster in clusters:
+            members = [by_path[path] for path in cluster['members']]
+            distinct = sorted({a['content_hash']: a for a in members}.values(), key=lambda a: -a['file_size'])
+            redundant = sum(a['file_size'] for a in distinct[1:])
+            near_bytes += int(redundant * cluster['min_similarity'])
+            report.append({
+                'files': [a['file_name'] for a in members],
+                'total_bytes': sum(a['file_size'] for a in members),
+                'min_similarity': cluster['min_similarity'],
+                'redundant_bytes': redundant
+            })
+        report.sort(key=lambda cluster: -cluster['total_bytes'])
+        
+        return {
+            'threshold': self.near_duplicate_threshold,
+            'cluster_count': len(report),
+            'near_duplicate_files': sum(len(cluster['files']) for cluster in report),
+            'clusters': report,
+            'estimated_savings': {
+                'exact_duplicate_bytes': exact_bytes,
+                'near_duplicate_bytes': near_bytes,
+                'total_bytes': exact_bytes + near_bytes
+            }
+        }
+    
     def analyze_sw_improvement_potential(self, file_analyses):
         """Analyze potential for software improvement based on data types"""
         potential_analysis = {
@@ -175,6 +368,45 @@ class RDDLDataAnalyzer:
         
         return potential_analysis
     
+    def list_files(self):
+        """Files to analyze, in a stable order"""
+        return [file_path for file_path in sorted(self.rddl_dir.rglob('*'))
+                if file_path.is_file() and not file_path.name.endswith('.json')]
+    
+    def analyze_files(self, file_paths):
+        """Analyze files serially or across a process pool; results keep the input order"""
+        if self.workers == 1 or len(file_paths) < 2:
+            file_analyses = []
+            for file_path in file_paths:
+                logging.info(f"Analyzing: {file_path.name}")
+                file_analyses.append(self.analyze_file_content(file_path))
+            return file_analyses
+        
+        # Chunked submission amortizes inter-process overhead over many small files
+        chunksize = max(1, len(file_paths) // (self.workers * 8))
+        logging.info(f"Analyzing {len(file_paths)} files with {self.workers} processes (chunks of {chunksize})...")
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(self.analyze_file_content, file_paths, chunksize=chunksize))
+    
+    def analyze_files_cached(self, file_paths):
+        """Analyze only files that are new or changed since the last run.
+        
+        Returns (file_analyses in input order, cache statistics).
+        """
+        cache = AnalysisCache(self.cache_path, ANALYZER_VERSION, rehash=file_content_hash)
+        try:
+            cached, misses = cache.lookup(file_paths)
+            logging.info(f"🗂️  Analysis cache: {len(cached)} unchanged, {len(misses)} new or changed files")
+            fresh = self.analyze_files(misses)
+            cache.store(misses, fresh)
+            pruned = cache.prune(file_paths)
+        finally:
+            cache.close()
+        
+        fresh = dict(zip(misses, fresh))
+        file_analyses = [cached[path] if path in cached else fresh[path] for path in file_paths]
+        return file_analyses, {'cached': len(cached), 'analyzed': len(misses), 'pruned': pruned}
+    
     def run_comprehensive_analysis(self):
         """Run comprehensive analysis of all RDDL data"""
         logging.info("🔍 Starting comprehensive RDDL data analysis...")
@@ -184,47 +416,75 @@ class RDDLDataAnalyzer:
             return None
         
         # Analyze all files
-        file_analyses = []
+        with self.stage('list'):
+            file_paths = self.list_files()
+        start = time.perf_counter()
+        with self.stage('analyze') as record:
+            if self.use_cache:
+                file_analyses, cache_stats = self.analyze_files_cached(file_paths)
+            else:
+                file_analyses, cache_stats = self.analyze_files(file_paths), None
+            record['bytes'] = sum(a.get('file_size', 0) for a in file_analyses)
+        elapsed = time.perf_counter() - start
         
-        for file_path in self.rddl_dir.rglob('*'):
-            if file_path.is_file() and not file_path.name.endswith('.json'):
-                logging.info(f"Analyzing: {file_path.name}")
-                analysis = self.analyze_file_content(file_path)
-                file_analyses.append(analysis)
+        total_mb = sum(a.get('file_size', 0) for a in file_analyses) / (1024 * 1024)
+        throughput = {
+            'workers': self.workers,
+            'seconds': round(elapsed, 3),
+            'files_per_second': round(len(file_analyses) / elapsed, 1) if elapsed else None,
+            'mb_per_second': round(total_mb / elapsed, 2) if elapsed else None
+        }
+        logging.info(f"⚡ Analyzed {len(file_analyses)} files ({total_mb:.1f} MB) in {elapsed:.2f}s "
+                     f"with {self.workers} worker(s): {throughput['files_per_second']} files/s, "
+                     f"{throughput['mb_per_second']} MB/s")
         
         # Find duplicates
-        duplicates = self.find_duplicates(file_analyses)
+        with self.stage('duplicates'):
+            duplicates = self.find_duplicates(file_analyses)
+        with self.stage('near_duplicates'):
+            near_duplicates = self.find_near_duplicates(file_analyses)
         
         # Analyze SW improvement potential
-        sw_potential = self.analyze_sw_improvement_potential(file_analyses)
+        with self.stage('sw_potential'):
+            sw_potential = self.analyze_sw_improvement_potential(file_analyses)
         
         # Create comprehensive report
-        comprehensive_analysis = {
-            'analysis_timestamp': datetime.now().isoformat(),
-            'total_files_analyzed': len(file_analyses),
-            'file_analyses': file_analyses,
-            'duplicate_analysis': {
-                'duplicate_groups': len(duplicates),
-                'duplicates': duplicates,
-                'total_duplicate_files': sum(len(files) for files in duplicates.values())
-            },
-            'sw_improvement_potential': sw_potential,
-            'summary': {
-                'total_size_bytes': sum(a.get('file_size', 0) for a in file_analyses),
-                'file_types': self.get_file_type_summary(file_analyses),
-                'data_value_assessment': self.assess_overall_value(sw_potential)
+        with self.stage('report'):
+            comprehensive_analysis = {
+                'analysis_timestamp': datetime.now().isoformat(),
+                'total_files_analyzed': len(file_analyses),
+                # Signatures stay in the cache; they are noise in the report
+                'file_analyses': [{k: v for k, v in a.items() if k != 'minhash'} for a in file_analyses],
+                'duplicate_analysis': {
+                    'duplicate_groups': len(duplicates),
+                    'duplicates': {hash_val: [{k: v for k, v in a.items() if k != 'minhash'} for a in files]
+                                   for hash_val, files in duplicates.items()},
+                    'total_duplicate_files': sum(len(files) for files in duplicates.values())
+                },
+                'near_duplicate_analysis': near_duplicates,
+                'sw_improvement_potential': sw_potential,
+                'summary': {
+                    'total_size_bytes': sum(a.get('file_size', 0) for a in file_analyses),
+                    'file_types': self.get_file_type_summary(file_analyses),
+                    'data_value_assessment': self.assess_overall_value(sw_potential)
+                }
             }
-        }
         
-        # Save analysis
-        analysis_file = self.analysis_dir / f"rddl_comprehensive_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(analysis_file, 'w', encoding='utf-8') as f:
-            json.dump(comprehensive_analysis, f, indent=2, ensure_ascii=False)
+            # Save analysis
+            analysis_file = self.analysis_dir / f"rddl_comprehensive_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            with open(analysis_file, 'w', encoding='utf-8') as f:
+                json.dump(comprehensive_analysis, f, indent=2, ensure_ascii=False)
         
         logging.info(f"📊 Analysis saved to: {analysis_file}")
         
         # Print summary
         self.print_analysis_summary(comprehensive_analysis)
+        print(f"\n⚡ THROUGHPUT: {throughput['files_per_second']} files/s, "
+              f"{throughput['mb_per_second']} MB/s ({self.workers} worker(s), {throughput['seconds']}s)")
+        if cache_stats:
+            print(f"🗂️  CACHE: {cache_stats['cached']} files reused, {cache_stats['analyzed']} analyzed")
+        stages = self.metrics.snapshot()['phases']
+        print("⏱️  STAGES: " + ", ".join(f"{name} {stage['total_seconds']}s" for name, stage in stages.items()))
         
         return comprehensive_analysis
     
@@ -266,21 +526,33 @@ class RDDLDataAnalyzer:
         for file_type, count in analysis['summary']['file_types'].items():
             print(f"   {file_type:25} {count:>3} files")
         
-        print(f"\n🎯 SOFTWARE IMPROVEMENT POTENTIAL:")
+        print("\n🎯 SOFTWARE IMPROVEMENT POTENTIAL:")
         sw_potential = analysis['sw_improvement_potential']
         print(f"   High Value Data:   {len(sw_potential['high_value_data'])} files")
         print(f"   Medium Value Data: {len(sw_potential['medium_value_data'])} files")
         print(f"   Low Value Data:    {len(sw_potential['low_value_data'])} files")
         
         if sw_potential['recommendations']:
-            print(f"\n💡 RECOMMENDATIONS:")
+            print("\n💡 RECOMMENDATIONS:")
             for i, rec in enumerate(sw_potential['recommendations'], 1):
                 print(f"   {i}. {rec}")
         
         if analysis['duplicate_analysis']['duplicate_groups'] > 0:
-            print(f"\n⚠️  REDUNDANCY ANALYSIS:")
+            print("\n⚠️  REDUNDANCY ANALYSIS:")
             print(f"   Found {analysis['duplicate_analysis']['duplicate_groups']} groups of duplicate files")
             print(f"   Total redundant files: {analysis['duplicate_analysis']['total_duplicate_files']}")
+        
+        near = analysis['near_duplicate_analysis']
+        if near['cluster_count'] > 0:
+            savings = near['estimated_savings']
+            print(f"\n🧬 NEAR-DUPLICATES (similarity >= {near['threshold']}):")
+            print(f"   {near['cluster_count']} clusters covering {near['near_duplicate_files']} files")
+            for cluster in near['clusters'][:5]:
+                print(f"   • {len(cluster['files'])} files, {cluster['total_bytes']:,} bytes, "
+                      f"similarity >= {cluster['min_similarity']}: {', '.join(cluster['files'][:3])}"
+                      f"{' ...' if len(cluster['files']) > 3 else ''}")
+            print(f"   Estimated storage/upload savings: {savings['total_bytes']:,} bytes "
+                  f"({savings['exact_duplicate_bytes']:,} exact + {savings['near_duplicate_bytes']:,} near-duplicate)")
 
 def main():
     """Main execution function"""
@@ -289,11 +561,14 @@ def main():
     print("Analyzing downloaded RDDL data for software improvement insights...")
     print()
     
-    analyzer = RDDLDataAnalyzer()
+    workers = int(os.getenv('ANALYZER_WORKERS', str(os.cpu_count() or 1)))
+    use_cache = os.getenv('ANALYZER_CACHE', '1') != '0'
+    threshold = float(os.getenv('ANALYZER_NEAR_DUP_THRESHOLD', str(NEAR_DUPLICATE_THRESHOLD)))
+    analyzer = RDDLDataAnalyzer(workers=workers, use_cache=use_cache, near_duplicate_threshold=threshold)
     analysis = analyzer.run_comprehensive_analysis()
     
     if analysis:
-        print(f"\n📊 Detailed analysis saved to: data/rddl_analysis/")
+        print("\n📊 Detailed analysis saved to: data/rddl_analysis/")
         print("\n🚀 This analysis will help identify valuable data for software improvement!")
 
 if __name__ == "__main__":
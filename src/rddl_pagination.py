@@ -0,0 +1,114 @@
+"""
+RDDL Pagination
+
+Shared paginator for the RDDL artifacts metadata endpoint.
+Streams artifacts page by page as a generator while keeping up to `workers`
+page requests in flight: when the response reports a total the remaining pages
+are fetched in parallel, otherwise pages are prefetched ahead of the consumer
+until the first short or empty page. Page errors are logged and end the
+iteration early; `complete` tells a finished listing from a truncated one.
+"""
+import math
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Keys under which paginated responses may report the total number of items
+TOTAL_KEYS = ("totalCount", "total", "totalItems", "totalElements", "totalRecords")
+
+
+def find_total(payload):
+    """Return the total item count reported by a metadata response, or None"""
+    for container in (payload, payload.get("pagination"), payload.get("meta")):
+        if not isinstance(container, dict):
+            continue
+        for key in TOTAL_KEYS:
+            value = container.get(key)
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+    return None
+
+
+class ArtifactPaginator:
+    """Iterate all artifacts of a project's /artifacts/metadata endpoint"""
+
+    def __init__(self, session, url, page_size=100, workers=4, timeout=30,
+                 max_items=None, label=None):
+        self.session = session
+        self.url = url
+        self.page_size = page_size
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.max_items = max_items
+        self.label = label or url
+        self.pages_fetched = 0
+        # Set once the listing ran to its end (or to max_items) without a page error
+        self.complete = False
+
+    def fetch_page(self, page_number):
+        """Fetch one page; returns (artifacts, payload). Raises on HTTP errors."""
+        params = {"pageSize": self.page_size, "pageNumber": page_number}
+        logging.info(f"Fetching {self.label} page {page_number}...")
+        resp = self.session.get(self.url, params=params, timeout=self.timeout)
+        if resp.status_code != 200:
+            raise RuntimeError(f"HTTP {resp.status_code} on page {page_number}: {resp.text[:200]}")
+        payload = resp.json()
+        self.pages_fetched += 1
+        return payload.get("data", []) or [], payload
+
+    def __iter__(self):
+        self.complete = False
+        try:
+            yield from self.iter_pages()
+        except Exception as e:
+            logging.error(f"Error fetching {self.label}: {e}")
+            return
+        self.complete = True
+
+    def iter_pages(self):
+        """Yield artifacts page by page; raises the first page error"""
+        yielded = 0
+        artifacts, payload = self.fetch_page(1)
+
+        for artifact in artifacts:
+            if self.max_items is not None and yielded >= self.max_items:
+                return
+            yield artifact
+            yielded += 1
+
+        if len(artifacts) < self.page_size:
+            return
+
+        total = find_total(payload)
+        last_page = math.ceil(total / self.page_size) if total is not None else None
+        if self.max_items is not None:
+            max_page = math.ceil(self.max_items / self.page_size)
+            last_page = max_page if last_page is None else min(last_page, max_page)
+
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        pending = deque()
+        next_page = 2
+        try:
+            while True:
+                # Keep the prefetch window full
+                while len(pending) < self.workers and (last_page is None or next_page <= last_page):
+                    pending.append((next_page, executor.submit(self.fetch_page, next_page)))
+                    next_page += 1
+                if not pending:
+                    return
+
+                page_number, future = pending.popleft()
+                artifacts, _ = future.result()
+
+                for artifact in artifacts:
+                    if self.max_items is not None and yielded >= self.max_items:
+                        return
+                    yield artifact
+                    yielded += 1
+
+                if len(artifacts) < self.page_size:
+                    return
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,332 @@
+"""
+RDDL Transport
+
+Retry layer for RDDL API calls shared by the collectors:
+
+- RetryPolicy: exponential backoff with full jitter; 429/503 responses wait
+  at least as long as their Retry-After header asks
+- CircuitBreaker: per-host breaker that opens after `failure_threshold`
+  consecutive failures, so a struggling host gets one probe per
+  `reset_timeout` instead of every worker's retries
+- RetryingSession: requests.Session that applies both to idempotent requests
+  and, given a RateLimiter, paces every request and reports each answer back
+  to it; given a Metrics object, times listing requests and the time to first
+  byte of downloads
+- download_with_resume: streams a download to disk and, when the connection
+  drops mid-body, continues the ".part" file with a Range request instead of
+  starting over
+
+Transient failures are retried where they happen, so one bad page or one
+dropped download no longer ends a collection.
+"""
+import time
+import random
+import contextlib
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+from pathlib import Path
+
+import requests
+
+try:
+    from src.streaming_download import stream_to_file, new_partial
+    from src.rate_limiter import endpoint_of
+except ImportError:  # running as a script from src/
+    from streaming_download import stream_to_file, new_partial
+    from rate_limiter import endpoint_of
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Responses that say the host is unhealthy (429 only says "slow down")
+FAILURE_STATUSES = frozenset({500, 502, 503, 504})
+TRANSIENT_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError)
+# Metrics phase timed per request, by endpoint (see metrics.py)
+REQUEST_PHASES = {'metadata': 'listing', 'download': 'first_byte'}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised when a host's circuit breaker is open"""
+
+
+def retry_after(headers):
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP-date), or None"""
+    value = headers.get('Retry-After') if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """How often and how long to retry transient failures"""
+
+    def __init__(self, max_attempts=6, base_delay=0.5, max_delay=30.0, max_retry_after=120.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    def delay(self, attempt, headers=None):
+        """Seconds to wait before retry number `attempt` (0-based).
+
+        Full jitter (uniform between 0 and the exponential cap) spreads
+        retries of many workers so they do not hit the server in lockstep;
+        a Retry-After in the failed response's headers is a lower bound.
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        requested = retry_after(headers)
+        if requested is not None:
+            delay = max(delay, min(requested, self.max_retry_after))
+        return delay
+
+
+# For callers that run their own retry loop around a RetryingSession request
+NO_RETRIES = RetryPolicy(max_attempts=1)
+
+
+def backoff_headers(rate_limiter, method, url, status, headers):
+    """Response headers for RetryPolicy.delay: without them when the rate limiter honours Retry-After.
+
+    A 429/503 pauses the limiter's bucket for the Retry-After; sleeping for it
+    again before the retry would wait twice as long as the server asked.
+    """
+    if rate_limiter is not None and rate_limiter.handles_retry_after(method, url, status):
+        return None
+    return headers
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open probe after reset_timeout"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        return 'half-open' if time.monotonic() - self.opened_at >= self.reset_timeout else 'open'
+
+    def allow(self):
+        """0 if a request may go out now, else seconds until the next probe is due"""
+        with self._lock:
+            if self.opened_at is None:
+                return 0.0
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                return remaining
+            if self.probing:
+                return self.reset_timeout / 10
+            self.probing = True  # this caller is the half-open probe
+            return 0.0
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logging.warning(f"Circuit opened after {self.failures} consecutive failures")
+                self.opened_at = time.monotonic()
+                self.probing = False
+
+
+class CircuitBreakers:
+    """One CircuitBreaker per host"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self.breakers[host]
+
+
+class RetryingSession(requests.Session):
+    """requests.Session that retries idempotent requests and trips per-host breakers.
+
+    The final response is returned as-is (callers still call raise_for_status);
+    the last exception is raised when every attempt failed at the connection
+    level. stats counts retries and circuit waits across all threads. A
+    policy= keyword overrides the session's RetryPolicy for one request.
+    """
+
+    def __init__(self, policy=None, breakers=None, rate_limiter=None, metrics=None):
+        super().__init__()
+        self.policy = policy or RetryPolicy()
+        self.breakers = breakers or CircuitBreakers()
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.stats = {'requests': 0, 'retries': 0, 'circuit_waits': 0}
+        self._stats_lock = threading.Lock()
+
+    def count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def send_paced(self, method, url, *args, **kwargs):
+        """One request, paced by the rate limiter and timed into metrics when they are set"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(method, url)
+        if self.metrics is None:
+            response = super().request(method, url, *args, **kwargs)
+        else:
+            start = time.monotonic()
+            with self.metrics.tracking('requests'):
+                response = super().request(method, url, *args, **kwargs)
+            phase = REQUEST_PHASES.get(endpoint_of(method, url))
+            if phase:
+                # Returns after the headers for streamed bodies, after the body otherwise
+                self.metrics.observe(phase, time.monotonic() - start)
+        if self.rate_limiter is not None:
+            # elapsed is the time to the response headers, also for streamed bodies
+            self.rate_limiter.feedback(method, url, response.status_code, response.elapsed.total_seconds(),
+                                       retry_after(response.headers))
+        return response
+
+    def request(self, method, url, *args, policy=None, **kwargs):
+        if method.upper() not in IDEMPOTENT_METHODS:
+            return self.send_paced(method, url, *args, **kwargs)
+
+        policy = policy or self.policy
+        breaker = self.breakers[url]
+        for attempt in range(policy.max_attempts):
+            last = attempt == policy.max_attempts - 1
+            wait = breaker.allow()
+            if wait:
+                if last:
+                    raise CircuitOpenError(f"Circuit open for {urlparse(url).netloc}")
+                self.count('circuit_waits')
+                time.sleep(wait)
+                continue
+
+            self.count('requests')
+            try:
+                response = self.send_paced(method, url, *args, **kwargs)
+            except TRANSIENT_ERRORS as e:
+                breaker.record_failure()
+                if last:
+                    raise
+                logging.warning(f"{method} {url} failed ({type(e).__name__}), retry {attempt + 1}")
+                self.count('retries')
+                time.sleep(policy.delay(attempt))
+                continue
+
+            if response.status_code in FAILURE_STATUSES:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            if response.status_code not in RETRY_STATUSES or last:
+                return response
+
+            logging.warning(f"{method} {url} returned {response.status_code}, retry {attempt + 1}")
+            self.count('retries')
+            delay = policy.delay(attempt, backoff_headers(self.rate_limiter, method, url,
+                                                          response.status_code, response.headers))
+            response.close()
+            time.sleep(delay)
+
+
+def download_with_resume(session, url, save_path, resume_from=0, keep_partial=False,
+                         policy=None, timeout=120, headers=None, metrics=None, partial=None,
+                         expected_size=None, expected_md5=None):
+    """Stream url to save_path, resuming the partial file after mid-body failures.
+
+    A GET (with a Range header when resume_from > 0) is streamed through
+    stream_to_file; if the connection drops, the bytes already written are
+    kept and the next attempt asks only for the rest. A server that ignores
+    Range (200 instead of 206) restarts the file from zero. Re-sending a GET
+    is idempotent, so retries never corrupt the result: the returned sha256
+    always covers the complete file. partial names the ".part" file to write
+    (and to resume from when resume_from > 0); without it the download uses a
+    fresh temporary file that is never kept. expected_size and expected_md5
+    (the artifact's fileSize and md5) are checked before the file is renamed
+    into place; a mismatch raises IntegrityError and discards the partial file.
+
+    This loop is the only retry layer: a RetryingSession is asked for single
+    attempts (NO_RETRIES), so retryable statuses and dropped connections cost
+    at most policy.max_attempts requests in total, not one full session retry
+    loop per attempt.
+
+    Returns (size, sha256, resumed) where resumed is True if any bytes came
+    from an earlier attempt or run. With metrics (by default the session's)
+    the whole download is timed as the "download" phase.
+    """
+    policy = policy or getattr(session, 'policy', None) or RetryPolicy()
+    metrics = metrics or getattr(session, 'metrics', None)
+    if partial is None and resume_from:
+        raise ValueError("resume_from needs the partial path of the interrupted download")
+    keep_partial = keep_partial and partial is not None
+    part = Path(partial) if partial is not None else new_partial(save_path)
+    resumed = False
+    start, first_offset = time.monotonic(), resume_from
+    retrying = isinstance(session, RetryingSession)
+    get_kwargs = {'policy': NO_RETRIES} if retrying else {}
+    with metrics.tracking('downloads') if metrics is not None else contextlib.nullcontext():
+        for attempt in range(policy.max_attempts):
+            last = attempt == policy.max_attempts - 1
+            request_headers = dict(headers or {})
+            if resume_from:
+                request_headers['Range'] = f"bytes={resume_from}-"
+            try:
+                resp = session.get(url, headers=request_headers, timeout=timeout, stream=True, **get_kwargs)
+                if resp.status_code in RETRY_STATUSES and not last:
+                    logging.warning(f"GET {url} returned {resp.status_code}, retry {attempt + 1}")
+                    if retrying:
+                        session.count('retries')
+                    delay = policy.delay(attempt, backoff_headers(getattr(session, 'rate_limiter', None), 'GET',
+                                                                  url, resp.status_code, resp.headers))
+                    resp.close()
+                    time.sleep(delay)
+                    continue
+                resp.raise_for_status()
+                if resume_from and resp.status_code != 206:
+                    resume_from = 0
+                resumed = resumed or bool(resume_from)
+                size, sha256 = stream_to_file(resp, save_path, resume_from=resume_from, keep_partial=True,
+                                              metrics=metrics, partial=part, expected_size=expected_size,
+                                              expected_md5=expected_md5)
+                if metrics is not None:
+                    metrics.observe('download', time.monotonic() - start, size - first_offset)
+                return size, sha256, resumed
+            except TRANSIENT_ERRORS as e:
+                if last:
+                    if not keep_partial and part.exists():
+                        part.unlink()
+                    raise
+                resume_from = part.stat().st_size if part.exists() else 0
+                logging.warning(f"Download of {url} interrupted ({type(e).__name__}), "
+                                f"resuming from byte {resume_from}")
+                if retrying:
+                    session.count('retries')
+                time.sleep(policy.delay(attempt))
+            except BaseException:
+                if not keep_partial and part.exists():
+                    part.unlink()
+                raise
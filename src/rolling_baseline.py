@@ -0,0 +1,237 @@
+"""
+Rolling Baseline
+
+Compares the numeric traces of each new CI collection against the history of
+earlier runs. Every value is keyed on (test, key, occurrence, index): the
+occurrence is the n-th time the test logged that key in the run and the index
+is the element position inside '{ a, b, c }' arrays, so sample i of a trace
+is compared with sample i of previous runs.
+
+Per key the baseline keeps, as flat NumPy arrays:
+- count, mean and M2 of all history (Welford) for z-scores
+- an exponentially weighted mean and variance for EWMA checks and drift
+- a ring buffer of the last `window` values for median/MAD scores
+
+update() scores a collection against the state *before* it, then folds it in.
+Both steps are vectorized over the collection and touch only its keys, so the
+cost is proportional to the new data, not to the history. State is saved to
+a single .npz file.
+
+Usage: python src/rolling_baseline.py <log dir> [<log dir> ...]   (one dir per collection, oldest first)
+"""
+import os
+import sys
+import logging
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from src.anomaly_detection import parse_logs, explode_values
+except ImportError:  # running as a script from src/
+    from anomaly_detection import parse_logs, explode_values
+
+KEY_COLUMNS = ['test', 'key', 'occurrence', 'index']
+METHODS = ('zscore', 'mad', 'ewma')
+
+DEFAULT_WINDOW = 50
+DEFAULT_ALPHA = 0.1
+DEFAULT_MIN_HISTORY = 5
+DEFAULT_THRESHOLD = 3.5
+DEFAULT_DRIFT_THRESHOLD = 3.0
+
+
+def observations(records):
+    """Numeric observations of one collection keyed on KEY_COLUMNS.
+
+    records is a parsed Ceedling frame (see anomaly_detection.parse_logs);
+    rows whose value is not numeric are dropped.
+    """
+    records = records.reset_index(drop=True)
+    occurrence = records.groupby(['test', 'key'], sort=False).cumcount()
+    values = explode_values(records)
+    frame = pd.DataFrame({
+        'test': records['test'].to_numpy(object)[values.index],
+        'key': records['key'].to_numpy(object)[values.index],
+        'occurrence': occurrence.to_numpy()[values.index],
+        'index': values['index'].to_numpy(),
+        'value': values['number'].to_numpy(),
+    })
+    frame = frame[np.isfinite(frame['value'])]
+    # A key logged twice in the same position of a run keeps its last value
+    return frame.drop_duplicates(KEY_COLUMNS, keep='last').reset_index(drop=True)
+
+
+def robust_scores(x, window):
+    """Modified z-scores of x against the median/MAD of each row of window (NaN = empty).
+
+    Rows with a zero MAD fall back to the mean absolute deviation, as in
+    anomaly_detection.detect_anomalies.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN rows
+        median = np.nanmedian(window, axis=1)
+        deviation = np.abs(window - median[:, None])
+        mad = np.nanmedian(deviation, axis=1)
+        mean_ad = np.nanmean(deviation, axis=1)
+    return np.where(mad > 0, ratio(0.6745 * (x - median), mad), ratio(x - median, 1.253314 * mean_ad))
+
+
+def ratio(deviation, scale):
+    """deviation / scale, with 0/0 = 0 and x/0 = inf: any change from a constant history stands out"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        score = np.abs(deviation) / scale
+    return np.where(deviation == 0, 0.0, score)
+
+
+class RollingBaseline:
+    """Incremental per-(test, key, occurrence, index) statistics over CI runs"""
+
+    def __init__(self, path=None, window=DEFAULT_WINDOW, alpha=DEFAULT_ALPHA, min_history=DEFAULT_MIN_HISTORY):
+        self.path = Path(path) if path else None
+        self.window = window
+        self.alpha = alpha
+        self.min_history = min_history
+        self.runs = 0
+        self.keys = pd.MultiIndex.from_arrays([[], [], [], []], names=KEY_COLUMNS)
+        self.count = np.zeros(0, dtype=np.int64)
+        self.mean = np.zeros(0)
+        self.m2 = np.zeros(0)
+        self.ew_mean = np.zeros(0)
+        self.ew_var = np.zeros(0)
+        self.ring = np.full((0, window), np.nan)
+        if self.path and self.path.exists():
+            self.load()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def key_ids(self, frame):
+        """Row of every observation in the state arrays, adding rows for new keys"""
+        wanted = pd.MultiIndex.from_frame(frame[KEY_COLUMNS])
+        ids = self.keys.get_indexer(wanted)
+        new = ids < 0
+        if new.any():
+            added = wanted[new].unique()
+            self.keys = self.keys.append(added)
+            grow = len(added)
+            self.count = np.concatenate([self.count, np.zeros(grow, dtype=np.int64)])
+            self.mean, self.m2, self.ew_mean, self.ew_var = (
+                np.concatenate([array, np.zeros(grow)]) for array in (self.mean, self.m2, self.ew_mean, self.ew_var))
+            self.ring = np.vstack([self.ring, np.full((grow, self.window), np.nan)])
+            ids[new] = self.keys.get_indexer(wanted[new])
+        return ids
+
+    def score(self, frame, ids):
+        """zscore, mad and ewma scores of each observation against the current state"""
+        x = frame['value'].to_numpy(dtype=float)
+        count = self.count[ids]
+        std = np.sqrt(self.m2[ids] / np.maximum(count - 1, 1))
+        return pd.DataFrame({
+            'history': count,
+            'zscore': ratio(x - self.mean[ids], std),
+            'mad': robust_scores(x, self.ring[ids]),
+            'ewma': ratio(x - self.ew_mean[ids], np.sqrt(self.ew_var[ids])),
+        }, index=frame.index)
+
+    def fold(self, frame, ids):
+        """Add one value per key to the running statistics"""
+        x = frame['value'].to_numpy(dtype=float)
+        first = self.count[ids] == 0
+
+        self.count[ids] += 1
+        delta = x - self.mean[ids]
+        self.mean[ids] += delta / self.count[ids]
+        self.m2[ids] += delta * (x - self.mean[ids])
+
+        ew_delta = x - self.ew_mean[ids]
+        increment = self.alpha * ew_delta
+        self.ew_mean[ids] = np.where(first, x, self.ew_mean[ids] + increment)
+        self.ew_var[ids] = np.where(first, 0.0, (1 - self.alpha) * (self.ew_var[ids] + ew_delta * increment))
+
+        self.ring[ids, (self.count[ids] - 1) % self.window] = x
+
+    def update(self, records, threshold=DEFAULT_THRESHOLD, methods=METHODS):
+        """Score one collection against the baseline, then add it to the baseline.
+
+        Returns the flagged observations with KEY_COLUMNS, value, history
+        (number of earlier runs), the zscore/mad/ewma scores and 'reason'
+        (the methods whose score exceeded threshold). Keys with fewer than
+        min_history earlier runs are never flagged.
+        """
+        frame = observations(records)
+        ids = self.key_ids(frame)
+        scores = self.score(frame, ids)
+        self.fold(frame, ids)
+        self.runs += 1
+
+        exceeded = pd.DataFrame({method: scores[method] > threshold for method in methods})
+        flagged = exceeded.any(axis=1).to_numpy() & (scores['history'] >= self.min_history).to_numpy()
+        result = pd.concat([frame, scores], axis=1)[flagged]
+        reasons = exceeded[flagged]
+        result['reason'] = [','.join(m for m in methods if row[m]) for row in reasons.to_dict('records')]
+        return result.reset_index(drop=True)
+
+    def drifts(self, threshold=DEFAULT_DRIFT_THRESHOLD):
+        """Keys whose EWMA has left its control limits around the long-run mean.
+
+        The limits are threshold * std * sqrt(alpha / (2 - alpha)), the
+        asymptotic standard deviation of an EWMA of independent samples.
+        """
+        mature = self.count >= self.min_history
+        std = np.sqrt(self.m2 / np.maximum(self.count - 1, 1))
+        shift = ratio(self.ew_mean - self.mean, std * np.sqrt(self.alpha / (2 - self.alpha)))
+        drifted = mature & (shift > threshold)
+        frame = self.keys[drifted].to_frame(index=False)
+        frame['mean'] = self.mean[drifted]
+        frame['ewma'] = self.ew_mean[drifted]
+        frame['shift'] = shift[drifted]
+        return frame
+
+    def save(self, path=None):
+        """Write the state atomically to an .npz file"""
+        path = Path(path or self.path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(
+                f, runs=self.runs, window=self.window, alpha=self.alpha,
+                test=self.keys.get_level_values('test').to_numpy(str),
+                key=self.keys.get_level_values('key').to_numpy(str),
+                occurrence=self.keys.get_level_values('occurrence').to_numpy(np.int64),
+                index=self.keys.get_level_values('index').to_numpy(np.int64),
+                count=self.count, mean=self.mean, m2=self.m2, ew_mean=self.ew_mean, ew_var=self.ew_var, ring=self.ring)
+        os.replace(tmp_path, path)
+
+    def load(self, path=None):
+        with np.load(path or self.path, allow_pickle=False) as state:
+            self.runs = int(state['runs'])
+            self.window = int(state['window'])
+            self.alpha = float(state['alpha'])
+            self.keys = pd.MultiIndex.from_arrays([state['test'].astype(object), state['key'].astype(object),
+                                                   state['occurrence'], state['index']], names=KEY_COLUMNS)
+            self.count = state['count']
+            self.mean, self.m2, self.ew_mean, self.ew_var = (state[name] for name in ('mean', 'm2', 'ew_mean', 'ew_var'))
+            self.ring = state['ring']
+
+
+def main():
+    """Fold collections into the baseline and report anomalies and drifts"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    baseline = RollingBaseline(os.getenv("BASELINE_PATH", "data/rddl_analysis/baseline.npz"))
+
+    for log_dir in sys.argv[1:] or ["data/logs"]:
+        anomalies = baseline.update(parse_logs(log_dir))
+        print(f"📥 {log_dir}: run {baseline.runs}, {len(anomalies)} anomalous values")
+        for row in anomalies.head(20).itertuples():
+            print(f"   ⚠️  {row.test} {row.key}[{row.occurrence}][{row.index}] = {row.value:g} ({row.reason})")
+
+    drifts = baseline.drifts()
+    print(f"📈 Drifting keys: {len(drifts)} of {len(baseline)}")
+    baseline.save()
+
+
+if __name__ == "__main__":
+    main()
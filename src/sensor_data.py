@@ -0,0 +1,316 @@
+"""
+Sensor Data Reader
+
+Memory-mapped access to sensor captures (temp_data_file and friends) that may
+be several GB. The file is never read into the Python heap as a whole:
+
+- binary captures are exposed as a zero-copy NumPy memmap of records
+  (.npy files are recognized by their header; raw files by a dtype heuristic)
+- numeric text captures (CSV/TSV/whitespace columns, optional header line) are
+  mapped as raw bytes and parsed chunk by chunk at line boundaries
+- anything else (e.g. an HTML error page saved under the capture name) is
+  reported as format 'unknown' and has no statistics
+
+summary() computes per-column count, min, max, mean, std, percentiles and a
+histogram in two chunked passes with bounded memory; percentiles are read off
+a fine histogram, so they are exact to within (max - min) / (bins * 128).
+
+Usage: python src/sensor_data.py <capture> [<capture> ...]
+"""
+import sys
+import json
+import mmap
+import hashlib
+import logging
+from pathlib import Path
+
+import numpy as np
+
+SAMPLE_BYTES = 64 * 1024
+CHUNK_BYTES = 16 * 1024 * 1024
+DEFAULT_BINS = 32
+DEFAULT_PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+# Percentiles come from a histogram this many times finer than the reported one
+PERCENTILE_RESOLUTION = 128
+
+TEXT_DELIMITERS = (',', ';', '\t', ' ')
+# Raw binary dtypes tried by detect_format when the record layout is not given
+BINARY_CANDIDATES = ('<f4', '<f8', '<i2', '<i4', '<i8')
+NPY_MAGIC = b'\x93NUMPY'
+
+
+def detect_format(path, dtype=None, columns=None, offset=0):
+    """Guess how a capture is encoded from its first SAMPLE_BYTES.
+
+    Returns a dict with 'kind' ('npy', 'binary', 'text' or 'unknown'),
+    'dtype', 'columns', 'offset' (bytes before the first record) and, for
+    text, 'delimiter' and 'header'. Passing dtype forces a raw binary layout.
+    """
+    path = Path(path)
+    with open(path, 'rb') as f:
+        sample = f.read(SAMPLE_BYTES)
+
+    if dtype is not None:
+        return {'kind': 'binary', 'dtype': np.dtype(dtype).str, 'columns': columns or 1, 'offset': offset}
+
+    if sample.startswith(NPY_MAGIC):
+        with open(path, 'rb') as f:
+            version = np.lib.format.read_magic(f)
+            read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+            shape, fortran_order, npy_dtype = read_header(f)
+            header_end = f.tell()
+        if not fortran_order and npy_dtype.fields is None:
+            return {'kind': 'npy', 'dtype': npy_dtype.str, 'columns': int(np.prod(shape[1:])) if len(shape) > 1 else 1,
+                    'offset': header_end}
+        return {'kind': 'unknown', 'reason': 'unsupported .npy layout'}
+
+    if b'\x00' in sample or not sample:
+        return detect_binary(path, sample) if sample else {'kind': 'unknown', 'reason': 'empty file'}
+    return detect_text(sample, truncated=len(sample) == SAMPLE_BYTES)
+
+
+def detect_binary(path, sample):
+    """Guess the raw record dtype of a binary capture from its byte structure.
+
+    Consecutive samples of a signal share their high-order bytes, so the
+    sample bytes repeat most closely at a lag of one record: the smallest
+    lag within 25% of the best match is taken as the item size. A float
+    dtype of that size is preferred when it decodes to finite values of
+    plausible magnitude, otherwise the integer dtype is used.
+    """
+    size = Path(path).stat().st_size
+    data = np.frombuffer(sample, dtype=np.uint8).astype(np.int16)
+    mismatch = {itemsize: np.abs(data[itemsize:] - data[:-itemsize]).mean()
+                for itemsize in (2, 4, 8) if size % itemsize == 0 and len(data) > 4 * itemsize}
+    if not mismatch:
+        return {'kind': 'unknown', 'reason': 'no binary layout fits'}
+    best = min(mismatch.values())
+    itemsize = min(k for k, value in mismatch.items() if value <= best * 1.25)
+
+    for candidate in BINARY_CANDIDATES:
+        dtype = np.dtype(candidate)
+        if dtype.itemsize != itemsize:
+            continue
+        if dtype.kind == 'f':
+            values = np.frombuffer(sample[:len(sample) - len(sample) % itemsize], dtype=dtype)
+            magnitude = np.abs(values[values != 0])
+            if not np.all(np.isfinite(values)) or np.any((magnitude < 1e-12) | (magnitude > 1e12)):
+                continue
+        return {'kind': 'binary', 'dtype': candidate, 'columns': 1, 'offset': 0}
+    return {'kind': 'unknown', 'reason': 'no binary layout fits'}
+
+
+def detect_text(sample, truncated):
+    """Recognize numeric columns with a consistent delimiter and an optional header line"""
+    text = sample.decode('ascii', errors='replace')
+    lines = text.splitlines()
+    if truncated and len(lines) > 1:
+        lines = lines[:-1]  # last line may be cut off by the sample boundary
+
+    offset = 0
+    header = None
+    body = [line for line in lines if line.strip()]
+    if body and not is_numeric_row(body[0], detect_delimiter(body[1:] or body)):
+        # ASCII decoding maps every byte to one character, so text offsets are byte offsets
+        header = body[0]
+        offset = text.find('\n', text.index(header)) + 1 or len(sample)
+        body = body[1:]
+    if not body:
+        return {'kind': 'unknown', 'reason': 'no numeric rows'}
+
+    delimiter = detect_delimiter(body)
+    if not all(is_numeric_row(line, delimiter) for line in body[:200]):
+        return {'kind': 'unknown', 'reason': 'not numeric text'}
+    columns = len(split_row(body[0], delimiter))
+    return {'kind': 'text', 'dtype': '<f8', 'columns': columns, 'offset': offset,
+            'delimiter': delimiter, 'header': split_row(header, delimiter) if header else None}
+
+
+def split_row(line, delimiter):
+    if delimiter == ' ':
+        return line.split()
+    return [token.strip() for token in line.split(delimiter)]
+
+
+def detect_delimiter(lines):
+    """Delimiter giving the same column count (>1) on every sampled line, else whitespace"""
+    sample = lines[:50]
+    for delimiter in TEXT_DELIMITERS:
+        counts = {len(split_row(line, delimiter)) for line in sample}
+        if len(counts) == 1 and counts.pop() > 1:
+            return delimiter
+    return ' '
+
+
+def is_numeric_row(line, delimiter):
+    try:
+        [float(token) for token in split_row(line, delimiter)]
+        return True
+    except ValueError:
+        return False
+
+
+class SensorCapture:
+    """Memory-mapped sensor capture with chunked statistics"""
+
+    def __init__(self, path, dtype=None, columns=None, offset=0):
+        self.path = Path(path)
+        self.format = detect_format(self.path, dtype, columns, offset)
+        self.size = self.path.stat().st_size
+
+    @property
+    def kind(self):
+        return self.format['kind']
+
+    def raw(self):
+        """Zero-copy uint8 view of the whole file"""
+        if self.size == 0:
+            return np.zeros(0, dtype=np.uint8)
+        return np.memmap(self.path, dtype=np.uint8, mode='r')
+
+    def content_hash(self, chunk_bytes=CHUNK_BYTES):
+        """md5 of the raw bytes, hashed straight from the memory map"""
+        hasher = hashlib.md5()
+        raw = self.raw()
+        for start in range(0, len(raw), chunk_bytes):
+            hasher.update(raw[start:start + chunk_bytes])
+        return hasher.hexdigest()
+
+    def values(self):
+        """Zero-copy (records, columns) view of a binary capture"""
+        if self.kind not in ('npy', 'binary'):
+            raise ValueError(f"{self.path} is not a binary capture (format: {self.kind})")
+        dtype = np.dtype(self.format['dtype'])
+        columns = self.format['columns']
+        records = (self.size - self.format['offset']) // (dtype.itemsize * columns)
+        if records == 0:
+            return np.zeros((0, columns), dtype=dtype)
+        return np.memmap(self.path, dtype=dtype, mode='r', offset=self.format['offset'], shape=(records, columns))
+
+    def iter_chunks(self, chunk_bytes=CHUNK_BYTES):
+        """Yield (rows, columns) float64 arrays covering the capture in order"""
+        if self.kind in ('npy', 'binary'):
+            values = self.values()
+            rows = max(1, chunk_bytes // (values.dtype.itemsize * values.shape[1]))
+            for start in range(0, len(values), rows):
+                yield np.asarray(values[start:start + rows], dtype=np.float64)
+        elif self.kind == 'text':
+            yield from self.iter_text_chunks(chunk_bytes)
+
+    def iter_text_chunks(self, chunk_bytes):
+        columns = self.format['columns']
+        delimiter = self.format['delimiter'].encode()
+        table = bytes.maketrans(delimiter, b' ') if delimiter != b' ' else None
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = self.format['offset']
+            while start < self.size:
+                end = min(start + chunk_bytes, self.size)
+                if end < self.size:
+                    newline = mm.rfind(b'\n', start, end)
+                    end = newline + 1 if newline > start else mm.find(b'\n', end) + 1 or self.size
+                chunk = mm[start:end]
+                if table:
+                    chunk = chunk.translate(table)
+                # Parsed in C; only this chunk's bytes and floats are ever in memory
+                numbers = np.fromstring(chunk, dtype=np.float64, sep=' ')
+                usable = len(numbers) - len(numbers) % columns
+                if usable != len(numbers):
+                    logging.warning(f"{self.path}: ragged rows near byte {start}, {len(numbers) - usable} values dropped")
+                yield numbers[:usable].reshape(-1, columns)
+                start = end
+
+    def summary(self, bins=DEFAULT_BINS, percentiles=DEFAULT_PERCENTILES, chunk_bytes=CHUNK_BYTES):
+        """Per-column statistics computed in two chunked passes over the file"""
+        result = {'path': str(self.path), 'size_bytes': self.size, 'format': self.format, 'records': 0, 'columns': []}
+        if self.kind == 'unknown':
+            return result
+
+        columns = self.format['columns']
+        count = np.zeros(columns, dtype=np.int64)
+        invalid = np.zeros(columns, dtype=np.int64)
+        low = np.full(columns, np.inf)
+        high = np.full(columns, -np.inf)
+        mean = np.zeros(columns)
+        m2 = np.zeros(columns)
+        records = 0
+
+        # Pass 1: count, min, max and mean/variance merged per chunk (Chan et al.)
+        for chunk in self.iter_chunks(chunk_bytes):
+            records += len(chunk)
+            finite = np.isfinite(chunk)
+            invalid += (~finite).sum(axis=0)
+            for column in range(columns):
+                values = chunk[finite[:, column], column]
+                if not values.size:
+                    continue
+                n = values.size
+                chunk_mean = values.mean()
+                delta = chunk_mean - mean[column]
+                total = count[column] + n
+                mean[column] += delta * n / total
+                m2[column] += ((values - chunk_mean) ** 2).sum() + delta ** 2 * count[column] * n / total
+                count[column] = total
+                low[column] = min(low[column], values.min())
+                high[column] = max(high[column], values.max())
+
+        # Pass 2: fine histogram between min and max; percentiles are interpolated from it
+        fine_bins = bins * PERCENTILE_RESOLUTION
+        edges = [np.linspace(low[c], high[c] if high[c] > low[c] else low[c] + 1, fine_bins + 1)
+                 if count[c] else None for c in range(columns)]
+        fine = np.zeros((columns, fine_bins), dtype=np.int64)
+        for chunk in self.iter_chunks(chunk_bytes):
+            for column in range(columns):
+                if edges[column] is not None:
+                    values = chunk[:, column]
+                    fine[column] += np.histogram(values[np.isfinite(values)], bins=edges[column])[0]
+
+        names = self.format.get('header') or [f"column_{c}" for c in range(columns)]
+        result['records'] = records
+        for column in range(columns):
+            stats = {'name': names[column] if column < len(names) else f"column_{column}",
+                     'count': int(count[column]), 'invalid': int(invalid[column])}
+            if count[column]:
+                stats.update({
+                    'min': float(low[column]),
+                    'max': float(high[column]),
+                    'mean': float(mean[column]),
+                    'std': float(np.sqrt(m2[column] / count[column])),
+                    'percentiles': histogram_percentiles(fine[column], edges[column], percentiles),
+                    'histogram': {
+                        'edges': edges[column][::PERCENTILE_RESOLUTION].tolist(),
+                        'counts': fine[column].reshape(bins, PERCENTILE_RESOLUTION).sum(axis=1).tolist()
+                    }
+                })
+            result['columns'].append(stats)
+        return result
+
+
+def histogram_percentiles(counts, edges, percentiles):
+    """Percentiles interpolated linearly within the bins of a histogram"""
+    cumulative = np.cumsum(counts)
+    total = cumulative[-1]
+    result = {}
+    for p in percentiles:
+        target = p / 100 * total
+        index = min(int(np.searchsorted(cumulative, target)), len(counts) - 1)
+        before = cumulative[index - 1] if index else 0
+        fraction = (target - before) / counts[index] if counts[index] else 0.0
+        result[str(p)] = float(edges[index] + fraction * (edges[index + 1] - edges[index]))
+    return result
+
+
+def is_sensor_file(file_path):
+    return 'temp_data' in Path(file_path).name
+
+
+def main():
+    """Summarize sensor captures as JSON"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    paths = sys.argv[1:] or [str(p) for p in sorted(Path("data").rglob("*")) if p.is_file() and is_sensor_file(p)]
+    for path in paths:
+        summary = SensorCapture(path).summary()
+        print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Streaming download helpers shared by the collectors and the uploader.
+
+Writes HTTP response bodies to disk in fixed-size chunks so memory use stays
+bounded by the chunk size, not by the artifact size. Files are written to a
+temporary ".part" file, fsynced and atomically renamed into place, and the
+size and content hash are computed in the same pass. Every download gets its
+own ".part" file: a fresh temporary name, or partial_path(save_path, key) when
+the caller wants to find it again to resume. Given the size and md5 the server
+lists for an artifact, the finished file is checked against them before it
+replaces save_path; a mismatch discards the ".part" file. Given a Metrics object,
+the time spent in file writes and the final fsync is recorded as the "write"
+phase, so slow local disks show up separately from slow transfers.
+"""
+import os
+import time
+import asyncio
+import hashlib
+import tempfile
+from pathlib import Path
+
+CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+
+class IntegrityError(IOError):
+    """Downloaded bytes do not match the size or md5 the server listed"""
+
+
+def partial_path(save_path, key):
+    """Resumable ".part" path of the download identified by key (e.g. an artifact id)"""
+    save_path = Path(save_path)
+    return save_path.with_name(f"{save_path.name}.{key}.part")
+
+
+def new_partial(save_path):
+    """Create a unique, empty ".part" file next to save_path and return its path"""
+    save_path = Path(save_path)
+    fd, name = tempfile.mkstemp(dir=save_path.parent, prefix=save_path.name + ".", suffix=".part")
+    os.close(fd)
+    return Path(name)
+
+
+def _open_partial(save_path, partial, resume_from):
+    """The ".part" path to write: the caller's, or a fresh one for a download from zero"""
+    if partial is not None:
+        return Path(partial)
+    if resume_from:
+        raise ValueError("resume_from needs the partial path of the interrupted download")
+    return new_partial(save_path)
+
+
+def stream_to_file(response, save_path, chunk_size=CHUNK_SIZE, hash_name="sha256",
+                   resume_from=0, keep_partial=False, metrics=None, partial=None,
+                   expected_size=None, expected_md5=None):
+    """Stream a requests response body to save_path atomically.
+
+    The response must have been requested with stream=True. With resume_from > 0
+    the response is expected to hold the bytes following the first resume_from
+    bytes of the existing partial file (an HTTP 206 for a Range request); those
+    bytes are re-hashed and the body is appended. Without partial the body goes
+    to a new uniquely named ".part" file, so concurrent downloads to one
+    save_path never share a temporary file. keep_partial leaves the partial
+    file on failure so a later run can resume it. expected_size and
+    expected_md5 (falsy: not checked) are verified before the rename; on a
+    mismatch IntegrityError is raised and the partial file is always removed.
+    Returns (size_in_bytes, hex_digest) of the complete file.
+    """
+    save_path = Path(save_path)
+    tmp_path = _open_partial(save_path, partial, resume_from)
+    hashers, size = _seed_partial(tmp_path, resume_from, _hash_names(hash_name, expected_md5), chunk_size)
+    start_size, write_seconds = size, 0.0
+
+    try:
+        with open(tmp_path, "ab" if resume_from else "wb") as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if not chunk:
+                    continue
+                for hasher in hashers:
+                    hasher.update(chunk)
+                started = time.perf_counter()
+                f.write(chunk)
+                write_seconds += time.perf_counter() - started
+                size += len(chunk)
+            started = time.perf_counter()
+            _fsync(f)
+            write_seconds += time.perf_counter() - started
+        _verify(size, hashers, expected_size, expected_md5)
+        os.replace(tmp_path, save_path)
+        if metrics is not None:
+            metrics.observe("write", write_seconds, size - start_size)
+    except BaseException as e:
+        if (not keep_partial or isinstance(e, IntegrityError)) and tmp_path.exists():
+            tmp_path.unlink()
+        raise
+    finally:
+        response.close()
+
+    return size, hashers[0].hexdigest()
+
+
+async def astream_to_file(chunks, save_path, hash_name="sha256", resume_from=0,
+                          keep_partial=False, chunk_size=CHUNK_SIZE, metrics=None, partial=None,
+                          expected_size=None, expected_md5=None):
+    """Async counterpart of stream_to_file for an async iterator of byte chunks.
+
+    Chunk writes happen on the event loop thread; the final fsync runs in a
+    worker thread. Returns (size_in_bytes, hex_digest).
+    """
+    save_path = Path(save_path)
+    tmp_path = _open_partial(save_path, partial, resume_from)
+    hashers, size = _seed_partial(tmp_path, resume_from, _hash_names(hash_name, expected_md5), chunk_size)
+    start_size, write_seconds = size, 0.0
+
+    try:
+        with open(tmp_path, "ab" if resume_from else "wb") as f:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                for hasher in hashers:
+                    hasher.update(chunk)
+                started = time.perf_counter()
+                f.write(chunk)
+                write_seconds += time.perf_counter() - started
+                size += len(chunk)
+            started = time.perf_counter()
+            await asyncio.to_thread(_fsync, f)
+            write_seconds += time.perf_counter() - started
+        _verify(size, hashers, expected_size, expected_md5)
+        os.replace(tmp_path, save_path)
+        if metrics is not None:
+            metrics.observe("write", write_seconds, size - start_size)
+    except BaseException as e:
+        if (not keep_partial or isinstance(e, IntegrityError)) and tmp_path.exists():
+            tmp_path.unlink()
+        raise
+
+    return size, hashers[0].hexdigest()
+
+
+def _hash_names(hash_name, expected_md5):
+    """Hashes computed while streaming: the returned digest, plus md5 when it is checked"""
+    return [hash_name, "md5"] if expected_md5 else [hash_name]
+
+
+def _seed_partial(tmp_path, resume_from, hash_names, chunk_size):
+    """Start the hashes, re-hashing the first resume_from bytes of an existing .part file"""
+    hashers = [hashlib.new(name) for name in hash_names]
+    size = 0
+    if resume_from:
+        with open(tmp_path, "r+b") as f:
+            f.truncate(resume_from)
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                for hasher in hashers:
+                    hasher.update(chunk)
+                size += len(chunk)
+    return hashers, size
+
+
+def _verify(size, hashers, expected_size, expected_md5):
+    """Raise IntegrityError if the streamed bytes differ from what the server listed"""
+    if expected_size and size != expected_size:
+        raise IntegrityError(f"size mismatch: got {size} bytes, expected {expected_size}")
+    if expected_md5 and hashers[-1].hexdigest() != expected_md5.lower():
+        raise IntegrityError(f"md5 mismatch: got {hashers[-1].hexdigest()}, expected {expected_md5}")
+
+
+def _fsync(f):
+    """Flush an open file and force its contents to disk"""
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def hash_file(path, chunk_size=CHUNK_SIZE, hash_name="sha256"):
+    """Hash a local file in chunks. Returns (size_in_bytes, hex_digest)."""
+    hasher = hashlib.new(hash_name)
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            hasher.update(chunk)
+            size += len(chunk)
+    return size, hasher.hexdigest()
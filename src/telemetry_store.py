@@ -0,0 +1,183 @@
+"""
+Telemetry Store
+
+Partitioned Parquet dataset for parsed test telemetry, replacing ad-hoc JSON
+and CSV dumps as the queryable record of every collection:
+
+- records:    Ceedling system-out/log key/value lines (file, line, test, level, key, value)
+- testcases:  JUnit test case results (name, time, status, message)
+- artifacts:  RDDL artifact metadata (id, filename, fileSize, md5, dateCreated, ...)
+
+Tables live under <root>/<table>/ in hive layout, partitioned by project, test
+suite and collection date (artifacts by project and date). Rows are sorted by
+test and key before writing so Parquet row-group statistics are selective;
+queries push filters down to partition directories and row groups and read
+only the requested columns, e.g.
+
+    store.query('records', columns=['date', 'value'], project='PWRLIB72',
+                since='2025-04-16', test='test_Filter3p3z', key='output')
+
+Usage: python src/telemetry_store.py [<collection dir>]   (ingest collected projects)
+"""
+import os
+import sys
+import json
+import logging
+from datetime import date as Date, datetime
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+try:
+    from src.anomaly_detection import parse_logs
+    from src.junit_report import ingest_reports
+except ImportError:  # running as a script from src/
+    from anomaly_detection import parse_logs
+    from junit_report import ingest_reports
+
+PARTITIONS = {
+    'records': ('project', 'suite', 'date'),
+    'testcases': ('project', 'suite', 'date'),
+    'artifacts': ('project', 'date'),
+}
+# Sort order inside each partition; keeps row-group min/max statistics tight
+SORT_KEYS = {
+    'records': ['test', 'key', 'line'],
+    'testcases': ['name'],
+    'artifacts': ['filename'],
+}
+ROWS_PER_GROUP = 64 * 1024
+UNKNOWN_SUITE = 'unknown'
+
+
+class TelemetryStore:
+    """Hive-partitioned Parquet tables of records, test cases and artifacts"""
+
+    def __init__(self, root="data/telemetry", compression="zstd"):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.file_options = ds.ParquetFileFormat().make_write_options(compression=compression)
+
+    def partitioning(self, table):
+        schema = pa.schema([(name, pa.string()) for name in PARTITIONS[table]])
+        return ds.partitioning(schema, flavor='hive')
+
+    def write(self, table, frame, project, collection_date=None):
+        """Write frame into table for one project and collection date.
+
+        Partitions touched by the write are replaced, so re-ingesting the same
+        collection is idempotent. Returns the number of rows written.
+        """
+        if frame.empty:
+            return 0
+        frame = frame.copy()
+        frame['project'] = project
+        frame['date'] = to_partition_date(collection_date)
+        if 'suite' in PARTITIONS[table]:
+            frame['suite'] = frame['suite'].fillna(UNKNOWN_SUITE) if 'suite' in frame else UNKNOWN_SUITE
+        frame = frame.sort_values([key for key in SORT_KEYS[table] if key in frame], kind='stable')
+
+        ds.write_dataset(
+            pa.Table.from_pandas(frame, preserve_index=False),
+            self.root / table,
+            format='parquet',
+            partitioning=self.partitioning(table),
+            existing_data_behavior='delete_matching',
+            basename_template='part-{i}.parquet',
+            file_options=self.file_options,
+            max_rows_per_group=ROWS_PER_GROUP,
+            min_rows_per_group=min(len(frame), ROWS_PER_GROUP)
+        )
+        return len(frame)
+
+    def write_records(self, records, project, collection_date=None):
+        """Store parsed Ceedling records; suite defaults to the C file name without .c"""
+        if 'suite' not in records:
+            records = records.assign(suite=records['file'].str.replace(r'\.c$', '', regex=True))
+        return self.write('records', records, project, collection_date)
+
+    def write_testcases(self, testcases, project, collection_date=None):
+        return self.write('testcases', testcases, project, collection_date)
+
+    def write_artifacts(self, artifacts, project, collection_date=None):
+        return self.write('artifacts', pd.DataFrame(artifacts), project, collection_date)
+
+    def dataset(self, table):
+        return ds.dataset(self.root / table, format='parquet', partitioning=self.partitioning(table))
+
+    def query(self, table, columns=None, project=None, suite=None, since=None, until=None, **equals):
+        """Read table into a DataFrame, reading only matching partitions, row groups and columns.
+
+        project/suite and any other column=value keywords are equality filters;
+        since/until bound the collection date (inclusive).
+        """
+        if not (self.root / table).exists():
+            return pd.DataFrame(columns=columns)
+
+        conditions = []
+        for name, value in dict(equals, project=project, suite=suite).items():
+            if value is not None:
+                conditions.append(ds.field(name) == value)
+        if since is not None:
+            conditions.append(ds.field('date') >= to_partition_date(since))
+        if until is not None:
+            conditions.append(ds.field('date') <= to_partition_date(until))
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return self.dataset(table).to_table(columns=columns, filter=expression).to_pandas()
+
+
+def to_partition_date(value):
+    """ISO date string used as the date partition (lexicographic order is chronological)"""
+    if value is None:
+        return Date.today().isoformat()
+    if isinstance(value, (datetime, Date)):
+        return value.isoformat()[:10]
+    return str(value)[:10]
+
+
+def ingest_project(store, project_dir):
+    """Store artifact metadata, JUnit results and log records of one collected project"""
+    project_dir = Path(project_dir)
+    project_key = project_dir.name
+    collection_date = None
+    counts = {'artifacts': 0, 'testcases': 0, 'records': 0}
+
+    metadata_path = project_dir / "metadata.json"
+    if metadata_path.exists():
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        collection_date = metadata.get('collection_date')
+        counts['artifacts'] = store.write_artifacts(metadata.get('artifacts', []), project_key, collection_date)
+
+    testcases, records = ingest_reports(sorted(str(p) for p in project_dir.rglob('*.xml')))
+    counts['testcases'] = store.write_testcases(testcases, project_key, collection_date)
+
+    # report.xml system-out aggregates the per-suite logs; logs only add suites it lacks
+    logs = parse_logs(project_dir, report_suffixes=())
+    logs = logs.assign(report=None, suite=logs['file'].str.replace(r'\.c$', '', regex=True))
+    logs = logs[~logs['suite'].isin(set(records['suite']))]
+    counts['records'] = store.write_records(pd.concat([records, logs], ignore_index=True),
+                                            project_key, collection_date)
+    return counts
+
+
+def main():
+    """Ingest every collected project into the telemetry store"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    collection_dir = Path(sys.argv[1] if len(sys.argv) > 1 else "data/focused_collection")
+    store = TelemetryStore(os.getenv("TELEMETRY_DIR", "data/telemetry"))
+
+    for project_dir in sorted(p for p in collection_dir.iterdir() if p.is_dir()):
+        counts = ingest_project(store, project_dir)
+        print(f"📦 {project_dir.name}: {counts['artifacts']} artifacts, "
+              f"{counts['testcases']} test cases, {counts['records']} records")
+    print(f"📊 Telemetry store: {store.root}")
+
+
+if __name__ == "__main__":
+    main()
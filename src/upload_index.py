@@ -0,0 +1,141 @@
+"""
+Upload Index
+
+Local SQLite cache of the artifacts a data lake project already holds, used by
+the uploader to skip files whose content is already there. The index is
+refreshed from the project's /artifacts/metadata endpoint at the start of a
+run (one paginated listing instead of one upload per file) and updated after
+every successful upload, so a file that is unchanged since the last run costs
+no upload bandwidth. If the refresh fails or any page of the listing is lost,
+the last cached listing is used.
+
+A local file matches when an artifact with the same filename, size and md5
+exists; identical content under another name is still uploaded so every
+artifact stays findable by name.
+
+Usage: python src/upload_index.py [<project key>]   (refresh and print index size)
+"""
+import os
+import sys
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+
+try:
+    from src.rddl_pagination import ArtifactPaginator
+    from src.rddl_transport import RetryingSession
+except ImportError:  # running as a script from src/
+    from rddl_pagination import ArtifactPaginator
+    from rddl_transport import RetryingSession
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS remote_artifacts (
+    project_key   TEXT NOT NULL,
+    artifact_id   TEXT NOT NULL,
+    filename      TEXT,
+    file_size     INTEGER,
+    md5           TEXT,
+    date_created  TEXT,
+    PRIMARY KEY (project_key, artifact_id)
+);
+CREATE INDEX IF NOT EXISTS remote_artifacts_content ON remote_artifacts (project_key, filename, md5);
+CREATE TABLE IF NOT EXISTS refreshes (
+    project_key   TEXT PRIMARY KEY,
+    artifacts     INTEGER,
+    refreshed_at  TEXT
+);
+"""
+
+
+def artifact_row(project_key, artifact):
+    """Row values for one entry of the metadata endpoint"""
+    raw = artifact.get('rawDataFile', {}) or {}
+    return (project_key, artifact.get('artifactID'), raw.get('fileName'), raw.get('fileSize', 0),
+            raw.get('md5') or '', artifact.get('dateCreated', ''))
+
+
+class UploadIndex:
+    """Thread-safe cache of (filename, size, md5) of a project's remote artifacts"""
+
+    def __init__(self, db_path, project_key):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.project_key = project_key
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM remote_artifacts WHERE project_key = ?",
+                                      (self.project_key,)).fetchone()[0]
+
+    def refresh(self, session, metadata_url, page_size=100, workers=4):
+        """Replace the cached listing with the endpoint's current one.
+
+        Returns the number of artifacts listed, or None if the listing did not
+        complete; the previous cache is then kept, since a truncated listing
+        would drop artifacts the data lake still holds.
+        """
+        paginator = ArtifactPaginator(session, metadata_url, page_size=page_size, workers=workers,
+                                      label=f"{self.project_key} artifact metadata")
+        rows = [artifact_row(self.project_key, artifact) for artifact in paginator]
+        if not paginator.complete:
+            return None
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM remote_artifacts WHERE project_key = ?", (self.project_key,))
+            self._conn.executemany("INSERT OR REPLACE INTO remote_artifacts VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._conn.execute("INSERT OR REPLACE INTO refreshes VALUES (?, ?, ?)",
+                               (self.project_key, len(rows), datetime.now().isoformat()))
+        return len(rows)
+
+    def find(self, filename, size, md5):
+        """artifact_id of a remote artifact with this filename and content, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT artifact_id FROM remote_artifacts "
+                "WHERE project_key = ? AND filename = ? AND md5 = ? AND file_size = ? LIMIT 1",
+                (self.project_key, filename, md5, size)
+            ).fetchone()
+        return row[0] if row else None
+
+    def add(self, artifact_id, filename, size, md5):
+        """Record an artifact uploaded during this run"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO remote_artifacts VALUES (?, ?, ?, ?, ?, ?)",
+                (self.project_key, artifact_id or f"local:{filename}:{md5}", filename, size, md5,
+                 datetime.now().isoformat())
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    """Refresh the index of one project and report its size"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    project_key = sys.argv[1] if len(sys.argv) > 1 else "PWRLIB72"
+    base_url = os.getenv("BASE_URL", "https://rd-datalake.icp.infineon.com")
+    token = os.getenv("RDDL_API_TOKEN")
+    if not token:
+        logging.error("Bearer token (RDDL_API_TOKEN) is not set. Please set it in your environment.")
+        sys.exit(1)
+
+    index = UploadIndex(os.getenv("UPLOAD_INDEX_PATH", "data/upload_index.sqlite"), project_key)
+    with RetryingSession() as session:
+        session.headers["Authorization"] = f"Bearer {token}"
+        listed = index.refresh(session, f"{base_url}/api/v1/projects/{project_key}/artifacts/metadata")
+    if listed is None:
+        print(f"⚠️  Refresh failed; cached index holds {len(index)} artifacts")
+    else:
+        print(f"🗂️  {project_key}: {listed} artifacts indexed")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
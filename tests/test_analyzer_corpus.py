@@ -0,0 +1,71 @@
+import hashlib
+import unittest
+import xml.etree.ElementTree as ET
+from collections import Counter
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from benchmarks.analyzer_corpus import generate_corpus, parse_mix
+from benchmarks.profile_analyzer import profile_analysis
+from src.junit_report import ingest_report
+from src.rddl_data_analyzer import RDDLDataAnalyzer
+from src.sensor_data import SensorCapture
+
+PRIMARY_TYPES = {'unit_test_log': 'unit_test_log', 'ceedling_log': 'build_system_log',
+                 'junit_xml': 'test_report_xml', 'gcovr': 'code_coverage_report', 'sensor': 'sensor_data'}
+
+
+def tree_digest(root):
+    return {str(path.relative_to(root)): hashlib.md5(path.read_bytes()).hexdigest()
+            for path in sorted(Path(root).rglob('*')) if path.is_file() and path.name != 'corpus.json'}
+
+
+class TestAnalyzerCorpus(unittest.TestCase):
+    def test_corpus_is_reproducible_across_workers(self):
+        with TemporaryDirectory() as tmp:
+            serial = generate_corpus(Path(tmp) / 'serial', files=60, sizes='uniform:1K:4K', seed=7)
+            parallel = generate_corpus(Path(tmp) / 'parallel', files=60, sizes='uniform:1K:4K', seed=7, workers=2)
+            self.assertEqual(tree_digest(Path(tmp) / 'serial'), tree_digest(Path(tmp) / 'parallel'))
+            self.assertEqual(serial['kinds'], parallel['kinds'])
+            self.assertEqual(sum(kind['files'] for kind in serial['kinds'].values()), 60)
+        with self.assertRaises(ValueError):
+            parse_mix('unit_test_log=1,pdf=1')
+
+    def test_files_are_well_formed_and_classified(self):
+        with TemporaryDirectory() as tmp:
+            corpus = generate_corpus(Path(tmp) / 'corpus', files=120, sizes='uniform:2K:16K', seed=1,
+                                     rerun_rate=0.3, duplicate_rate=0.2)
+            rddl_dir = Path(tmp) / 'corpus' / 'SYNTH'
+            for report in rddl_dir.rglob('report_*.xml'):
+                testcases, records = ingest_report(report)
+                self.assertGreater(len(testcases), 0)
+                self.assertGreater(len(records), 0)
+            for report in rddl_dir.rglob('gcovr_*.xml'):
+                self.assertEqual(ET.parse(report).getroot().tag, 'coverage')
+            kinds = {SensorCapture(path).kind for path in rddl_dir.rglob('temp_data*')}
+            self.assertEqual(kinds, {'binary', 'text'})
+
+            analysis = RDDLDataAnalyzer(rddl_dir, Path(tmp) / 'analysis', use_cache=False).run_comprehensive_analysis()
+            expected = Counter({PRIMARY_TYPES[kind]: totals['files'] for kind, totals in corpus['kinds'].items()})
+            self.assertEqual(Counter(analysis['summary']['file_types']), expected)
+            self.assertGreater(analysis['duplicate_analysis']['duplicate_groups'], 0)
+            # Reruns differ from their original in a few values only
+            self.assertGreater(analysis['near_duplicate_analysis']['estimated_savings']['near_duplicate_bytes'], 0)
+
+    def test_profile_reports_every_stage(self):
+        with TemporaryDirectory() as tmp:
+            generate_corpus(tmp, files=30, sizes='uniform:1K:8K')
+            report, stats = profile_analysis(Path(tmp) / 'SYNTH', top=5)
+
+        self.assertEqual(list(report['stages']),
+                         ['list', 'analyze', 'duplicates', 'near_duplicates', 'sw_potential', 'report'])
+        analyze = report['stages']['analyze']
+        self.assertTrue(analyze['hot_functions'])
+        self.assertLessEqual(len(analyze['allocation_sites']), 5)
+        self.assertGreaterEqual(analyze['peak_bytes'], analyze['retained_bytes'])
+        self.assertEqual(sum(timing['files'] for timing in report['file_types'].values()), 30)
+        self.assertIn('scan_file', {name for _, _, name in stats.stats})
+
+
+if __name__ == '__main__':
+    unittest.main()
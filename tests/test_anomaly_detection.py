@@ -1,7 +1,10 @@
 import os
+import sys
+import shutil
+from pathlib import Path
 import pandas as pd
 import pytest
-from src.anomaly_detection import parse_logs, detect_anomalies
+from src.anomaly_detection import parse_logs, detect_anomalies, main
 
 def test_parse_logs(tmp_path):
     # Create a fake log file in the real log format
@@ -27,3 +30,50 @@ test_fb_filter_3p3z.c:126:test_Filter3p3z:INFO: out = { 1824457, 456250, 0 }
     anomalies = detect_anomalies(df)
     # No anomalies expected in this simple test
     assert isinstance(anomalies, pd.DataFrame)
+
+def test_detect_anomalies_flags_outliers_and_failures():
+    from src.anomaly_detection import parse_text
+    lines = [f"test_fb_pi_regulator.c:234:test_PiRegulator:INFO: out = {{ {100 + i}, {i % 2} }}" for i in range(10)]
+    lines[6] = "test_fb_pi_regulator.c:234:test_PiRegulator:INFO: out = { 9999, 0 }"
+    lines.append("test_fb_pi_regulator.c:240:test_PiRegulator:FAIL: Expected 1 Was 2")
+    lines.append("test_fb_pi_regulator.c:235:test_PiRegulator:INFO: e = { 24, 5 6 }")
+    df = parse_text("\n".join(lines))
+    assert len(df) == 12
+    assert df.loc[10, 'key'] == '' and df.loc[10, 'value'] == 'Expected 1 Was 2'
+
+    anomalies = detect_anomalies(df)
+    assert list(anomalies['reason']) == ['outlier', 'level']
+    assert anomalies.loc[0, 'value'] == '{ 9999, 0 }'
+    assert anomalies.loc[0, 'index'] == 0
+
+def test_report_xml_does_not_double_count_log_lines(tmp_path):
+    lines = "\n".join(f"test_fb_filter_3p3z.c:124:test_Filter3p3z:INFO: output = {i}" for i in range(5))
+    (tmp_path / "test_fb_filter_3p3z.log").write_text(lines)
+    # report.xml system-out repeats the suite's log lines
+    (tmp_path / "report.xml").write_text(
+        f'<testsuites><testsuite name="test_fb_filter_3p3z"><system-out>\n{lines}\n</system-out></testsuite></testsuites>')
+
+    assert len(parse_logs(tmp_path)) == 5
+    assert len(parse_logs(tmp_path, report_suffixes=())) == 5
+
+def test_report_xml_adds_suites_without_a_log(tmp_path):
+    (tmp_path / "test_fb_filter_3p3z.log").write_text("test_fb_filter_3p3z.c:124:test_Filter3p3z:INFO: output = 1")
+    (tmp_path / "report.xml").write_text(
+        '<testsuites><testsuite name="test_fb_filter_3p3z"><system-out>\n'
+        'test_fb_filter_3p3z.c:124:test_Filter3p3z:INFO: output = 1\n'
+        '</system-out></testsuite><testsuite name="test_fb_pid"><system-out>\n'
+        'test_fb_pid.c:40:test_Pid:INFO: output = 2\n'
+        '</system-out></testsuite></testsuites>')
+
+    df = parse_logs(tmp_path)
+    assert list(df['file']) == ['test_fb_filter_3p3z.c', 'test_fb_pid.c']
+
+def test_main_reads_report_only_layout(tmp_path, monkeypatch):
+    log_dir = tmp_path / "logs"
+    log_dir.mkdir()
+    shutil.copy(Path(__file__).parent.parent / "data" / "logs" / "report.xml", log_dir)
+    report = tmp_path / "anomaly_report.csv"
+    monkeypatch.setattr(sys, "argv", ["anomaly_detection.py", str(log_dir), str(report)])
+
+    main()
+    assert len(pd.read_csv(report)) > 0
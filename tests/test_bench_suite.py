@@ -0,0 +1,44 @@
+import unittest
+
+from benchmarks.bench_suite import compare_results
+from benchmarks.rddl_stub_server import size_distribution
+
+
+def result(items_per_second, p95, rss=60.0):
+    return {'items_per_second': items_per_second, 'mb_per_second': items_per_second / 10, 'peak_rss_mb': rss,
+            'phases': {'download': {'count': 10, 'p50_seconds': p95 / 2, 'p95_seconds': p95, 'p99_seconds': p95}}}
+
+
+class TestBenchSuite(unittest.TestCase):
+    def test_size_distributions_are_reproducible(self):
+        self.assertEqual(size_distribution('fixed:2048', 3), [2048] * 3)
+        self.assertEqual(size_distribution('fixed:64K', 2), [65536] * 2)
+        self.assertEqual(size_distribution('lognormal:16384:1.5', 50, seed=3),
+                         size_distribution('lognormal:16384:1.5', 50, seed=3))
+        self.assertTrue(all(100 <= size <= 200 for size in size_distribution('uniform:100:200', 50)))
+        ci = size_distribution('ci', 40)
+        self.assertTrue(all(size >= 2**20 for size in ci[19::20]))
+        with self.assertRaises(ValueError):
+            size_distribution('zipf:2', 5)
+
+    def test_compare_flags_only_changes_for_the_worse(self):
+        baseline = {'scenarios': {'focused_sync': result(100, 0.050), 'enterprise': result(50, 0.010)}}
+        current = {'scenarios': {'focused_sync': result(80, 0.040), 'enterprise': result(60, 0.010),
+                                 'new_scenario': result(10, 0.1)}}
+        rows = {(name, metric): (change, regressed)
+                for name, metric, _, _, change, regressed in compare_results(baseline, current, threshold=0.1)}
+
+        self.assertEqual(rows[('focused_sync', 'items_per_second')], (-0.2, True))
+        # Lower latency is an improvement
+        self.assertFalse(rows[('focused_sync', 'download.p95_seconds')][1])
+        self.assertFalse(rows[('enterprise', 'items_per_second')][1])
+        # 2 ms -> 4 ms doubles but is below the noise floor
+        rows = compare_results({'scenarios': {'s': result(10, 0.002)}}, {'scenarios': {'s': result(10, 0.004)}})
+        self.assertFalse(any(row[5] for row in rows))
+        rows = compare_results({'scenarios': {'s': result(10, 0.2)}}, {'scenarios': {'s': result(10, 0.4)}})
+        self.assertTrue(any(row[5] for row in rows if row[1] == 'download.p95_seconds'))
+        self.assertNotIn(('new_scenario', 'items_per_second'), rows)
+
+
+if __name__ == '__main__':
+    unittest.main()
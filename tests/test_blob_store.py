@@ -0,0 +1,53 @@
+import hashlib
+import json
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from benchmarks.rddl_stub_server import RDDLStubServer
+from src.blob_store import BlobStore
+from src.focused_data_collector import FocusedDataCollector
+
+
+class TestBlobStore(unittest.TestCase):
+    def test_duplicate_files_share_one_blob(self):
+        with TemporaryDirectory() as tmp:
+            store = BlobStore(Path(tmp) / 'blobs')
+            first, second = Path(tmp) / 'rddl' / 'report.xml', Path(tmp) / 'logs' / 'report.xml'
+            for path in (first, second):
+                path.parent.mkdir()
+                path.write_bytes(b'<testsuites/>')
+
+            sha256, is_new = store.add_file(first)
+            self.assertTrue(is_new)
+            self.assertEqual(store.add_file(second), (sha256, False))
+            self.assertTrue(os.path.samefile(first, second))
+            self.assertTrue(store.contains(sha256))
+            self.assertEqual(store.duplicates(), {sha256: sorted([str(first), str(second)])})
+
+    @patch.dict('os.environ', {'RDDL_API_TOKEN': 'test-token'})
+    def test_collector_links_duplicate_artifacts_without_download(self):
+        content = b'test_fb_filter_3p3z.c:123:test_Filter3p3z:INFO: input = 10000\n' * 50
+        projects = {'PWRLIB72': [('a' * 32, 'test_fb_filter_3p3z.log', content)],
+                    'PWRLIB73': [('b' * 32, 'test_fb_filter_3p3z.log', content)]}
+        with TemporaryDirectory() as tmp, RDDLStubServer(projects) as server:
+            collector = FocusedDataCollector(base_url=server.url, data_root=Path(tmp) / 'collection',
+                                             blob_store_dir=Path(tmp) / 'blobs')
+            first = collector.collect_project_data('PWRLIB72')
+            second = collector.collect_project_data('PWRLIB73')
+
+            self.assertEqual((first['deduplicated'], second['deduplicated']), (0, 1))
+            downloads = [path for _, path in server.requests if not path.endswith('/metadata')]
+            self.assertEqual(downloads, ['/api/v1/projects/PWRLIB72/artifacts/' + 'a' * 32])
+
+            paths = [first['downloads'][0]['path'], second['downloads'][0]['path']]
+            self.assertTrue(os.path.samefile(*paths))
+            self.assertEqual(second['downloads'][0]['sha256'], hashlib.sha256(content).hexdigest())
+            results = json.loads((Path(tmp) / 'collection' / 'PWRLIB73' / 'collection_results.json').read_text())
+            self.assertEqual(results['deduplicated'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
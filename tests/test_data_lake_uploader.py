@@ -1,8 +1,37 @@
+import os
+import sqlite3
+import threading
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
+from benchmarks.rddl_stub_server import RDDLStubServer, StaticFileServer, make_artifacts
+import requests
 import src.data_lake_uploader as uploader
+from src.upload_index import UploadIndex
+from src.http_mirror import MirrorState
+
+def download_response(content):
+    """Mock of a streamed (stream=True) download response"""
+    return MagicMock(status_code=200, content=content, **{'iter_content.return_value': [content]})
 
 class TestDataLakeUploader(unittest.TestCase):
+    def setUp(self):
+        # Downloads are streamed to disk by src.streaming_download; keep them out of data/logs
+        self.logs_dir = tempfile.TemporaryDirectory()
+        self.logs_patch = patch.object(uploader, 'LOGS_DIR', self.logs_dir.name)
+        self.logs_patch.start()
+        # No artifact index: main() must not query the real data lake
+        self.index_patch = patch.object(uploader, 'UPLOAD_INDEX_PATH', '')
+        self.index_patch.start()
+        self.mirror_patch = patch.object(uploader, 'MIRROR_STATE_PATH', '')
+        self.mirror_patch.start()
+
+    def tearDown(self):
+        self.mirror_patch.stop()
+        self.index_patch.stop()
+        self.logs_patch.stop()
+        self.logs_dir.cleanup()
+
     @patch('src.data_lake_uploader.requests.get')
     @patch('src.data_lake_uploader.requests.post')
     @patch('src.data_lake_uploader.os.remove')
@@ -12,7 +41,7 @@ class TestDataLakeUploader(unittest.TestCase):
         html = '<a href="file1.log">file1.log</a>'
         mock_get.side_effect = [
             MagicMock(status_code=200, text=html),  # directory listing
-            MagicMock(status_code=200, content=b'logdata')  # file download
+            download_response(b'logdata')  # file download
         ]
         # Mock file open
         mock_open.return_value.__enter__.return_value.read.return_value = b'logdata'
@@ -42,7 +71,7 @@ class TestDataLakeUploader(unittest.TestCase):
         html = '<a href="file1.log">file1.log</a>'
         mock_get.side_effect = [
             MagicMock(status_code=200, text=html),
-            MagicMock(status_code=200, content=b'logdata')
+            download_response(b'logdata')
         ]
         mock_open.return_value.__enter__.return_value.read.return_value = b'logdata'
         mock_post.return_value.status_code = 500
@@ -53,5 +82,139 @@ class TestDataLakeUploader(unittest.TestCase):
         self.assertTrue(mock_post.called)
         self.assertTrue(mock_remove.called)
 
+class TestUploadPipeline(unittest.TestCase):
+    def test_pipeline_mirrors_and_uploads_all_files(self):
+        with tempfile.TemporaryDirectory() as web_root, tempfile.TemporaryDirectory() as logs_dir:
+            sizes = {f"test_{i}.log": 1000 + i for i in range(12)}
+            for name, size in sizes.items():
+                with open(os.path.join(web_root, name), 'wb') as f:
+                    f.write(b'x' * size)
+
+            with StaticFileServer(web_root) as web, RDDLStubServer({'PWRLIB72': []}) as rddl, \
+                    patch.object(uploader, 'SERVER_URL', web.url), \
+                    patch.object(uploader, 'LOGS_DIR', logs_dir), \
+                    patch.object(uploader, 'ARTIFACT_UPLOAD_URL', f"{rddl.url}/api/v1/projects/PWRLIB72/artifacts"):
+                stats = uploader.UploadPipeline(download_workers=3, upload_workers=2, queue_size=2).run(list(sizes))
+
+            self.assertEqual(stats, {'downloaded': 12, 'uploaded': 12, 'download_failures': 0, 'upload_failures': 0,
+                                     'skipped': 0, 'bytes_uploaded': sum(sizes.values()), 'bytes_saved': 0,
+                                     'not_modified': 0})
+            self.assertEqual({u['filename']: u['size'] for u in rddl.uploads}, sizes)
+
+    def test_download_failure_does_not_stop_pipeline(self):
+        with tempfile.TemporaryDirectory() as web_root, tempfile.TemporaryDirectory() as logs_dir:
+            with open(os.path.join(web_root, 'ok.xml'), 'wb') as f:
+                f.write(b'<testsuites/>')
+
+            with StaticFileServer(web_root) as web, RDDLStubServer({'PWRLIB72': []}) as rddl, \
+                    patch.object(uploader, 'SERVER_URL', web.url), \
+                    patch.object(uploader, 'LOGS_DIR', logs_dir), \
+                    patch.object(uploader, 'ARTIFACT_UPLOAD_URL', f"{rddl.url}/api/v1/projects/PWRLIB72/artifacts"):
+                stats = uploader.UploadPipeline().run(['missing.log', 'ok.xml'])
+
+            self.assertEqual(stats['download_failures'], 1)
+            self.assertEqual(stats['uploaded'], 1)
+
+    def test_upload_stage_survives_index_errors(self):
+        with tempfile.TemporaryDirectory() as web_root, tempfile.TemporaryDirectory() as logs_dir:
+            for name in ('a.log', 'b.log', 'c.log'):
+                with open(os.path.join(web_root, name), 'wb') as f:
+                    f.write(name.encode() * 100)
+            index = MagicMock(**{'find.return_value': None})
+            index.add.side_effect = [sqlite3.OperationalError('database is locked'), None, None]
+
+            with StaticFileServer(web_root) as web, RDDLStubServer({'PWRLIB72': []}) as rddl, \
+                    patch.object(uploader, 'SERVER_URL', web.url), \
+                    patch.object(uploader, 'LOGS_DIR', logs_dir), \
+                    patch.object(uploader, 'ARTIFACT_UPLOAD_URL', f"{rddl.url}/api/v1/projects/PWRLIB72/artifacts"):
+                # One uploader thread: if it died, run() would wait on the queue forever
+                pipeline = uploader.UploadPipeline(upload_workers=1, queue_size=1, index=index)
+                runner = threading.Thread(target=lambda: pipeline.run(['a.log', 'b.log', 'c.log']), daemon=True)
+                runner.start()
+                runner.join(timeout=30)
+
+            self.assertFalse(runner.is_alive())
+            self.assertEqual((pipeline.stats['uploaded'], pipeline.stats['upload_failures']), (2, 1))
+            self.assertEqual(len(rddl.uploads), 3)
+
+    def test_index_skips_files_already_in_data_lake(self):
+        with tempfile.TemporaryDirectory() as web_root, tempfile.TemporaryDirectory() as logs_dir:
+            contents = {f"test_{i}.log": f"run log {i}\n".encode() * 100 for i in range(6)}
+            for name, content in contents.items():
+                with open(os.path.join(web_root, name), 'wb') as f:
+                    f.write(content)
+            # The data lake already holds three of the files, one of them with older content
+            existing = [(f"{i:032x}", f"test_{i}.log", contents[f"test_{i}.log"]) for i in range(2)]
+            existing.append(("f" * 32, "test_2.log", b"older content"))
+
+            with StaticFileServer(web_root) as web, RDDLStubServer({'PWRLIB72': existing}) as rddl, \
+                    patch.object(uploader, 'SERVER_URL', web.url), \
+                    patch.object(uploader, 'LOGS_DIR', logs_dir), \
+                    patch.object(uploader, 'ARTIFACT_UPLOAD_URL', f"{rddl.url}/api/v1/projects/PWRLIB72/artifacts"):
+                index = UploadIndex(os.path.join(logs_dir, 'index.sqlite'), 'PWRLIB72')
+                self.assertEqual(index.refresh(requests, f"{rddl.url}/api/v1/projects/PWRLIB72/artifacts/metadata"), 3)
+                first = uploader.UploadPipeline(index=index).run(list(contents))
+                second = uploader.UploadPipeline(index=index).run(list(contents))
+
+            self.assertEqual(sorted(u['filename'] for u in rddl.uploads), [f"test_{i}.log" for i in range(2, 6)])
+            self.assertEqual((first['skipped'], first['uploaded']), (2, 4))
+            self.assertEqual(first['bytes_saved'], len(contents['test_0.log']) + len(contents['test_1.log']))
+            # Recorded uploads make the next run free
+            self.assertEqual((second['skipped'], second['uploaded'], second['bytes_uploaded']), (6, 0, 0))
+
+    def test_mirror_mode_turns_unchanged_files_into_304s(self):
+        with tempfile.TemporaryDirectory() as web_root, tempfile.TemporaryDirectory() as logs_dir:
+            names = [f"test_{i}.log" for i in range(4)]
+            for name in names:
+                with open(os.path.join(web_root, name), 'wb') as f:
+                    f.write(name.encode() * 50)
+
+            with StaticFileServer(web_root) as web, RDDLStubServer({'PWRLIB72': []}) as rddl, \
+                    patch.object(uploader, 'SERVER_URL', web.url), \
+                    patch.object(uploader, 'LOGS_DIR', logs_dir), \
+                    patch.object(uploader, 'ARTIFACT_UPLOAD_URL', f"{rddl.url}/api/v1/projects/PWRLIB72/artifacts"):
+                mirror = MirrorState(os.path.join(logs_dir, 'mirror.sqlite'))
+                self.assertEqual(sorted(uploader.list_file_links(mirror)), names)
+                first = uploader.UploadPipeline(mirror=mirror).run(names)
+
+                # One file changes on the server (newer mtime), the rest are answered with 304
+                with open(os.path.join(web_root, names[0]), 'ab') as f:
+                    f.write(b'more')
+                os.utime(os.path.join(web_root, names[0]), (2e9, 2e9))
+                second = uploader.UploadPipeline(mirror=mirror).run(names)
+                mirror.close()
+
+            self.assertEqual((first['downloaded'], first['not_modified'], first['uploaded']), (4, 0, 4))
+            self.assertEqual((second['downloaded'], second['not_modified'], second['uploaded']), (1, 3, 1))
+            self.assertEqual([u['filename'] for u in rddl.uploads[4:]], [names[0]])
+
+    def test_failed_refresh_keeps_cached_index(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            index = UploadIndex(os.path.join(tmp, 'index.sqlite'), 'PWRLIB72')
+            index.add('a' * 32, 'test_0.log', 7, 'md5')
+            with RDDLStubServer({}) as rddl:  # unknown project -> 404
+                self.assertIsNone(index.refresh(requests, f"{rddl.url}/api/v1/projects/PWRLIB72/artifacts/metadata"))
+            self.assertEqual(index.find('test_0.log', 7, 'md5'), 'a' * 32)
+            self.assertIsNone(index.find('test_0.log', 8, 'md5'))
+            index.close()
+
+    def test_truncated_listing_keeps_cached_index(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            index = UploadIndex(os.path.join(tmp, 'index.sqlite'), 'PWRLIB72')
+            index.add('a' * 32, 'test_0.log', 7, 'md5')
+            with RDDLStubServer({'PWRLIB72': make_artifacts(30)}) as rddl:
+                url = f"{rddl.url}/api/v1/projects/PWRLIB72/artifacts/metadata"
+                session = MagicMock()
+                # Page 1 lists fine, page 2 fails after all retries
+                session.get.side_effect = lambda url, params=None, **kwargs: (
+                    requests.get(url, params=params, **kwargs) if params['pageNumber'] == 1
+                    else MagicMock(status_code=503, text='Service Unavailable'))
+                self.assertIsNone(index.refresh(session, url, page_size=10))
+                self.assertEqual(len(index), 1)
+                self.assertEqual(index.find('test_0.log', 7, 'md5'), 'a' * 32)
+                self.assertEqual(index.refresh(requests, url, page_size=10), 30)
+            self.assertEqual(len(index), 30)
+            index.close()
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,75 @@
+import json
+import unittest
+from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from benchmarks.rddl_stub_server import RDDLStubServer, make_artifacts
+from src.enterprise_data_collector import EnterpriseDataCollector
+
+
+class TestEnterpriseDiscovery(unittest.TestCase):
+    def setUp(self):
+        self.env = patch.dict('os.environ', {'RDDL_API_TOKEN': 'test-token'})
+        self.env.start()
+        self.tmp = TemporaryDirectory()
+        root = Path(self.tmp.name)
+        # Two extra project keys only known from data/multi_app_data style metadata
+        for app, key in (('JIRA', 'NEWJIRA'), ('OTHER', 'NEWAPP')):
+            (root / 'multi_app' / app / key).mkdir(parents=True)
+            (root / 'multi_app' / app / key / 'metadata.json').write_text(json.dumps({'project_key': key}))
+        self.server = RDDLStubServer({'PWRLIB72': make_artifacts(3), 'ACT': make_artifacts(2),
+                                      'NEWAPP': make_artifacts(1)}).start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmp.cleanup()
+        self.env.stop()
+
+    def collector(self, **kwargs):
+        root = Path(self.tmp.name)
+        return EnterpriseDataCollector(server_url=self.server.url, data_dir=root / 'enterprise',
+                                       multi_app_dir=root / 'multi_app', **kwargs)
+
+    def probes(self):
+        return [path for _, path in self.server.requests if path.endswith('/metadata')]
+
+    def test_discovery_covers_all_candidates_and_caches(self):
+        collector = self.collector()
+        candidates = collector.get_candidate_projects()
+        self.assertIn('NEWJIRA', candidates)
+        self.assertIn('NEWAPP', candidates)
+        self.assertNotIn('PWRLIB72', candidates)
+
+        access = collector.discover_accessible_projects()
+        self.assertEqual(list(access), candidates)
+        self.assertEqual(sorted(k for k, v in access.items() if v['accessible']), ['ACT', 'NEWAPP'])
+        self.assertEqual(len(self.probes()), len(candidates))
+
+        # Second scan within the TTL is served from the cache
+        self.assertEqual(self.collector().discover_accessible_projects(), access)
+        self.assertEqual(len(self.probes()), len(candidates))
+
+        # An expired cache probes again
+        self.collector(access_cache_ttl_hours=0).discover_accessible_projects()
+        self.assertEqual(len(self.probes()), 2 * len(candidates))
+
+    def test_cache_entries_without_timestamp_are_stale(self):
+        collector = self.collector()
+        cache = {'ACT': {'accessible': True, 'status_code': 200},
+                 'NEWAPP': {'accessible': True, 'status_code': 200, 'checked_at': 'yesterday'},
+                 'NEWJIRA': {'accessible': False, 'status_code': 404, 'checked_at': datetime.now().isoformat()}}
+        cached, stale = collector.split_cached_access(['ACT', 'NEWAPP', 'NEWJIRA', 'TTI'], cache)
+        self.assertEqual(cached, {'NEWJIRA': {'accessible': False, 'status_code': 404}})
+        self.assertEqual(stale, ['ACT', 'NEWAPP', 'TTI'])
+
+    def test_quick_collect_records_discoveries(self):
+        results = self.collector().quick_collect_known_projects()
+        self.assertEqual(results['working_projects']['PWRLIB72']['artifact_count'], 3)
+        self.assertEqual(sorted(results['newly_discovered']), ['ACT', 'NEWAPP'])
+        self.assertEqual(results['summary']['total_artifacts'], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
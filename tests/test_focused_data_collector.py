@@ -0,0 +1,157 @@
+import json
+import asyncio
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from benchmarks.rddl_stub_server import RDDLStubServer, make_artifacts
+from src.focused_data_collector import FocusedDataCollector
+from src.rddl_pagination import ArtifactPaginator
+from src.rddl_async_client import AsyncRDDLClient
+from src.streaming_download import partial_path
+
+
+class TestFocusedDataCollector(unittest.TestCase):
+    def setUp(self):
+        self.env = patch.dict('os.environ', {'RDDL_API_TOKEN': 'test-token'})
+        self.env.start()
+        self.server = RDDLStubServer({'PWRLIB72': make_artifacts(30, size=2048)}).start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.env.stop()
+
+    def collect(self, workers, data_root):
+        collector = FocusedDataCollector(workers=workers, base_url=self.server.url, data_root=data_root)
+        collector.collect_project_data('PWRLIB72')
+        return json.loads((Path(data_root) / 'PWRLIB72' / 'collection_results.json').read_text())
+
+    def test_concurrent_matches_serial(self):
+        with TemporaryDirectory() as serial_root, TemporaryDirectory() as concurrent_root:
+            serial = self.collect(1, serial_root)
+            concurrent = self.collect(8, concurrent_root)
+            self.assertEqual(serial['successful_downloads'], 30)
+            self.assertEqual(json.dumps(serial).replace(serial_root, '<root>'),
+                             json.dumps(concurrent).replace(concurrent_root, '<root>'))
+            for download in concurrent['downloads']:
+                self.assertEqual(Path(download['path']).stat().st_size, 2048)
+
+    def test_repeated_filenames_do_not_collide(self):
+        """PWRLIB72 uploads another report.xml every run; each artifact keeps its own file"""
+        artifacts = make_artifacts(11, size=4096, names=['report.xml'])
+        with RDDLStubServer({'PWRLIB72': artifacts}) as server:
+            runs = {}
+            for mode in ('serial', 'threads', 'async'):
+                with TemporaryDirectory() as root:
+                    collector = FocusedDataCollector(workers=1 if mode == 'serial' else 8, base_url=server.url,
+                                                     data_root=root)
+                    if mode == 'async':
+                        asyncio.run(collector.run_focused_collection_async(max_concurrency=8))
+                    else:
+                        collector.collect_project_data('PWRLIB72')
+                    results = json.loads((Path(root) / 'PWRLIB72' / 'collection_results.json').read_text())
+                    self.assertEqual(results['successful_downloads'], 11, mode)
+                    for (_, _, content), download in zip(artifacts, results['downloads']):
+                        self.assertEqual(Path(download['path']).read_bytes(), content)
+                    runs[mode] = json.dumps(results).replace(root, '<root>')
+
+        self.assertEqual(runs['serial'], runs['threads'])
+        self.assertEqual(runs['serial'], runs['async'])
+
+    def test_incremental_skips_unchanged_and_resumes_partial(self):
+        with TemporaryDirectory() as root:
+            collector = FocusedDataCollector(base_url=self.server.url, data_root=root, incremental=True)
+            first = collector.collect_project_data('PWRLIB72')
+            self.assertEqual(first['incremental'], {'fetched': 30, 'resumed': 0, 'skipped': 0})
+
+            # Simulate an interrupted download of one artifact
+            artifact = collector.get_artifacts_metadata('PWRLIB72')[4]
+            save_path = Path(first['downloads'][4]['path'])
+            content = save_path.read_bytes()
+            save_path.unlink()
+            collector.manifest.mark_partial('PWRLIB72', artifact, save_path)
+            partial_path(save_path, artifact['id']).write_bytes(content[:1000])
+
+            requests_before = len(self.server.requests)
+            second = collector.collect_project_data('PWRLIB72')
+            self.assertEqual(second['incremental'], {'fetched': 0, 'resumed': 1, 'skipped': 29})
+            self.assertEqual(save_path.read_bytes(), content)
+            self.assertEqual(second['downloads'][4]['sha256'], first['downloads'][4]['sha256'])
+            self.assertEqual(self.server.range_requests[-1][1], 'bytes=1000-')
+            # Only the resumed artifact is downloaded again
+            downloads = [path for _, path in self.server.requests[requests_before:]
+                         if not path.endswith('/metadata')]
+            self.assertEqual(downloads, [f"/api/v1/projects/PWRLIB72/artifacts/{artifact['id']}"])
+
+    def test_incremental_skips_repeated_filenames(self):
+        artifacts = make_artifacts(12, size=4096, names=['report.xml', 'test_fb_filter.log'])
+        with RDDLStubServer({'PWRLIB72': artifacts}) as server, TemporaryDirectory() as root:
+            collector = FocusedDataCollector(workers=8, base_url=server.url, data_root=root, incremental=True)
+            first = collector.collect_project_data('PWRLIB72')
+            self.assertEqual(first['incremental'], {'fetched': 12, 'resumed': 0, 'skipped': 0})
+
+            requests_before = len(server.requests)
+            second = collector.collect_project_data('PWRLIB72')
+            self.assertEqual(second['incremental'], {'fetched': 0, 'resumed': 0, 'skipped': 12})
+            self.assertEqual([path for _, path in server.requests[requests_before:]
+                              if not path.endswith('/metadata')], [])
+            for (_, _, content), download in zip(artifacts, second['downloads']):
+                self.assertEqual(Path(download['path']).read_bytes(), content)
+
+    def test_download_not_matching_listed_md5_is_discarded(self):
+        with TemporaryDirectory() as root:
+            collector = FocusedDataCollector(base_url=self.server.url, data_root=root, incremental=True)
+            artifact = collector.get_artifacts_metadata('PWRLIB72')[2]
+            # The server now returns different bytes of the same size from what the listing described
+            artifact_id, filename, content = self.server.projects['PWRLIB72'][2]
+            self.server.projects['PWRLIB72'][2] = (artifact_id, filename, bytes(reversed(content)))
+
+            for download in (collector.download_artifact,
+                             lambda *args: asyncio.run(self.download_async(collector, *args))):
+                success, error = download('PWRLIB72', artifact)
+                self.assertFalse(success)
+                self.assertIn('md5 mismatch', error)
+                self.assertEqual([path for path in Path(root).rglob('*') if path.is_file()
+                                  and path.suffix != '.sqlite'], [])
+                self.assertEqual(collector.manifest.get('PWRLIB72', artifact_id)['status'], 'partial')
+
+    async def download_async(self, collector, project_key, artifact):
+        async with AsyncRDDLClient('test-token', base_url=self.server.url) as client:
+            return await collector.download_artifact_async(client, project_key, artifact)
+
+    def test_truncated_listing_fails_the_project(self):
+        fetch_page, fetch_page_async = ArtifactPaginator.fetch_page, AsyncRDDLClient.fetch_page
+
+        def lose_page_2(paginator, page_number):
+            if page_number == 2:
+                raise RuntimeError("HTTP 503 on page 2")
+            return fetch_page(paginator, page_number)
+
+        async def lose_page_2_async(client, project_key, page_number, page_size=100):
+            if page_number == 2:
+                raise RuntimeError("HTTP 503 on page 2")
+            return await fetch_page_async(client, project_key, page_number, page_size)
+
+        for mode in ('threads', 'async'):
+            with TemporaryDirectory() as root, \
+                    patch.object(ArtifactPaginator, 'fetch_page', lose_page_2), \
+                    patch.object(AsyncRDDLClient, 'fetch_page', lose_page_2_async):
+                collector = FocusedDataCollector(base_url=self.server.url, data_root=root, page_size=10)
+                collector.working_projects = ['PWRLIB72']
+                if mode == 'async':
+                    summary = asyncio.run(collector.run_focused_collection_async())
+                else:
+                    summary = collector.run_focused_collection()
+                self.assertIn('error', summary['projects']['PWRLIB72'], mode)
+                self.assertFalse((Path(root) / 'PWRLIB72' / 'metadata.json').exists(), mode)
+                self.assertFalse((Path(root) / 'PWRLIB72' / 'collection_results.json').exists(), mode)
+
+    def test_missing_token(self):
+        with patch.dict('os.environ', {}, clear=True):
+            with self.assertRaises(ValueError):
+                FocusedDataCollector()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from src.http_mirror import (MirrorState, MODIFIED, NOT_MODIFIED, extract_links, fetch_listing,
+                             mirror_file)
+
+LISTING = """<html><body><h1>Index of /uut</h1><pre>
+<a href="?C=N;O=D">Name</a> <a href='../'>Parent Directory</a>
+<A HREF="test_fb_filter_3p3z.log">test_fb_filter_3p3z.log</A> 2025-07-14 10:00 4.1K
+<a class="file" href=report.xml>report.xml</a>
+<a href="test_a&amp;b.log">test_a&amp;b.log</a>
+</pre></body></html>"""
+
+
+def response(status, text='', headers=None, body=b''):
+    return MagicMock(status_code=status, text=text, headers=headers or {},
+                     **{'iter_content.return_value': [body]})
+
+
+class TestExtractLinks(unittest.TestCase):
+    def test_extracts_quoted_unquoted_and_escaped_hrefs(self):
+        self.assertEqual(extract_links(LISTING),
+                         ['?C=N;O=D', '../', 'test_fb_filter_3p3z.log', 'report.xml', 'test_a&b.log'])
+        self.assertEqual(extract_links(LISTING, ('.log', '.xml')),
+                         ['test_fb_filter_3p3z.log', 'report.xml', 'test_a&b.log'])
+
+
+class TestMirror(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.state = MirrorState(os.path.join(self.tmp.name, 'state.sqlite'))
+
+    def tearDown(self):
+        self.state.close()
+        self.tmp.cleanup()
+
+    def test_listing_is_served_from_cache_on_304(self):
+        session = MagicMock()
+        session.get.side_effect = [response(200, LISTING, {'ETag': '"v1"'}), response(304)]
+        self.assertEqual(fetch_listing(session, 'http://srv/uut/', self.state, ('.xml',)), (['report.xml'], MODIFIED))
+        self.assertEqual(fetch_listing(session, 'http://srv/uut/', self.state, ('.xml',)), (['report.xml'], NOT_MODIFIED))
+        self.assertEqual(session.get.call_args.kwargs['headers'], {'If-None-Match': '"v1"'})
+
+    def test_file_validators_are_sent_back_while_local_copy_exists(self):
+        path = os.path.join(self.tmp.name, 'test.log')
+        session = MagicMock()
+        session.get.side_effect = [
+            response(200, headers={'ETag': '"a"', 'Last-Modified': 'Mon, 14 Jul 2025 10:00:00 GMT'}, body=b'log'),
+            response(304),
+            response(200, headers={'ETag': '"a"'}, body=b'log'),
+        ]
+        status, entry = mirror_file(session, 'http://srv/uut/test.log', path, self.state)
+        self.assertEqual((status, entry['size'], entry['uploaded']), (MODIFIED, 3, 0))
+
+        self.state.mark_uploaded(path)
+        status, entry = mirror_file(session, 'http://srv/uut/test.log', path, self.state)
+        self.assertEqual((status, entry['uploaded']), (NOT_MODIFIED, 1))
+        self.assertEqual(session.get.call_args.kwargs['headers'],
+                         {'If-None-Match': '"a"', 'If-Modified-Since': 'Mon, 14 Jul 2025 10:00:00 GMT'})
+
+        # Local copy deleted: fetch unconditionally
+        os.remove(path)
+        status, _ = mirror_file(session, 'http://srv/uut/test.log', path, self.state)
+        self.assertEqual(status, MODIFIED)
+        self.assertEqual(session.get.call_args.kwargs['headers'], {})
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b'log')
+
+    def test_304_without_local_copy_is_fetched_again(self):
+        path = os.path.join(self.tmp.name, 'test.log')
+        session = MagicMock()
+        session.get.side_effect = [response(200, headers={'ETag': '"a"'}, body=b'log')]
+        mirror_file(session, 'http://srv/uut/test.log', path, self.state)
+        os.remove(path)
+
+        # A cache in between still answers 304 to the unconditional request
+        session.get.side_effect = [response(304), response(200, headers={'ETag': '"a"'}, body=b'log')]
+        status, entry = mirror_file(session, 'http://srv/uut/test.log', path, self.state)
+        self.assertEqual((status, entry['size']), (MODIFIED, 3))
+        self.assertEqual(session.get.call_args.kwargs['headers'], {'Cache-Control': 'no-cache'})
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b'log')
+
+        os.remove(path)
+        session.get.side_effect = [response(304), response(304)]
+        with self.assertRaises(IOError):
+            mirror_file(session, 'http://srv/uut/test.log', path, self.state)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import io
+import unittest
+
+from src.junit_report import ingest_report, iter_report_batches
+
+REPORT = b"""<?xml version="1.0" encoding="utf-8" ?>
+<testsuites tests="3" failures="1">
+  <testsuite name="test_fb_filter_3p3z" tests="2" failures="1">
+    <testcase name="test_Filter3p3z_Reset" time="0.001"/>
+    <testcase name="test_Filter3p3z" time="0.250">
+      <failure message="Expected 6 Was 7">test_fb_filter_3p3z.c:124</failure>
+    </testcase>
+    <system-out>
+test_fb_filter_3p3z.c:123:test_Filter3p3z:INFO: input = 10000
+
+test_fb_filter_3p3z.c:125:test_Filter3p3z:INFO: in = { 10000, 0, 0 }
+
+    </system-out>
+  </testsuite>
+  <testsuite name="test_fb_pi_regulator" tests="1">
+    <testcase name="test_PiRegulator" time="0.000"/>
+    <system-out>
+test_fb_pi_regulator.c:236:test_PiRegulator:INFO: saturated = 1
+    </system-out>
+  </testsuite>
+</testsuites>
+"""
+
+
+class TestJUnitReport(unittest.TestCase):
+    def test_ingest_report(self):
+        testcases, records = ingest_report(io.BytesIO(REPORT))
+
+        self.assertEqual(list(testcases['name']), ['test_Filter3p3z_Reset', 'test_Filter3p3z', 'test_PiRegulator'])
+        self.assertEqual(list(testcases['suite']), ['test_fb_filter_3p3z', 'test_fb_filter_3p3z', 'test_fb_pi_regulator'])
+        self.assertEqual(list(testcases['status']), ['passed', 'failed', 'passed'])
+        self.assertEqual(testcases.loc[1, 'message'], 'Expected 6 Was 7')
+        self.assertAlmostEqual(testcases['time'].sum(), 0.251)
+
+        self.assertEqual(list(records['key']), ['input', 'in', 'saturated'])
+        self.assertEqual(list(records['suite']), ['test_fb_filter_3p3z', 'test_fb_filter_3p3z', 'test_fb_pi_regulator'])
+        self.assertEqual(records.loc[1, 'value'], '{ 10000, 0, 0 }')
+        self.assertEqual(records.loc[2, 'line'], 236)
+
+    def test_batches_cover_all_rows(self):
+        batches = list(iter_report_batches(io.BytesIO(REPORT), batch_size=1, report='report.xml'))
+        self.assertGreater(len(batches), 1)
+        self.assertEqual(sum(len(testcases) for testcases, _ in batches), 3)
+        self.assertEqual(sum(len(records) for _, records in batches), 3)
+        self.assertEqual({value for _, records in batches for value in records['report']}, {'report.xml'})
+
+
+if __name__ == "__main__":
+    unittest.main()
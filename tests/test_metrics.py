@@ -0,0 +1,96 @@
+import json
+import asyncio
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from benchmarks.rddl_stub_server import RDDLStubServer, make_artifacts
+from src.focused_data_collector import FocusedDataCollector
+from src.metrics import Histogram, Metrics
+
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram_percentiles(self):
+        histogram = Histogram()
+        for ms in range(1, 101):
+            histogram.observe(ms / 1000)
+        # Interpolated inside the bucket the rank falls in: within one bucket width
+        self.assertTrue(0.025 <= histogram.percentile(50) <= 0.1, histogram.percentile(50))
+        self.assertTrue(0.05 <= histogram.percentile(95) <= 0.1, histogram.percentile(95))
+        self.assertEqual(histogram.percentile(100), 0.1)
+        self.assertIsNone(Histogram().percentile(50))
+
+    def test_snapshot_and_exports(self):
+        metrics = Metrics()
+        metrics.observe('download', 0.5, 2 * 2**20)
+        metrics.observe('download', 1.5, 2 * 2**20)
+        with metrics.tracking('downloads'), metrics.tracking('downloads'):
+            pass
+
+        phase = metrics.snapshot()['phases']['download']
+        self.assertEqual((phase['count'], phase['total_seconds'], phase['bytes']), (2, 2.0, 4 * 2**20))
+        self.assertEqual(phase['bytes_per_second'], 2**21)
+        self.assertEqual(metrics.snapshot()['in_flight']['downloads'], {'current': 0, 'peak': 2})
+
+        text = metrics.to_prometheus()
+        self.assertIn('rddl_phase_seconds_bucket{phase="download",le="+Inf"} 2', text)
+        self.assertIn('rddl_phase_bytes_total{phase="download"} 4194304', text)
+        self.assertIn('rddl_in_flight_peak{name="downloads"} 2', text)
+
+        with TemporaryDirectory() as tmp:
+            self.assertEqual(metrics.export(Path(tmp) / 'run.prom').read_text(), text)
+            jsonl = Path(tmp) / 'runs.jsonl'
+            metrics.export(jsonl, run='nightly')
+            metrics.export(jsonl, run='nightly')
+            lines = [json.loads(line) for line in jsonl.read_text().splitlines()]
+            self.assertEqual(len(lines), 2)
+            self.assertEqual(lines[0]['run'], 'nightly')
+            self.assertEqual(lines[0]['phases']['download']['count'], 2)
+
+
+@patch.dict('os.environ', {'RDDL_API_TOKEN': 'test-token'})
+class TestCollectorInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.server = RDDLStubServer({'PWRLIB72': make_artifacts(20, size=4096)}).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def check_timings(self, summary, data_root):
+        phases = summary['timings']['phases']
+        self.assertEqual(phases['download']['count'], 20)
+        self.assertEqual(phases['first_byte']['count'], 20)
+        self.assertEqual(phases['download']['bytes'], 20 * 4096)
+        self.assertEqual(phases['write']['bytes'], 20 * 4096)
+        self.assertGreaterEqual(phases['listing']['count'], 1)
+        for timing in phases.values():
+            self.assertLessEqual(timing['p50_seconds'], timing['p95_seconds'])
+            self.assertLessEqual(timing['p95_seconds'], timing['p99_seconds'])
+        self.assertEqual(summary['timings']['in_flight']['downloads']['current'], 0)
+        self.assertIn('timings', summary['projects']['PWRLIB72'])
+        # collection_results.json stays free of wall-clock values
+        results = json.loads((Path(data_root) / 'PWRLIB72' / 'collection_results.json').read_text())
+        self.assertNotIn('timings', results)
+
+    def test_sync_collection_records_phases(self):
+        with TemporaryDirectory() as data_root:
+            metrics_path = Path(data_root) / 'metrics.jsonl'
+            collector = FocusedDataCollector(workers=4, base_url=self.server.url, data_root=data_root,
+                                             metrics_path=metrics_path)
+            summary = collector.run_focused_collection()
+            self.check_timings(summary, data_root)
+            self.assertGreater(summary['timings']['in_flight']['downloads']['peak'], 1)
+            exported = json.loads(metrics_path.read_text())
+            self.assertEqual(exported['collector'], 'focused')
+            self.assertEqual(exported['phases']['download']['count'], 20)
+
+    def test_async_collection_records_phases(self):
+        with TemporaryDirectory() as data_root:
+            collector = FocusedDataCollector(base_url=self.server.url, data_root=data_root)
+            summary = asyncio.run(collector.run_focused_collection_async(max_concurrency=4))
+            self.check_timings(summary, data_root)
+
+
+if __name__ == '__main__':
+    unittest.main()
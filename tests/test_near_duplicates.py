@@ -0,0 +1,89 @@
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from src.near_duplicates import (MinHash, decode_signature, find_near_duplicates, lsh_params,
+                                 similarity, text_signature)
+from src.rddl_data_analyzer import RDDLDataAnalyzer, scan_file
+
+
+def ci_log(run, lines=120, changed=0):
+    """A Ceedling log as produced by CI run `run`; `changed` lines carry different results"""
+    return "\n".join(
+        f"[2025-07-{10 + run:02d}T10:{i % 60:02d}:00Z] /builds/{run}/src/test_filter.c:{i}:test_{i}:"
+        f"{'FAIL' if i < changed else 'PASS'}" for i in range(lines))
+
+
+class TestNearDuplicates(unittest.TestCase):
+    def test_timestamps_and_paths_do_not_change_the_signature(self):
+        self.assertEqual(text_signature(ci_log(0)), text_signature(ci_log(1)))
+        self.assertIsNone(text_signature("\n  \n"))
+
+    def test_similarity_estimates_jaccard(self):
+        a = decode_signature(text_signature(ci_log(0)))
+        b = decode_signature(text_signature(ci_log(1, changed=30)))  # 90 of 150 distinct lines shared
+        self.assertAlmostEqual(similarity(a, b), 90 / 150, delta=0.12)
+
+    def test_incremental_updates_match_whole_text(self):
+        text = ci_log(0)
+        minhash = MinHash()
+        for part in text.split("\n"):
+            minhash.update_text(part)
+        self.assertEqual(minhash.digest(), text_signature(text))
+
+    def test_lsh_params_split_signature(self):
+        bands, rows = lsh_params(0.8)
+        self.assertEqual(bands * rows, 128)
+        self.assertAlmostEqual((1 / bands) ** (1 / rows), 0.8, delta=0.1)
+
+    def test_clusters_respect_threshold(self):
+        signatures = {f"run{run}.log": text_signature(ci_log(run)) for run in range(5)}
+        signatures["flaky.log"] = text_signature(ci_log(9, changed=60))
+        signatures["other.log"] = text_signature("\n".join(f"unrelated line {i}" for i in range(100)))
+
+        clusters = find_near_duplicates(signatures, threshold=0.8)
+        self.assertEqual([c['members'] for c in clusters], [[f"run{run}.log" for run in range(5)]])
+        self.assertEqual(clusters[0]['min_similarity'], 1.0)
+
+        loose = find_near_duplicates(signatures, threshold=0.3)
+        self.assertIn("flaky.log", loose[0]['members'])
+
+    def test_scales_to_many_signatures(self):
+        rng = np.random.default_rng(0)
+        signatures = {f"log{i}": rng.integers(0, 2 ** 32, 128, dtype=np.uint64) for i in range(5000)}
+        signatures['copy'] = signatures['log0'].copy()
+        self.assertEqual(find_near_duplicates(signatures), [{'members': ['copy', 'log0'], 'min_similarity': 1.0}])
+
+
+class TestAnalyzerNearDuplicates(unittest.TestCase):
+    def test_scan_file_signature_is_chunk_independent(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "ci.log"
+            path.write_text(ci_log(0))
+            self.assertEqual(scan_file(path, chunk_size=37)['minhash'], text_signature(ci_log(0)))
+
+    def test_report_estimates_savings(self):
+        with TemporaryDirectory() as tmp:
+            logs = Path(tmp) / "logs"
+            logs.mkdir()
+            for run in range(3):
+                (logs / f"ceedling_{run}.log").write_text(ci_log(run))
+            (logs / "copy.log").write_text(ci_log(0))
+
+            analyzer = RDDLDataAnalyzer(rddl_dir=logs, analysis_dir=Path(tmp) / "out", use_cache=False)
+            report = analyzer.run_comprehensive_analysis()
+
+        near = report['near_duplicate_analysis']
+        self.assertEqual(near['cluster_count'], 1)
+        self.assertEqual(sorted(near['clusters'][0]['files']),
+                         ['ceedling_0.log', 'ceedling_1.log', 'ceedling_2.log', 'copy.log'])
+        size = len(ci_log(0))
+        self.assertEqual(near['estimated_savings']['exact_duplicate_bytes'], size)
+        self.assertEqual(near['estimated_savings']['near_duplicate_bytes'], 2 * size)
+        self.assertNotIn('minhash', report['file_analyses'][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
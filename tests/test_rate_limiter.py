@@ -0,0 +1,122 @@
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from benchmarks.rddl_stub_server import RDDLStubServer, make_artifacts
+from src.rate_limiter import AdaptiveTokenBucket, RateLimiter, endpoint_of, parse_budgets
+from src.rddl_transport import RetryingSession, RetryPolicy
+
+
+class TestAdaptiveTokenBucket(unittest.TestCase):
+    def test_throttle_halves_rate_once_per_cooldown(self):
+        bucket = AdaptiveTokenBucket(40, cooldown=60)
+        bucket.on_throttle()
+        bucket.on_throttle()  # same congestion event: in-flight requests answered 429 together
+        self.assertEqual(bucket.rate, 20)
+        self.assertEqual(bucket.stats['throttled'], 2)
+
+        bucket.last_decrease -= 60
+        bucket.on_throttle()
+        self.assertEqual(bucket.rate, 10)
+
+    def test_additive_increase_is_capped(self):
+        bucket = AdaptiveTokenBucket(10, max_rate=12, increase=2)
+        for _ in range(20):
+            bucket.on_success(latency=0.01)
+        self.assertAlmostEqual(bucket.rate, 12)
+
+    def test_rate_never_drops_below_min_rate(self):
+        bucket = AdaptiveTokenBucket(10, min_rate=4, cooldown=0)
+        for _ in range(5):
+            bucket.on_throttle()
+        self.assertEqual(bucket.rate, 4)
+
+    def test_slow_response_counts_as_congestion(self):
+        bucket = AdaptiveTokenBucket(10, latency_target=1.0)
+        bucket.on_success(latency=2.5)
+        self.assertAlmostEqual(bucket.rate, 8)
+        self.assertEqual(bucket.stats['slow'], 1)
+
+    def test_retry_after_pauses_bucket(self):
+        bucket = AdaptiveTokenBucket(100)
+        bucket.on_throttle(pause=0.5)
+        self.assertGreaterEqual(bucket.try_acquire(), 0.5)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_endpoints_have_separate_budgets(self):
+        base = "https://rddl/api/v1/projects/P/artifacts"
+        self.assertEqual(endpoint_of('GET', f"{base}/metadata?pageSize=1"), 'metadata')
+        self.assertEqual(endpoint_of('GET', f"{base}/abc123"), 'download')
+        self.assertEqual(endpoint_of('POST', base), 'upload')
+        self.assertEqual(endpoint_of('GET', "https://mtb-web/deploy/"), 'other')
+        self.assertEqual(parse_budgets("metadata=5, download=40"), {'metadata': 5.0, 'download': 40.0})
+
+        limiter = RateLimiter({'metadata': 10, 'download': 10})
+        limiter.feedback('GET', f"{base}/metadata", 429)
+        limiter.feedback('GET', f"{base}/abc123", 200, latency=0.01)
+        limiter.feedback('GET', f"{base}/abc123", 502)
+        stats = limiter.stats()
+        self.assertEqual(stats['metadata']['rate'], 5)
+        self.assertGreater(stats['download']['rate'], 10)
+        self.assertEqual(stats['download']['requests'], 1)
+        self.assertIsNone(limiter.bucket('GET', "https://mtb-web/deploy/"))
+
+    def test_retry_after_is_honoured_once(self):
+        """With a limiter, the bucket pause covers Retry-After; the retry backoff does not add it again"""
+        with RDDLStubServer({'P': make_artifacts(1)}, fault_rate=1.0, retry_after='0.3') as server, \
+                patch('benchmarks.rddl_stub_server.FAULTS', ('503',)):
+            url = f"{server.url}/api/v1/projects/P/artifacts/metadata"
+            results = {}
+            for name, limiter in (('limiter', RateLimiter({'metadata': 100})), ('no limiter', None)):
+                server.fault_rate = 1.0
+                policy = RetryPolicy(max_attempts=2, base_delay=0.001)
+                delays = []
+
+                def delay(attempt, headers=None, real=policy.delay):
+                    server.fault_rate = 0.0
+                    delays.append(real(attempt, headers))
+                    return delays[-1]
+
+                with patch.object(policy, 'delay', side_effect=delay):
+                    start = time.perf_counter()
+                    response = RetryingSession(policy, rate_limiter=limiter).get(url, timeout=5)
+                    results[name] = (response.status_code, delays[0], time.perf_counter() - start)
+
+        status, backoff, elapsed = results['limiter']
+        self.assertEqual(status, 200)
+        self.assertLess(backoff, 0.3)
+        self.assertTrue(0.25 <= elapsed < 0.55, elapsed)
+        # Without a limiter the retry loop is the one honouring Retry-After
+        status, backoff, elapsed = results['no limiter']
+        self.assertEqual(status, 200)
+        self.assertGreaterEqual(backoff, 0.3)
+
+    def test_converges_below_server_limit(self):
+        """Starting at 4x what the server allows, AIMD settles near the limit with few 429s"""
+        with RDDLStubServer({'P': make_artifacts(1)}, rate_limit=30) as server:
+            limiter = RateLimiter({'metadata': 120})
+            session = RetryingSession(RetryPolicy(max_attempts=10, base_delay=0.01, max_delay=0.1),
+                                      rate_limiter=limiter)
+            url = f"{server.url}/api/v1/projects/P/artifacts/metadata"
+
+            def fetch(_):
+                return session.get(url, params={'pageSize': 1}, timeout=5).status_code
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                statuses = list(executor.map(fetch, range(90)))
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual(statuses, [200] * 90)
+        stats = limiter.stats()['metadata']
+        self.assertTrue(15 <= stats['rate'] <= 60, stats)
+        # An unpaced client gets about six 429s per success against this server
+        self.assertLess(server.throttled, 36)
+        # Close to the allowed 30 req/s: well under the 9 s a 10 req/s client would need
+        self.assertLess(elapsed, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import asyncio
+import hashlib
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from benchmarks.rddl_stub_server import RDDLStubServer, make_artifacts
+from src.rddl_async_client import AsyncRDDLClient, upload_headers, upload_metadata
+from src.focused_data_collector import FocusedDataCollector
+
+
+class TestAsyncRDDLClient(unittest.TestCase):
+    def setUp(self):
+        self.artifacts = make_artifacts(12, size=4096)
+        self.server = RDDLStubServer({'PWRLIB72': list(self.artifacts)}).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def run_with_client(self, coro_factory, **kwargs):
+        async def runner():
+            async with AsyncRDDLClient('test-token', base_url=self.server.url, **kwargs) as client:
+                return await coro_factory(client)
+        return asyncio.run(runner())
+
+    def test_list_and_download(self):
+        with TemporaryDirectory() as tmp:
+            async def scenario(client):
+                listed = await client.list_artifacts('PWRLIB72', page_size=5)
+                first = listed[0]
+                result = await client.download_artifact('PWRLIB72', first['artifactID'], Path(tmp) / 'a.log')
+                return listed, result
+
+            listed, (size, sha256, resumed) = self.run_with_client(scenario, max_concurrency=4)
+            self.assertEqual([a['artifactID'] for a in listed], [a[0] for a in self.artifacts])
+            self.assertEqual(size, 4096)
+            self.assertEqual(sha256, hashlib.sha256(self.artifacts[0][2]).hexdigest())
+            self.assertFalse(resumed)
+
+    def test_listing_prefetches_only_after_a_full_first_page(self):
+        def metadata_requests():
+            return sum(path.endswith('/metadata') for _, path in self.server.requests)
+
+        listed = self.run_with_client(lambda client: client.list_artifacts('PWRLIB72', page_size=100))
+        self.assertEqual(len(listed), 12)
+        self.assertEqual(metadata_requests(), 1)
+
+        listed = self.run_with_client(lambda client: client.list_artifacts('PWRLIB72', page_size=5, lookahead=4))
+        self.assertEqual(len(listed), 12)
+        # Page 1 alone, then pages 2-5 prefetched and page 6 refilled before the short page 3 ends it
+        self.assertEqual(metadata_requests() - 1, 6)
+
+    def test_upload_and_probe(self):
+        with TemporaryDirectory() as tmp:
+            local_file = Path(tmp) / 'ceedling.log'
+            local_file.write_bytes(b'x' * 5000)
+
+            async def scenario(client):
+                upload = await client.upload_file('PWRLIB72', local_file)
+                probes = await asyncio.gather(client.test_project_access('PWRLIB72'),
+                                              client.test_project_access('TTI-9'))
+                return upload, probes
+
+            (status, _), (ok, missing) = self.run_with_client(scenario)
+            self.assertEqual(status, 201)
+            self.assertEqual(self.server.uploads[0]['size'], 5000)
+            self.assertEqual(json.loads(self.server.uploads[0]['metadata'])['tags'], ['ci', 'automation', 'logs'])
+            self.assertTrue(ok['accessible'])
+            self.assertEqual(missing['status_code'], 404)
+
+    def test_upload_batch_streams_retries_and_schedules_largest_first(self):
+        with TemporaryDirectory() as tmp:
+            paths = []
+            for i, size in enumerate([1000, 50000, 3000]):
+                paths.append(Path(tmp) / f'test_{i}.log')
+                paths[-1].write_bytes(b'x' * size)
+
+            def chunks():
+                yield from (b'%d,' % i for i in range(1000))
+
+            generated = ('samples.csv', chunks, len(b''.join(chunks())))
+            self.server.upload_failures = 2  # the first two POSTs get a 503
+
+            async def scenario(client):
+                return await client.upload_batch('PWRLIB72', paths + [generated], concurrency=1, backoff=0.01)
+
+            results, summary = self.run_with_client(scenario)
+            self.assertEqual([r['filename'] for r in results], ['test_0.log', 'test_1.log', 'test_2.log', 'samples.csv'])
+            self.assertEqual([r['status'] for r in results], [201] * 4)
+            self.assertEqual(results[1]['attempts'], 3)  # largest file went first and absorbed both failures
+            self.assertEqual([u['filename'] for u in self.server.uploads],
+                             ['test_1.log', 'samples.csv', 'test_2.log', 'test_0.log'])
+            self.assertEqual(self.server.uploads[1]['size'], generated[2])
+            self.assertEqual(json.loads(self.server.uploads[0]['metadata']),
+                             {'description': 'Auto-uploaded log file test_1.log', 'tags': ['ci', 'automation', 'logs']})
+            self.assertEqual((summary['uploaded'], summary['failed'], summary['retries']), (4, 0, 2))
+            self.assertEqual(summary['bytes'], 54000 + generated[2])
+
+    def test_upload_batch_gives_up_after_retries(self):
+        with TemporaryDirectory() as tmp:
+            local_file = Path(tmp) / 'ceedling.log'
+            local_file.write_bytes(b'x' * 10)
+            self.server.upload_failures = 10
+
+            async def scenario(client):
+                return await client.upload_batch('PWRLIB72', [local_file], retries=2, backoff=0.01)
+
+            results, summary = self.run_with_client(scenario)
+            self.assertEqual((results[0]['status'], results[0]['attempts']), (503, 3))
+            self.assertEqual((summary['uploaded'], summary['failed']), (0, 1))
+            self.assertEqual(self.server.uploads, [])
+
+    @patch.dict('os.environ', {'RDDL_API_TOKEN': 'test-token'})
+    def test_focused_collector_async_matches_sync(self):
+        with TemporaryDirectory() as sync_root, TemporaryDirectory() as async_root:
+            FocusedDataCollector(base_url=self.server.url, data_root=sync_root).collect_project_data('PWRLIB72')
+            collector = FocusedDataCollector(base_url=self.server.url, data_root=async_root)
+            collector.working_projects = ['PWRLIB72']
+            asyncio.run(collector.run_focused_collection_async(max_concurrency=4))
+
+            sync_results = (Path(sync_root) / 'PWRLIB72' / 'collection_results.json').read_text()
+            async_results = (Path(async_root) / 'PWRLIB72' / 'collection_results.json').read_text()
+            self.assertEqual(json.loads(sync_results.replace(sync_root, '<root>')),
+                             json.loads(async_results.replace(async_root, '<root>')))
+
+
+class TestUploadHeaders(unittest.TestCase):
+    def test_metadata_matches_per_file_json(self):
+        metadata = upload_metadata(tags=('ci', 'nightly'))
+        for filename in ('test_fb_filter.log', 'odd "quoted" name\\.xml', 'bericht_über.log'):
+            expected = {'description': f'Auto-uploaded log file {filename}', 'tags': ['ci', 'nightly']}
+            self.assertEqual(json.loads(metadata(filename)), expected)
+            self.assertEqual(metadata(filename), json.dumps(expected))
+        self.assertEqual(json.loads(upload_metadata('Nightly run')('a.log'))['description'], 'Nightly run')
+        headers = upload_headers('report.xml')
+        self.assertEqual(headers['Filename'], 'report.xml')
+        self.assertEqual(json.loads(headers['Metadata'])['tags'], ['ci', 'automation', 'logs'])
+
+
+if __name__ == "__main__":
+    unittest.main()
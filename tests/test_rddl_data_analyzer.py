@@ -0,0 +1,160 @@
+import os
+import hashlib
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from src.near_duplicates import MinHash
+from src.rddl_data_analyzer import MAX_LINE_CHARS, RDDLDataAnalyzer, file_content_hash, scan_file
+
+
+class TestStreamingAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_scan_matches_keywords_across_chunk_boundaries(self):
+        path = self.root / 'test_fb_pi_regulator.log'
+        path.write_bytes(b'header\r\nPI REGULATOR output\r\nall tests PASSED\n')
+        text = 'header\nPI REGULATOR output\nall tests PASSED\n'
+
+        for chunk_size in (1, 5, 1024):
+            scan = scan_file(path, chunk_size=chunk_size)
+            self.assertEqual(scan['keywords'], {'regulator', 'test', 'pass'})
+            self.assertEqual(scan['line_count'], 4)
+            self.assertEqual(scan['content_hash'], hashlib.md5(text.encode()).hexdigest())
+            self.assertEqual(file_content_hash(path, chunk_size=chunk_size), scan['content_hash'])
+            self.assertEqual(scan['preview'], text)
+
+    def test_long_lines_are_shingled_in_bounded_pieces(self):
+        path = self.root / 'sensor_dump.log'
+        pieces = [f'piece {i} '.ljust(MAX_LINE_CHARS, 'x') for i in range(3)]
+        path.write_text(''.join(pieces) + 'tail\nnext line\n')
+
+        expected = MinHash()
+        # Only the part beyond MAX_LINE_CHARS is cut off; the rest stays one line with its end
+        expected.update_text('\n'.join(pieces[:2] + [pieces[2] + 'tail', 'next line']))
+        for chunk_size in (1000, 4096):
+            with patch('src.rddl_data_analyzer.MinHash.update_text', autospec=True,
+                       side_effect=MinHash.update_text) as update_text:
+                scan = scan_file(path, chunk_size=chunk_size)
+            self.assertEqual(scan['minhash'], expected.digest())
+            self.assertLessEqual(max(len(call.args[1]) for call in update_text.call_args_list),
+                                 MAX_LINE_CHARS + chunk_size)
+
+    def test_analyze_file_content(self):
+        path = self.root / 'gcovr_report.xml'
+        path.write_text('<coverage line-rate="0.93">' + 'x' * 1000 + '</coverage>')
+
+        analysis = RDDLDataAnalyzer().analyze_file_content(path)
+        self.assertEqual(len(analysis['content_preview']), 500)
+        self.assertTrue(analysis['contains_coverage_data'])
+        self.assertFalse(analysis['contains_test_data'])
+        self.assertEqual(analysis['file_type_analysis']['primary_type'], 'code_coverage_report')
+        self.assertIn('Contains code coverage metrics', analysis['file_type_analysis']['data_insights'])
+
+
+class TestParallelAnalysis(unittest.TestCase):
+    def test_parallel_run_matches_serial(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            for i in range(40):
+                folder = root / 'PWRLIB72' / ('logs' if i % 2 else 'xml')
+                folder.mkdir(parents=True, exist_ok=True)
+                (folder / f"test_{i}.{'log' if i % 2 else 'xml'}").write_text(
+                    f"test_{i}.c:1:test_Filter:INFO: output = {i}\nPASS\n" * (i + 1))
+            (root / 'PWRLIB72' / 'logs' / 'copy.log').write_text((root / 'PWRLIB72' / 'logs' / 'test_1.log').read_text())
+
+            reports = []
+            for workers in (1, 4):
+                analyzer = RDDLDataAnalyzer(rddl_dir=root / 'PWRLIB72', analysis_dir=root / f'analysis_{workers}',
+                                            workers=workers)
+                report = analyzer.run_comprehensive_analysis()
+                report.pop('analysis_timestamp')
+                reports.append(report)
+
+            self.assertEqual(reports[0]['total_files_analyzed'], 41)
+            self.assertEqual(reports[0]['duplicate_analysis']['duplicate_groups'], 1)
+            self.assertEqual(reports[0], reports[1])
+
+
+class TestAnalysisCache(unittest.TestCase):
+    def test_repeat_run_only_analyzes_new_or_changed_files(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            logs = root / 'PWRLIB72' / 'logs'
+            logs.mkdir(parents=True)
+            for i in range(5):
+                (logs / f'test_{i}.log').write_text(f'test {i} PASS\n')
+
+            analyzer = RDDLDataAnalyzer(rddl_dir=root / 'PWRLIB72', analysis_dir=root / 'analysis')
+            first = analyzer.run_comprehensive_analysis()
+
+            changed = logs / 'test_0.log'
+            changed.write_text('filter test FAIL\n')
+            os.utime(changed, ns=(changed.stat().st_atime_ns, changed.stat().st_mtime_ns + 10**9))
+            (logs / 'test_5.log').write_text('test 5 PASS\n')
+            (logs / 'test_4.log').unlink()
+
+            analyzed = []
+            original = RDDLDataAnalyzer.analyze_file_content
+            with patch.object(RDDLDataAnalyzer, 'analyze_file_content', autospec=True,
+                              side_effect=lambda self, path: analyzed.append(path.name) or original(self, path)):
+                second = analyzer.run_comprehensive_analysis()
+
+            self.assertEqual(sorted(analyzed), ['test_0.log', 'test_5.log'])
+            self.assertEqual([a['file_name'] for a in second['file_analyses']],
+                             [f'test_{i}.log' for i in (0, 1, 2, 3, 5)])
+            self.assertEqual(second['file_analyses'][1], first['file_analyses'][1])
+            self.assertIn('Contains filter testing data',
+                          second['file_analyses'][0]['file_type_analysis']['data_insights'])
+
+            # A full rescan produces the same report
+            fresh = RDDLDataAnalyzer(rddl_dir=root / 'PWRLIB72', analysis_dir=root / 'fresh',
+                                     use_cache=False).run_comprehensive_analysis()
+            for report in (second, fresh):
+                report.pop('analysis_timestamp')
+            self.assertEqual(second, fresh)
+
+    def test_touched_files_are_revalidated_by_content_hash(self):
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            logs = root / 'PWRLIB72' / 'logs'
+            logs.mkdir(parents=True)
+            for i in range(3):
+                (logs / f'test_{i}.log').write_text(f'test {i} PASS\n')
+
+            analyzer = RDDLDataAnalyzer(rddl_dir=root / 'PWRLIB72', analysis_dir=root / 'analysis')
+            analyzer.run_comprehensive_analysis()
+
+            # test_0 is only touched (fresh checkout); test_1 changes content but keeps its size
+            for name, content in (('test_0.log', 'test 0 PASS\n'), ('test_1.log', 'test 1 FAIL\n')):
+                path = logs / name
+                path.write_text(content)
+                os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+
+            def run():
+                analyzed, rehashed = [], []
+                original_analyze = RDDLDataAnalyzer.analyze_file_content
+                with patch.object(RDDLDataAnalyzer, 'analyze_file_content', autospec=True,
+                                  side_effect=lambda self, path: analyzed.append(path.name) or original_analyze(self, path)), \
+                        patch('src.rddl_data_analyzer.file_content_hash',
+                              side_effect=lambda path: rehashed.append(path.name) or file_content_hash(path)):
+                    report = analyzer.run_comprehensive_analysis()
+                return report, sorted(analyzed), sorted(rehashed)
+
+            report, analyzed, rehashed = run()
+            self.assertEqual(analyzed, ['test_1.log'])
+            self.assertEqual(rehashed, ['test_0.log', 'test_1.log'])
+            self.assertEqual(report['file_analyses'][1]['content_preview'], 'test 1 FAIL\n')
+            # The touched entry took the new mtime, so the next run trusts it without hashing
+            _, analyzed, rehashed = run()
+            self.assertEqual((analyzed, rehashed), ([], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+import requests
+
+from benchmarks.rddl_stub_server import RDDLStubServer, make_artifacts
+from src.rddl_pagination import ArtifactPaginator, find_total
+
+
+class FailingPageSession(requests.Session):
+    """Session whose requests for one page number fail"""
+
+    def __init__(self, page_number):
+        super().__init__()
+        self.page_number = page_number
+
+    def get(self, url, params=None, **kwargs):
+        if params and params.get("pageNumber") == self.page_number:
+            raise requests.ConnectionError(f"page {self.page_number} lost")
+        return super().get(url, params=params, **kwargs)
+
+
+class TestArtifactPaginator(unittest.TestCase):
+    def paginate(self, include_total, **kwargs):
+        artifacts = make_artifacts(250, size=16)
+        with RDDLStubServer({'PWRLIB72': artifacts}, include_total=include_total) as server:
+            url = f"{server.url}/api/v1/projects/PWRLIB72/artifacts/metadata"
+            paginator = ArtifactPaginator(requests.Session(), url, **kwargs)
+            ids = [artifact['artifactID'] for artifact in paginator]
+        return [a[0] for a in artifacts], ids, paginator
+
+    def test_lookahead_without_total(self):
+        expected, ids, paginator = self.paginate(False, page_size=20, workers=4)
+        self.assertEqual(ids, expected)
+        self.assertTrue(paginator.complete)
+
+    def test_parallel_with_total(self):
+        expected, ids, paginator = self.paginate(True, page_size=20, workers=4)
+        self.assertEqual(ids, expected)
+        self.assertEqual(paginator.pages_fetched, 13)
+
+    def test_max_items(self):
+        expected, ids, paginator = self.paginate(False, page_size=20, workers=2, max_items=45)
+        self.assertEqual(ids, expected[:45])
+        self.assertLessEqual(paginator.pages_fetched, 3)
+        self.assertTrue(paginator.complete)
+
+    def test_error_stops_iteration(self):
+        with RDDLStubServer({}) as server:
+            url = f"{server.url}/api/v1/projects/MISSING/artifacts/metadata"
+            paginator = ArtifactPaginator(requests.Session(), url)
+            self.assertEqual(list(paginator), [])
+            self.assertFalse(paginator.complete)
+
+    def test_later_page_error_leaves_listing_incomplete(self):
+        artifacts = make_artifacts(100, size=16)
+        with RDDLStubServer({'PWRLIB72': artifacts}) as server:
+            url = f"{server.url}/api/v1/projects/PWRLIB72/artifacts/metadata"
+            paginator = ArtifactPaginator(FailingPageSession(3), url, page_size=20, workers=2)
+            ids = [artifact['artifactID'] for artifact in paginator]
+        self.assertEqual(ids, [a[0] for a in artifacts[:40]])
+        self.assertFalse(paginator.complete)
+
+    def test_find_total(self):
+        self.assertEqual(find_total({'data': [], 'totalCount': 57}), 57)
+        self.assertEqual(find_total({'data': [], 'pagination': {'total': 3}}), 3)
+        self.assertIsNone(find_total({'data': []}))
+
+
+if __name__ == "__main__":
+    unittest.main()
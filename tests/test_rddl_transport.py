@@ -0,0 +1,154 @@
+import asyncio
+import hashlib
+import json
+import time
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from benchmarks.rddl_stub_server import RDDLStubServer, make_artifacts
+from src.focused_data_collector import FocusedDataCollector
+from src.rddl_transport import CircuitBreaker, RetryPolicy, RetryingSession, download_with_resume, retry_after
+from src.streaming_download import IntegrityError, partial_path
+
+FAST_RETRIES = RetryPolicy(max_attempts=8, base_delay=0.005, max_delay=0.02)
+
+
+class TestRetryPrimitives(unittest.TestCase):
+    def test_retry_after_and_jittered_delay(self):
+        self.assertEqual(retry_after({'Retry-After': '3'}), 3.0)
+        self.assertIsNone(retry_after({}))
+        self.assertAlmostEqual(retry_after({'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}), 0.0)
+
+        policy = RetryPolicy(base_delay=1, max_delay=4)
+        delays = [policy.delay(5) for _ in range(200)]
+        self.assertTrue(all(0 <= d <= 4 for d in delays))
+        self.assertGreater(max(delays) - min(delays), 1)  # jittered, not a fixed schedule
+        self.assertGreaterEqual(policy.delay(0, {'Retry-After': '2'}), 2)
+
+    def test_circuit_breaker_opens_and_probes(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+        for _ in range(3):
+            self.assertEqual(breaker.allow(), 0)
+            breaker.record_failure()
+        self.assertEqual(breaker.state, 'open')
+        self.assertGreater(breaker.allow(), 0)
+
+        time.sleep(0.06)
+        self.assertEqual(breaker.allow(), 0)  # the half-open probe
+        self.assertGreater(breaker.allow(), 0)  # everyone else keeps waiting
+        breaker.record_failure()
+        self.assertEqual(breaker.state, 'open')
+
+        time.sleep(0.06)
+        self.assertEqual(breaker.allow(), 0)
+        breaker.record_success()
+        self.assertEqual((breaker.state, breaker.allow()), ('closed', 0))
+
+    def test_session_retries_status_and_honours_retry_after(self):
+        with RDDLStubServer({'P': make_artifacts(3)}, fault_rate=1.0, retry_after='0') as server:
+            session = RetryingSession(RetryPolicy(max_attempts=3, base_delay=0.001))
+            session.breakers.failure_threshold = 100
+            response = session.get(f"{server.url}/api/v1/projects/P/artifacts/metadata")
+            self.assertIn(response.status_code, (429, 502, 503))
+            self.assertEqual(session.stats['retries'], 2)
+
+    def test_interrupted_download_resumes_with_range(self):
+        content = make_artifacts(1, size=5 * 2**20)[0]
+        with RDDLStubServer({'P': [content]}) as server, TemporaryDirectory() as tmp:
+            server.fault_rate = 1.0
+            with patch('benchmarks.rddl_stub_server.FAULTS', ('truncate',)):
+                url = f"{server.url}/api/v1/projects/P/artifacts/{content[0]}"
+                # Every response is cut in half until the first retry heals the server
+                session = RetryingSession(FAST_RETRIES)
+                def heal(*args):
+                    server.fault_rate = 0.0
+                with patch('src.rddl_transport.time.sleep', side_effect=heal):
+                    size, sha256, resumed = download_with_resume(session, url, Path(tmp) / 'a.bin')
+            self.assertEqual((size, sha256), (len(content[2]), hashlib.sha256(content[2]).hexdigest()))
+            self.assertTrue(resumed)
+            # The stub cut the body at 2.5 MB; whole 1 MB chunks before the cut were kept
+            self.assertEqual(server.range_requests, [(f"/api/v1/projects/P/artifacts/{content[0]}",
+                                                      f"bytes={2 * 2**20}-")])
+
+
+    def test_download_retries_are_not_nested(self):
+        content = make_artifacts(1, size=4096)[0]
+        with RDDLStubServer({'P': [content]}, fault_rate=1.0) as server, TemporaryDirectory() as tmp:
+            url = f"{server.url}/api/v1/projects/P/artifacts/{content[0]}"
+            session = RetryingSession(RetryPolicy(max_attempts=4, base_delay=0.001))
+            session.breakers.failure_threshold = 100
+            with self.assertRaises(Exception):
+                download_with_resume(session, url, Path(tmp) / 'a.bin')
+            # One request per attempt of the download loop, not 4 x 4 session attempts
+            self.assertEqual(len(server.requests), 4)
+            self.assertEqual(list(Path(tmp).iterdir()), [])
+
+    def test_download_is_verified_against_listed_size_and_md5(self):
+        content = make_artifacts(1, size=4096)[0]
+        with RDDLStubServer({'P': [content]}) as server, TemporaryDirectory() as tmp:
+            url = f"{server.url}/api/v1/projects/P/artifacts/{content[0]}"
+            save_path = Path(tmp) / 'a.bin'
+            partial = partial_path(save_path, content[0])
+            with self.assertRaises(IntegrityError):
+                download_with_resume(RetryingSession(FAST_RETRIES), url, save_path, keep_partial=True,
+                                     partial=partial, expected_md5=hashlib.md5(b'other').hexdigest())
+            with self.assertRaises(IntegrityError):
+                download_with_resume(RetryingSession(FAST_RETRIES), url, save_path, keep_partial=True,
+                                     partial=partial, expected_size=4095)
+            # A mismatch discards the partial file even when partials are kept for resuming
+            self.assertEqual(list(Path(tmp).iterdir()), [])
+
+            size, _, _ = download_with_resume(RetryingSession(FAST_RETRIES), url, save_path, partial=partial,
+                                              expected_size=4096, expected_md5=hashlib.md5(content[2]).hexdigest())
+            self.assertEqual((size, save_path.read_bytes()), (4096, content[2]))
+
+
+class TestFaultInjectedCollection(unittest.TestCase):
+    """Collections complete against a stub where 10% of GETs fail"""
+
+    def setUp(self):
+        self.artifacts = make_artifacts(60, size=64 * 1024)
+        self.server = RDDLStubServer({'PWRLIB72': list(self.artifacts)}, fault_rate=0.1, seed=7).start()
+        self.env = patch.dict('os.environ', {'RDDL_API_TOKEN': 'test-token'})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.server.stop()
+
+    def assert_complete(self, root, results):
+        self.assertEqual(results['successful_downloads'], len(self.artifacts))
+        self.assertEqual(results['failed_downloads'], 0)
+        metadata = json.loads((Path(root) / 'PWRLIB72' / 'metadata.json').read_text())
+        self.assertEqual(len(metadata['artifacts']), len(self.artifacts))
+        for artifact_id, filename, content in self.artifacts:
+            saved = next(Path(root).rglob(filename))
+            self.assertEqual(hashlib.sha256(saved.read_bytes()).hexdigest(), hashlib.sha256(content).hexdigest())
+        self.assertGreater(sum(self.server.faults.values()), 5)
+
+    def test_sync_collection_completes(self):
+        with TemporaryDirectory() as root:
+            collector = FocusedDataCollector(base_url=self.server.url, data_root=root, workers=4,
+                                             page_size=10, retry_policy=FAST_RETRIES)
+            results = collector.collect_project_data('PWRLIB72')
+            self.assert_complete(root, results)
+            self.assertGreater(collector.session.stats['retries'], 0)
+
+    def test_async_collection_completes(self):
+        with TemporaryDirectory() as root:
+            collector = FocusedDataCollector(base_url=self.server.url, data_root=root,
+                                             page_size=10, retry_policy=FAST_RETRIES)
+
+            async def collect():
+                from src.rddl_async_client import AsyncRDDLClient
+                async with AsyncRDDLClient('test-token', base_url=self.server.url, max_concurrency=4,
+                                           retry_policy=FAST_RETRIES) as client:
+                    return await collector.collect_project_data_async(client, 'PWRLIB72')
+
+            self.assert_complete(root, asyncio.run(collect()))
+
+
+if __name__ == "__main__":
+    unittest.main()
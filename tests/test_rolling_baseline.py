@@ -0,0 +1,77 @@
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from src.anomaly_detection import parse_text
+from src.rolling_baseline import RollingBaseline, observations
+
+
+def collection(rng, shift=0.0):
+    """One CI run of the 3p3z filter trace with a little noise on the output"""
+    lines = []
+    for i in range(5):
+        lines.append(f"test_fb_filter_3p3z.c:123:test_Filter3p3z:INFO: input = {10000 + 800 * i}")
+        lines.append(f"test_fb_filter_3p3z.c:124:test_Filter3p3z:INFO: output = {6 * (i + 1) + shift + rng.normal(0, 0.5):.3f}")
+        lines.append(f"test_fb_filter_3p3z.c:125:test_Filter3p3z:INFO: in = {{ {10000 + 800 * i}, 0, 0 }}")
+    return parse_text("\n".join(lines))
+
+
+class TestRollingBaseline(unittest.TestCase):
+    def test_observations_are_keyed_by_occurrence_and_index(self):
+        frame = observations(collection(np.random.default_rng(0)))
+        self.assertEqual(len(frame), 5 * (1 + 1 + 3))
+        trace = frame[(frame['key'] == 'in') & (frame['index'] == 0)]
+        self.assertEqual(list(trace['occurrence']), [0, 1, 2, 3, 4])
+        self.assertEqual(list(trace['value']), [10000, 10800, 11600, 12400, 13200])
+
+    def test_flags_outlying_run_only_after_min_history(self):
+        rng = np.random.default_rng(0)
+        baseline = RollingBaseline(min_history=5)
+        for _ in range(4):
+            baseline.update(collection(rng))
+        self.assertTrue(baseline.update(collection(rng, shift=20)).empty)  # only 4 earlier runs
+        for _ in range(20):
+            self.assertTrue(baseline.update(collection(rng)).empty)
+
+        anomalies = baseline.update(collection(rng, shift=20))
+        self.assertEqual(set(anomalies['key']), {'output'})
+        self.assertEqual(list(anomalies['occurrence']), [0, 1, 2, 3, 4])
+        self.assertTrue(all('zscore' in reason for reason in anomalies['reason']))
+
+        # Deterministic values never seen to change are flagged on any change
+        changed = collection(rng)
+        changed.loc[changed['key'] == 'input', 'value'] = '10001'
+        self.assertIn('input', set(baseline.update(changed)['key']))
+
+    def test_sustained_shift_is_reported_as_drift(self):
+        rng = np.random.default_rng(1)
+        baseline = RollingBaseline()
+        for _ in range(30):
+            baseline.update(collection(rng))
+        self.assertTrue(baseline.drifts().empty)
+        for _ in range(10):
+            baseline.update(collection(rng, shift=2))
+        drifts = baseline.drifts()
+        self.assertEqual(set(drifts['key']), {'output'})
+
+    def test_state_round_trips_through_save(self):
+        rng = np.random.default_rng(2)
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'baseline.npz'
+            baseline = RollingBaseline(path)
+            for _ in range(6):
+                baseline.update(collection(rng))
+            baseline.save()
+
+            restored = RollingBaseline(path)
+            self.assertEqual((restored.runs, len(restored)), (6, len(baseline)))
+            np.testing.assert_array_equal(restored.mean, baseline.mean)
+            np.testing.assert_array_equal(restored.ring, baseline.ring)
+            self.assertTrue(restored.update(collection(rng)).empty)
+            self.assertEqual(len(restored), len(baseline))
+
+
+if __name__ == "__main__":
+    unittest.main()
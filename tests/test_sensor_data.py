@@ -0,0 +1,82 @@
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from src.rddl_data_analyzer import RDDLDataAnalyzer
+from src.sensor_data import SensorCapture
+
+
+def signal(samples=50000):
+    t = np.arange(samples)
+    return 25 + 3 * np.sin(t / 500) + np.random.default_rng(0).normal(0, 0.05, samples)
+
+
+class TestSensorCapture(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.signal = signal()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_detects_binary_layouts(self):
+        for dtype, scale in (('<f4', 1), ('<f8', 1), ('<i2', 100), ('<i4', 1000)):
+            path = self.root / f"temp_data_{dtype[1:]}"
+            (self.signal * scale).astype(dtype).tofile(path)
+            capture = SensorCapture(path)
+            self.assertEqual((capture.kind, capture.format['dtype']), ('binary', dtype))
+            self.assertIsInstance(capture.values(), np.memmap)
+            self.assertEqual(capture.values().shape, (len(self.signal), 1))
+
+    def test_npy_and_text_captures(self):
+        np.save(self.root / 'capture.npy', np.c_[self.signal, 2 * self.signal])
+        capture = SensorCapture(self.root / 'capture.npy')
+        self.assertEqual((capture.kind, capture.format['columns']), ('npy', 2))
+        np.testing.assert_allclose(capture.values()[:, 1], 2 * self.signal)
+
+        csv = self.root / 'temp_data_file.csv'
+        csv.write_text('temp;volt\n' + ''.join(f"{v:.6f};{2 * v:.6f}\n" for v in self.signal))
+        capture = SensorCapture(csv)
+        self.assertEqual(capture.format['delimiter'], ';')
+        self.assertEqual(capture.format['header'], ['temp', 'volt'])
+
+        html = self.root / 'temp_data_file'
+        html.write_text('<!DOCTYPE html><html><body><h1>Index of /uut/</h1></body></html>\n')
+        self.assertEqual(SensorCapture(html).kind, 'unknown')
+        self.assertEqual(SensorCapture(html).summary()['columns'], [])
+
+    def test_chunked_summary_matches_numpy(self):
+        csv = self.root / 'temp_data_file.csv'
+        csv.write_text('temp,volt\n' + ''.join(f"{v:.6f},{2 * v:.6f}\n" for v in self.signal))
+        values = np.loadtxt(csv, delimiter=',', skiprows=1)
+
+        summary = SensorCapture(csv).summary(chunk_bytes=4096)
+        self.assertEqual(summary['records'], len(values))
+        temp = summary['columns'][0]
+        self.assertEqual(temp['name'], 'temp')
+        self.assertEqual(temp['min'], values[:, 0].min())
+        self.assertEqual(temp['max'], values[:, 0].max())
+        self.assertAlmostEqual(temp['mean'], values[:, 0].mean(), places=9)
+        self.assertAlmostEqual(temp['std'], values[:, 0].std(), places=9)
+        resolution = (temp['max'] - temp['min']) / (32 * 128)
+        for p in (1, 50, 99):
+            self.assertAlmostEqual(temp['percentiles'][str(p)], np.percentile(values[:, 0], p), delta=2 * resolution)
+        self.assertEqual(sum(temp['histogram']['counts']), len(values))
+
+    def test_analyzer_summarizes_binary_capture_without_text_scan(self):
+        folder = self.root / 'PWRLIB72' / 'other'
+        folder.mkdir(parents=True)
+        self.signal.astype('<f4').tofile(folder / 'temp_data_file')
+
+        analysis = RDDLDataAnalyzer(rddl_dir=self.root / 'PWRLIB72', analysis_dir=self.root / 'analysis') \
+            .analyze_file_content(folder / 'temp_data_file')
+        self.assertEqual(analysis['file_type_analysis']['primary_type'], 'sensor_data')
+        self.assertEqual(analysis['content_preview'], '')
+        self.assertEqual(analysis['sensor_summary']['records'], len(self.signal))
+
+
+if __name__ == "__main__":
+    unittest.main()
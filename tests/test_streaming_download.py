@@ -0,0 +1,70 @@
+import hashlib
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import MagicMock
+
+from src.streaming_download import stream_to_file, hash_file, partial_path
+
+
+def streamed_response(chunks):
+    response = MagicMock()
+    response.iter_content.return_value = iter(chunks)
+    return response
+
+
+class TestStreamingDownload(unittest.TestCase):
+    def test_stream_to_file_writes_and_hashes(self):
+        chunks = [b'a' * 1000, b'', b'b' * 24]
+        with TemporaryDirectory() as tmp:
+            save_path = Path(tmp) / 'report.xml'
+            size, digest = stream_to_file(streamed_response(chunks), save_path)
+            self.assertEqual(size, 1024)
+            self.assertEqual(digest, hashlib.sha256(b''.join(chunks)).hexdigest())
+            self.assertEqual(save_path.read_bytes(), b''.join(chunks))
+            self.assertEqual(list(Path(tmp).glob('*.part')), [])
+            self.assertEqual(hash_file(save_path), (size, digest))
+
+    def test_failed_stream_keeps_previous_file(self):
+        def broken_stream():
+            yield b'partial'
+            raise IOError('connection reset')
+
+        with TemporaryDirectory() as tmp:
+            save_path = Path(tmp) / 'temp_data_file'
+            save_path.write_bytes(b'previous')
+            with self.assertRaises(IOError):
+                stream_to_file(streamed_response(broken_stream()), save_path)
+            self.assertEqual(save_path.read_bytes(), b'previous')
+            self.assertEqual(list(Path(tmp).glob('*.part')), [])
+
+    def test_overlapping_downloads_use_separate_partial_files(self):
+        with TemporaryDirectory() as tmp:
+            save_path = Path(tmp) / 'report.xml'
+
+            def outer_stream():
+                yield b'outer '
+                # A second download of the same name finishes while the first is mid-body
+                stream_to_file(streamed_response([b'inner']), save_path)
+                yield b'body'
+
+            size, digest = stream_to_file(streamed_response(outer_stream()), save_path)
+            self.assertEqual(save_path.read_bytes(), b'outer body')
+            self.assertEqual(digest, hashlib.sha256(b'outer body').hexdigest())
+            self.assertEqual(list(Path(tmp).glob('*.part')), [])
+
+    def test_resume_needs_partial_path(self):
+        with TemporaryDirectory() as tmp:
+            save_path = Path(tmp) / 'report.xml'
+            with self.assertRaises(ValueError):
+                stream_to_file(streamed_response([b'rest']), save_path, resume_from=4)
+            partial = partial_path(save_path, 'a1')
+            partial.write_bytes(b'head')
+            size, digest = stream_to_file(streamed_response([b'rest']), save_path, resume_from=4,
+                                          partial=partial)
+            self.assertEqual((size, save_path.read_bytes()), (8, b'headrest'))
+            self.assertFalse(partial.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
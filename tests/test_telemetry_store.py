@@ -0,0 +1,54 @@
+import unittest
+from tempfile import TemporaryDirectory
+
+import pyarrow.dataset as ds
+
+from src.anomaly_detection import parse_text
+from src.telemetry_store import TelemetryStore
+
+LOG = """test_fb_filter_3p3z.c:123:test_Filter3p3z:INFO: input = {input}
+test_fb_filter_3p3z.c:124:test_Filter3p3z:INFO: output = {output}
+test_fb_pi_regulator.c:233:test_PiRegulator:INFO: output = 1572888
+"""
+
+
+class TestTelemetryStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.store = TelemetryStore(self.tmp.name)
+        for day, output in (('2025-01-10', 6), ('2025-05-01', 27), ('2025-07-14', 69)):
+            records = parse_text(LOG.format(input=10000, output=output))
+            self.store.write_records(records, 'PWRLIB72', day)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_query_prunes_partitions_and_columns(self):
+        result = self.store.query('records', columns=['date', 'value'], project='PWRLIB72',
+                                  since='2025-04-16', test='test_Filter3p3z', key='output')
+        self.assertEqual(list(result.columns), ['date', 'value'])
+        self.assertEqual(sorted(zip(result['date'], result['value'])),
+                         [('2025-05-01', '27'), ('2025-07-14', '69')])
+
+        # Only the filter suite's partitions for the two recent dates are read
+        partition_filter = (ds.field('suite') == 'test_fb_filter_3p3z') & (ds.field('date') >= '2025-04-16')
+        fragments = list(self.store.dataset('records').get_fragments(filter=partition_filter))
+        self.assertEqual(len(fragments), 2)
+
+    def test_rewriting_a_collection_replaces_its_partitions(self):
+        records = parse_text(LOG.format(input=10000, output=99))
+        self.store.write_records(records, 'PWRLIB72', '2025-07-14T13:02:14')
+
+        result = self.store.query('records', until='2025-07-14', since='2025-07-14', key='output')
+        self.assertEqual(sorted(result['value']), ['1572888', '99'])
+
+    def test_artifacts(self):
+        artifacts = [{'id': 'a1', 'filename': 'report.xml', 'fileSize': 3179, 'md5': 'abc'},
+                     {'id': 'a2', 'filename': 'gcovr.log', 'fileSize': 732, 'md5': 'def'}]
+        self.assertEqual(self.store.write_artifacts(artifacts, 'PWRLIB72', '2025-07-15'), 2)
+        result = self.store.query('artifacts', columns=['filename', 'fileSize'], filename='gcovr.log')
+        self.assertEqual(result.to_dict('records'), [{'filename': 'gcovr.log', 'fileSize': 732}])
+
+
+if __name__ == "__main__":
+    unittest.main()